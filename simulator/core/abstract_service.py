@@ -24,54 +24,219 @@
 #
 # -------------------------------------------------------------------------
 
+import concurrent.futures
+import hashlib
 import os
 import pickle
 import signal
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 from sys import platform, exit
 from threading import current_thread, main_thread
 
 from google.protobuf import text_format, any_pb2
+from google.protobuf.message import Message
 from uprotocol.proto.uattributes_pb2 import UPriority
 from uprotocol.proto.umessage_pb2 import UMessage
 from uprotocol.proto.upayload_pb2 import UPayload
 from uprotocol.proto.upayload_pb2 import UPayloadFormat
 from uprotocol.proto.uri_pb2 import UEntity, UUri
+from uprotocol.proto.ustatus_pb2 import UStatus, UCode
 from uprotocol.rpc.rpcmapper import RpcMapper
 from uprotocol.transport.builder.uattributesbuilder import UAttributesBuilder
 from uprotocol.uri.factory.uresource_builder import UResourceBuilder
 from uprotocol.uri.serializer.longuriserializer import LongUriSerializer
 
 from simulator.core import protobuf_autoloader
+from simulator.core.clock import get_clock
 from simulator.core.exceptions import SimulationError
+from simulator.core.handler_executor import HandlerExecutor
+from simulator.core.outbound_scheduler import get_expiry_time
+from simulator.core.publish_pipeline import PublishPipeline
+from simulator.core.state_persistence import StatePersistence
+from simulator.core.state_store import StateStore
+from simulator.core.trace_replay import TraceReplay
 from simulator.core.transport_layer import TransportLayer
+from simulator.core.uri_trie import is_wildcard
 from simulator.utils import common_util
+from simulator.utils.constant import KEY_URI_PREFIX
 
 RESPONSE_URI = UUri(entity=UEntity(name="simulator", version_major=1), resource=UResourceBuilder.for_rpc_response())
 
 covesa_services = []
 
 
-def get_instance(entity):
+def get_instance(entity, authority=None):
     for entity_dict in covesa_services:
-        if entity_dict.get('name') == entity:
+        if entity_dict.get('name') == entity and entity_dict.get('authority') == authority:
             return entity_dict.get('entity')
 
 
+class RpcHandler:
+    """
+    Serves one rpc method of a running mock service. The owning instance, the handler function and the
+    request/response classes are resolved once at registration, so serving a request costs no lookups.
+    Handlers declared with memoize=True get their packed responses cached by request payload, a repeated
+    request is then answered without unpacking it or running the handler.
+    """
+
+    def __init__(self, service, method, func):
+        self.service = service
+        self.method = method
+        self.func = func
+        self.request_class = protobuf_autoloader.get_request_class(service.service, method)
+        self.response_class = protobuf_autoloader.get_response_class(service.service, method)
+        self.cache_size = getattr(func, "response_cache_size", 0)
+        self.response_cache = OrderedDict() if self.cache_size > 0 else None  # request payload -> response
+        self.cache_lock = threading.Lock()
+        self.cache_hits = 0
+
+    def on_receive(self, message: UMessage):
+        service = self.service
+        if self.is_expired(message):
+            return None
+        if self.response_cache is not None:
+            with self.cache_lock:
+                cached = self.response_cache.get(message.payload.value)
+                if cached is not None:
+                    self.response_cache.move_to_end(message.payload.value)
+                    self.cache_hits += 1
+            if cached is not None:
+                return self.respond(message, None, *cached)
+        any_message = any_pb2.Any()
+        any_message.ParseFromString(message.payload.value)
+        req = RpcMapper.unpack_payload(any_message, self.request_class)
+        if service.rpc_executor is None:
+            return self.serve(message, req)
+        resource = service.get_request_resource(req)
+        if resource is not None and service.authority:
+            # the executor is shared by the fleet, the same resource of another vehicle is independent
+            if isinstance(resource, frozenset):
+                resource = frozenset((service.authority, key) for key in resource)
+            else:
+                resource = (service.authority, resource)
+        service.rpc_executor.submit(resource, self.serve, message, req)
+        return None
+
+    def is_expired(self, message: UMessage) -> bool:
+        expiry_time = get_expiry_time(message.attributes)
+        # ttls are stamped with the wall clock, see get_expiry_time()
+        if expiry_time is not None and expiry_time < int(time.time() * 1000):
+            # the caller has already timed out, skip the work
+            self.service.expired_rpc_requests += 1
+            print(f'Dropping expired {self.method} request, ttl of {message.attributes.ttl} ms exceeded')
+            return True
+        return False
+
+    def serve(self, message: UMessage, req):
+        service = self.service
+        payload = message.payload
+        if service.rpc_executor is not None and self.is_expired(message):
+            # expired while waiting for a worker
+            return None
+        response = self.func(service, req, self.response_class())
+        any_obj = any_pb2.Any()
+        any_obj.Pack(response)
+        response_value = any_obj.SerializeToString()
+        if self.response_cache is not None:
+            with self.cache_lock:
+                self.response_cache[payload.value] = (response_value, response)
+                if len(self.response_cache) > self.cache_size:
+                    self.response_cache.popitem(last=False)
+        return self.respond(message, req, response_value, response)
+
+    def respond(self, message: UMessage, req, response_value, response):
+        service = self.service
+        attributes = message.attributes
+        payload = message.payload
+        payload_res = UPayload(value=response_value, format=payload.format)
+        builder = UAttributesBuilder.response(RESPONSE_URI, attributes.sink, attributes.priority, attributes.id)
+        expiry_time = get_expiry_time(attributes)
+        if expiry_time is not None:
+            # the response is only useful to the caller for what is left of the request's ttl
+            remaining = expiry_time - int(time.time() * 1000)
+            if remaining <= 0:
+                service.expired_rpc_responses += 1
+                print(f'Dropping {self.method} response, ttl of {attributes.ttl} ms exceeded')
+                return None
+            builder.withTtl(remaining)
+        attributes = builder.build()
+        if service.portal_callback is not None:
+            if req is None:
+                # answered from the cache, unpack the request for the portal only
+                any_message = any_pb2.Any()
+                any_message.ParseFromString(payload.value)
+                req = RpcMapper.unpack_payload(any_message, self.request_class)
+            service.portal_callback(req, self.method, response, service.publish_data)
+        return service.transport_layer.send(UMessage(attributes=attributes, payload=payload_res))
+
+
+# method uri -> RpcHandler of every rpc method registered by a running mock service
+rpc_dispatch_table = {}
+
+# (service class, name) -> publish pipeline or rpc executor shared by the fleet instances of the class
+fleet_resources = {}
+
+
 class BaseService(object):
     # instance = None
-
-    def __init__(self, service_name=None, portal_callback=None, use_signal_handler=True):
+    publish_interval = 0  # minimum seconds between two publishes on the same topic, 0 publishes without pacing
+    publish_on_change = False  # skip publishes whose payload equals the last one queued on the topic
+    publish_coalesce_window = 0  # seconds during which successive publishes on a topic collapse into the last one
+    rpc_workers = 0  # number of threads running rpc handlers, 0 runs them on the transport receive thread
+    rpc_serialize_per_resource = False  # run requests for the same resource one at a time, in arrival order
+    rpc_registration_timeout = 5  # seconds to keep retrying rpc registrations the host has not accepted yet
+    _rpc_handler_funcs = {}  # rpc method name -> handler function, collected when the class is defined
+
+    def __init_subclass__(cls, **kwargs):
+        # collect the RequestListener handlers once per class, including the inherited ones
+        super().__init_subclass__(**kwargs)
+        handlers = {}
+        for base in reversed(cls.__bases__):
+            handlers.update(getattr(base, "_rpc_handler_funcs", {}))
+        for name, attr in vars(cls).items():
+            if hasattr(attr, "handler_func"):
+                handlers[name] = attr.handler_func
+            elif name in handlers:
+                # overridden by something which is not a handler
+                del handlers[name]
+        cls._rpc_handler_funcs = handlers
+
+    def __init__(self, service_name=None, portal_callback=None, use_signal_handler=True, authority=None):
 
         self.service = service_name
+        self.authority = authority  # vehicle this instance simulates when running as part of a fleet
         self.subscriptions = {}
         self.portal_callback = portal_callback
         self.transport_layer = TransportLayer()
         self.publish_data = []
+        if authority:
+            # every publish carries its instance's send callables, so the fleet needs a single publish thread
+            self.publish_pipeline = self._get_fleet_resource("publish_pipeline", lambda: PublishPipeline(
+                default_interval=self.publish_interval, coalesce_window=self.publish_coalesce_window))
+        else:
+            self.publish_pipeline = PublishPipeline(self._send_publish, self.publish_interval,
+                                                    self.publish_coalesce_window, self._send_publish_batch)
+        self.published_digests = {}  # topic -> digest of the last payload the transport accepted
+        self.submitted_digests = {}  # topic -> digest of the last payload queued, for publish_on_change
+        self.digest_lock = threading.Lock()
+        self.suppressed_publishes = 0
+        self.rpc_executor = None
+        self.set_rpc_workers(self.rpc_workers, self.rpc_serialize_per_resource)
+        self.expired_rpc_requests = 0  # requests dropped because their ttl ran out before the handler ran
+        self.expired_rpc_responses = 0  # responses dropped because the request's ttl ran out during the handler
         self.state = {}  # default variable to keep track of the mock service's state
+        self.state_store = StateStore()  # mock service state kept as protobuf messages, see publish_state()
         self.state_dir = os.path.join(str(Path.home()), ".sdv")  # location of serialized state
-        self.state_file = os.path.join(self.state_dir, str(self.__class__.__name__))
+        self.state_file = os.path.join(self.state_dir, self.get_state_name())
+        if authority:
+            self.state_file += "@" + authority
+        self.state_persistence = StatePersistence(self.state_file)
+        # the state store saves its entries as they change, next to the state dictionary
+        self.state_store_persistence = StatePersistence(self.state_file + ".store")
+        self.state_store_persistence.watch(self.state_store)
 
         if use_signal_handler and (current_thread() is main_thread()):
             # register signal handler to quit
@@ -83,82 +248,377 @@ class BaseService(object):
 
         self.load_state()
 
-    def RequestListener(func):
+    def RequestListener(func=None, memoize=False, cache_size=128):
+        """
+        Declares an rpc handler, used as @BaseService.RequestListener. The handler is named after the rpc method.
+        With @BaseService.RequestListener(memoize=True), responses are cached by request payload, keeping the
+        cache_size most recently used ones. Only use it for handlers whose response depends on the request alone
+        and which have no side effects, such as publishes.
+        """
+        if func is None:
+            return lambda f: BaseService.RequestListener(f, memoize, cache_size)
+        if memoize:
+            func.response_cache_size = cache_size
+
         class wrapper:
+            handler_func = func
+
             @staticmethod
             def on_receive(message: UMessage):
-                global instance
-                print('wrapper on receive')
-                attributes = message.attributes
-                topic = attributes.sink
-                entity = topic.entity.name
-                method = topic.resource.instance
-                payload = message.payload
-                req = protobuf_autoloader.get_request_class(entity, method)
-                res = protobuf_autoloader.get_response_class(entity, method)()
-                any_message = any_pb2.Any()
-                any_message.ParseFromString(payload.value)
-                req = RpcMapper.unpack_payload(any_message, req)
-                response = func(get_instance(entity), req, res)
-                any_obj = any_pb2.Any()
-                any_obj.Pack(response)
-                payload_res = UPayload(value=any_obj.SerializeToString(), format=payload.format)
-                attributes = UAttributesBuilder.response(RESPONSE_URI, attributes.sink, attributes.priority,
-                                                         attributes.id).build()
-                if get_instance(entity).portal_callback is not None:
-                    get_instance(entity).portal_callback(req, method, response, get_instance(entity).publish_data)
-                return TransportLayer().send(UMessage(attributes=attributes, payload=payload_res))
+                handler = rpc_dispatch_table.get(LongUriSerializer().serialize(message.attributes.sink))
+                if handler is None:
+                    print(f'No rpc handler registered for {func.__name__}. Discarding!')
+                    return None
+                return handler.on_receive(message)
 
         return wrapper
 
-    def start_rpc_service(self):
-        if self.transport_layer.start_service(self.service):
-            time.sleep(1)
-            covesa_services.append({'name': self.service, 'entity': self})
-            # create topic
-            topics = protobuf_autoloader.get_topics_by_proto_service_name(self.service)
-            # for topic in topics:
-            if len(topics) >= 0:
-                self.transport_layer.create_topic(self.service, topics, common_util.print_create_topic_status_handler)
-            for attr in dir(self):
-                if callable(getattr(self, attr)) and isinstance(getattr(self, attr), type):
-                    for attr1 in dir(getattr(self, attr)):
-                        if attr1 == 'on_receive':
-                            func = getattr(self, attr)
-                            method_uri = protobuf_autoloader.get_rpc_uri_by_name(self.service, attr)
-                            status = self.transport_layer.register_rpc_listener(
-                                LongUriSerializer().deserialize(method_uri), func)
-                            common_util.print_register_rpc_status(method_uri, status.code, status.message)
-
-                            break
-
-    def publish(self, uri, params={}, is_from_rpc=False):
-
-        message_class = protobuf_autoloader.get_request_class_from_topic_uri(uri)
-        message = protobuf_autoloader.populate_message(self.service, message_class, params)
+    def set_rpc_workers(self, workers, serialize_per_resource=False):
+        """
+        Configures how rpc handlers are executed.
+
+        :param workers: number of worker threads, 0 runs handlers on the transport receive thread
+        :param serialize_per_resource: if True, requests sharing a get_request_resource() key are
+            handled one at a time and in order, requests for different resources run in parallel.
+            Otherwise handlers run fully concurrently and must protect shared state themselves.
+        """
+        if self.rpc_executor is not None and not self.authority:
+            self.rpc_executor.shutdown(wait=False)
+        self.rpc_executor = None
+        if workers > 0 and self.authority:
+            # the instances of a fleet share the worker threads of their class
+            self.rpc_executor = self._get_fleet_resource(
+                ("rpc_executor", workers, serialize_per_resource),
+                lambda: HandlerExecutor(workers, serialize_per_resource, self.__class__.__name__))
+        elif workers > 0:
+            self.rpc_executor = HandlerExecutor(workers, serialize_per_resource, self.__class__.__name__)
+
+    def _get_fleet_resource(self, name, factory):
+        """
+        Returns the object the fleet instances of this service class share under name, created by factory()
+        the first time it is asked for.
+        """
+        key = (self.__class__, name)
+        if key not in fleet_resources:
+            fleet_resources[key] = factory()
+        return fleet_resources[key]
+
+    def get_state_name(self):
+        """
+        Returns the name of the file the state is saved to. Defaults to the class name, services running
+        several entities under one class must make it unique per entity.
+        """
+        return self.__class__.__name__
+
+    def get_request_resource(self, request):
+        """
+        Returns the resource an rpc request operates on, e.g. a zone or tire name, or a frozenset of them for a
+        request operating on several. Requests sharing a resource are kept in order when rpc_serialize_per_resource
+        is set. Override in mock services.
+        """
+        return None
+
+    def rpc_handlers(self):
+        """
+        Returns the rpc method name -> handler function map of the service. By default these are the
+        methods decorated with RequestListener, services building their handlers at runtime override this.
+        """
+        return self._rpc_handler_funcs
+
+    def start_rpc_service(self) -> bool:
+        """
+        Starts the service on the host, creates its topics and registers its rpc handlers.
+        Returns once the host has confirmed every registration, True if all of them were accepted.
+        """
+        if not self.transport_layer.start_service(self.service):
+            return False
+        covesa_services.append({'name': self.service, 'authority': self.authority, 'entity': self})
+        # create topic
+        topics = protobuf_autoloader.get_topics_by_proto_service_name(self.service)
+        topics = [self.localize_uri(topic) for topic in topics]
+        self.transport_layer.create_topic(self.service, topics, common_util.print_create_topic_status_handler)
+        handlers = {}
+        for method, func in self.rpc_handlers().items():
+            method_uri = self.localize_uri(protobuf_autoloader.get_rpc_uri_by_name(self.service, method))
+            uri = LongUriSerializer().deserialize(method_uri)
+            handler = RpcHandler(self, method, func)
+            rpc_dispatch_table[LongUriSerializer().serialize(uri)] = handler
+            handlers[method_uri] = (uri, handler)
+        return self.register_rpc_handlers(handlers)
+
+    def register_rpc_handlers(self, handlers) -> bool:
+        """
+        Registers rpc handlers with the host in one batch. Registrations the host refuses, e.g. because the
+        service is still starting on its side, are retried with backoff until rpc_registration_timeout.
+
+        :param handlers: dictionary of method uri -> (UUri, RpcHandler)
+        """
+        deadline = get_clock().monotonic() + self.rpc_registration_timeout
+        delay = 0.05
+        while handlers:
+            statuses = self.transport_layer.register_rpc_listeners(list(handlers.values()))
+            failed = {}
+            for method_uri, (uri, handler) in handlers.items():
+                status = statuses[LongUriSerializer().serialize(uri)]
+                if status.code == UCode.OK or get_clock().monotonic() + delay > deadline:
+                    common_util.print_register_rpc_status(method_uri, status.code, status.message)
+                if status.code != UCode.OK:
+                    failed[method_uri] = (uri, handler)
+            if not failed or get_clock().monotonic() + delay > deadline:
+                return not failed
+            get_clock().sleep(delay)
+            delay *= 2
+            handlers = failed
+        return True
+
+    def publish(self, uri, params={}, is_from_rpc=False, timeout=None):
+        """
+        Builds the topic message from params and queues it on the service's publish pipeline.
+        params may also be the topic message itself, which is then published as is and must not be
+        modified afterwards. The publish happens in the background, paced according to set_publish_rate().
+        Without a timeout, returns immediately with the message and a "Publish queued" status. With one, waits
+        up to timeout seconds for the publish to go out and returns the transport's status.
+        """
+
+        uri, message = self.build_publish(uri, params)
+        if is_from_rpc:
+            self.publish_data.clear()
+            self.publish_data.append(message)
+        if self.is_unchanged(uri, message):
+            return message, UStatus(message="Unchanged, publish suppressed", code=UCode.OK)
+        future = self.publish_pipeline.submit(uri, message, self._send_publish)
+        if timeout is None:
+            return message, UStatus(message="Publish queued", code=UCode.OK)
+        try:
+            return message, future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            return message, UStatus(message=f"Publish still queued after {timeout} s", code=UCode.DEADLINE_EXCEEDED)
+        except Exception as e:
+            return message, UStatus(message=str(e), code=UCode.INTERNAL)
+
+    def publish_many(self, publishes, is_from_rpc=False):
+        """
+        Publishes several topics together, e.g. all resources changed by one rpc. The messages are built up front
+        and handed to the transport as one batch, so they are written in one piece and stay adjacent on the wire.
+
+        :param publishes: list of (uri, params) pairs, params as accepted by publish()
+        :return: list of (message, UStatus) in the order of publishes
+        """
+        results = []
+        batch = []
+        for uri, params in publishes:
+            uri, message = self.build_publish(uri, params)
+            if self.is_unchanged(uri, message):
+                results.append((message, UStatus(message="Unchanged, publish suppressed", code=UCode.OK)))
+                continue
+            batch.append((uri, message))
+            results.append((message, UStatus(message="Publish queued", code=UCode.OK)))
+        if is_from_rpc:
+            self.publish_data.clear()
+            self.publish_data.extend(message for message, _ in results)
+        if batch:
+            self.publish_pipeline.submit_batch(batch, self._send_publish_batch)
+        return results
+
+    def build_publish(self, uri, params):
+        """
+        Returns the topic uri of this instance and the message to publish on it
+        """
+        if isinstance(params, Message):
+            message = params
+        else:
+            message_class = protobuf_autoloader.get_request_class_from_topic_uri(uri)
+            message = protobuf_autoloader.populate_message(self.service, message_class, params)
+        return self.localize_uri(uri), message
+
+    def is_unchanged(self, uri, message) -> bool:
+        """
+        Returns True if publish_on_change is set and message equals the last one queued on the topic.
+        Otherwise the message is remembered as the topic's latest payload, as it is about to be queued.
+        """
+        if not self.publish_on_change:
+            return False
+        digest = self.__get_digest(message)
+        with self.digest_lock:
+            if self.submitted_digests.get(uri) == digest:
+                self.suppressed_publishes += 1
+                return True
+            self.submitted_digests[uri] = digest
+        return False
+
+    def __record_published(self, uri, message, status):
+        """
+        Remembers the payload sent on a topic once the transport accepted it. If it failed and nothing newer was
+        queued on the topic since, the topic falls back to the last payload sent, so the same one may be retried.
+        """
+        if not self.publish_on_change:
+            return
+        digest = self.__get_digest(message)
+        with self.digest_lock:
+            if status.code == UCode.OK:
+                self.published_digests[uri] = digest
+            elif self.submitted_digests.get(uri) == digest:
+                self.submitted_digests[uri] = self.published_digests.get(uri)
+
+    @staticmethod
+    def __get_digest(message):
+        return hashlib.blake2b(message.SerializeToString(deterministic=True), digest_size=16).digest()
+
+    def publish_state(self, key, is_from_rpc=False):
+        """
+        Publishes an entry of the state store on the topic it was registered with
+        """
+        return self.publish(self.state_store.get_topic(key), self.state_store.snapshot(key), is_from_rpc)
+
+    def publish_states(self, keys, is_from_rpc=False):
+        """
+        Publishes several state store entries as one batch, see publish_many()
+        """
+        return self.publish_many([(self.state_store.get_topic(key), self.state_store.snapshot(key)) for key in keys],
+                                 is_from_rpc)
+
+    def publish_dirty_state(self):
+        """
+        Publishes every state store entry bound to a topic which changed since it was last published
+        """
+        return [self.publish_state(key) for key in self.state_store.dirty_keys()
+                if self.state_store.get_topic(key) is not None]
+
+    def replay_trace(self, path, speed=1.0, loop=False):
+        """
+        Starts publishing a recorded CSV or JSONL trace in the background, see TraceReplay.
+        Returns the replay, which can be stopped or waited for.
+        """
+        return TraceReplay(self, path, speed, loop).start()
+
+    def create_signal_feed(self, interval=1.0, seed=None):
+        """
+        Returns a SignalFeed publishing synthetic values on this service's topics every interval seconds.
+        Add signals with feed.add(topic, field, waveform) and call feed.start().
+        """
+        # imported here, numpy is only needed by services generating signals
+        from simulator.core.signal_generator import SignalFeed
+        return SignalFeed(self, interval, seed)
+
+    def set_publish_on_change(self, enabled, coalesce_window=None):
+        """
+        Enables or disables suppression of publishes which do not change the topic's payload.
+
+        :param enabled: True to skip publishes identical to the last one on the same topic
+        :param coalesce_window: optional number of seconds to hold publishes back so that a burst of updates
+            on one topic goes out as a single publish of the latest value, 0 to disable. The publish pipeline
+            of a fleet is shared, its window applies to every instance of the class.
+        """
+        self.publish_on_change = enabled
+        with self.digest_lock:
+            self.published_digests.clear()
+            self.submitted_digests.clear()
+        if coalesce_window is not None:
+            self.publish_coalesce_window = coalesce_window
+            self.publish_pipeline.set_coalesce_window(coalesce_window)
+
+    def set_publish_rate(self, uri, rate):
+        """
+        Limits the topic to at most rate publishes per second, publishes over the limit are delayed, not dropped.
+        None or 0 removes the limit.
+        """
+        self.publish_pipeline.set_rate(self.localize_uri(uri), rate)
+
+    def localize_uri(self, uri):
+        """
+        Adds the instance's authority to a uri of the resource catalog, e.g. up:/chassis/1/tire.front_left#Tire
+        becomes up://vehicle-7/chassis/1/tire.front_left#Tire. Uris which name an authority are left as is.
+        """
+        if not self.authority:
+            return uri
+        scheme = KEY_URI_PREFIX + ":"
+        head, path = (scheme, uri[len(scheme):]) if uri.startswith(scheme) else ("", uri)
+        if path.startswith("//"):
+            return uri
+        return head + "//" + self.authority + path
+
+    def flush_publishes(self, timeout=None):
+        """
+        Waits until every queued publish has been handed to the transport
+        """
+        return self.publish_pipeline.flush(timeout)
+
+    def _send_publish(self, uri, message):
+        try:
+            status = self.transport_layer.send(self._build_publish_message(uri, message))
+        except Exception as e:
+            self.__record_published(uri, message, UStatus(message=str(e), code=UCode.INTERNAL))
+            raise
+        common_util.print_publish_status(uri, status.code, status.message)
+        self.__record_published(uri, message, status)
+        return status
+
+    def _send_publish_batch(self, items):
+        umessages = [self._build_publish_message(uri, message) for uri, message in items]
+        try:
+            status = self.transport_layer.send_batch(umessages)
+        except Exception as e:
+            for uri, message in items:
+                self.__record_published(uri, message, UStatus(message=str(e), code=UCode.INTERNAL))
+            raise
+        for uri, message in items:
+            common_util.print_publish_status(uri, status.code, status.message)
+            self.__record_published(uri, message, status)
+        return status
+
+    def _build_publish_message(self, uri, message):
         any_obj = any_pb2.Any()
         any_obj.Pack(message)
         payload_data = any_obj.SerializeToString()
         payload = UPayload(value=payload_data, format=UPayloadFormat.UPAYLOAD_FORMAT_PROTOBUF)
         attributes = UAttributesBuilder.publish(LongUriSerializer().deserialize(uri), UPriority.UPRIORITY_CS4).build()
-        status = self.transport_layer.send(UMessage(payload=payload, attributes=attributes))
-        common_util.print_publish_status(uri, status.code, status.message)
-        if is_from_rpc:
-            self.publish_data.clear()
-            self.publish_data.append(message)
-        time.sleep(0.25)
-        return message, status
+        return UMessage(payload=payload, attributes=attributes)
 
     def subscribe(self, uris, listener):
-
+        """
+        Subscribes the listener to each uri. A uri may be a wildcard pattern such as
+        up:/chassis/1/tire.* (all tire topics) or up:/chassis/* (every topic of the service),
+        in which case a single registration covers all matching topics of the resource catalog.
+        All registrations are sent to the host in one batch and their replies awaited together.
+        Returns a dictionary of uri -> UStatus.
+        """
+
+        results = {}
+        topics = {}
         for uri in uris:
             if uri in self.subscriptions.keys() and listener == self.subscriptions[uri]:
                 print(f"Warning: there already exists an object subscribed to {uri}")
                 print(f"Skipping subscription for {uri}")
             self.subscriptions[uri] = listener
-            status = self.transport_layer.register_listener(LongUriSerializer().deserialize(uri), listener)
+            if is_wildcard(uri):
+                matching_topics = [self.localize_uri(topic) for topic in protobuf_autoloader.get_topics_by_pattern(uri)]
+                results[uri] = self.transport_layer.register_wildcard_listener(self.localize_uri(uri), matching_topics,
+                                                                               listener)
+            else:
+                topics[uri] = LongUriSerializer().deserialize(self.localize_uri(uri))
+        if topics:
+            statuses = self.transport_layer.register_listeners(list(topics.values()), listener)
+            for uri, topic in topics.items():
+                results[uri] = statuses[LongUriSerializer().serialize(topic)]
+        for uri, status in results.items():
+            common_util.print_subscribe_status(uri, status.code, status.message)
+        return results
+
+    def unsubscribe(self, uris, listener):
+        """
+        Removes the listener from each uri. The host subscription is only dropped once no other
+        listener in this process is subscribed to the same topic.
+        """
+
+        for uri in uris:
+            if self.subscriptions.get(uri) == listener:
+                del self.subscriptions[uri]
+            if is_wildcard(uri):
+                status = self.transport_layer.unregister_wildcard_listener(self.localize_uri(uri), listener)
+            else:
+                status = self.transport_layer.unregister_listener(
+                    LongUriSerializer().deserialize(self.localize_uri(uri)), listener)
             common_util.print_subscribe_status(uri, status.code, status.message)
-            time.sleep(1)
 
     def start(self):
 
@@ -173,7 +633,9 @@ class BaseService(object):
 
     def disconnect(self):
         # todo write logic to unregister the rpc listener
-        time.sleep(2)
+        self.flush_publishes(2)
+        self.state_persistence.flush(2)
+        self.state_store_persistence.flush(2)
 
     def print(self, protobuf_obj):
 
@@ -193,23 +655,31 @@ class BaseService(object):
             state[field] = getattr(default_obj, field)
         return state
 
-    def save_state(self):
-        try:
-            if not os.path.exists(self.state_dir):
-                os.makedirs(self.state_dir)
-
-            print("Saving previous state...")
-            with open(self.state_file, "wb+") as fd:
-                pickle.dump(self.state, fd)
-            print("Done!")
-        except OSError:
-            print("Unable to save state.")
+    def save_state(self, keys=None):
+        """
+        Queues the state to be written to disk in the background.
+
+        :param keys: top level keys of self.state which changed, only those are appended to the change log.
+            Keys no longer in the state are recorded as removed. None saves a snapshot of the whole state.
+            The state store needs no call, its entries are saved whenever they change.
+        """
+        if keys is None:
+            self.state_persistence.snapshot(self.state)
+            return
+        for key in keys:
+            if key in self.state:
+                self.state_persistence.record(key, self.state[key])
+            else:
+                self.state_persistence.record(key)
 
     def load_state(self):
+        """
+        Loads the state saved by a previous run. State store entries get their saved state once registered.
+        """
         try:
             print("Loading previous state...")
-            with open(self.state_file, "rb") as f:  # "rb" because we want to read in binary mode
-                self.state = pickle.load(f)
+            self.state = self.state_persistence.load()
+            self.state_store.restore(self.state_store_persistence.load())
             print("Done!")
-        except OSError:
+        except (OSError, pickle.UnpicklingError, EOFError):
             print("Unable to load previous state.")
@@ -29,6 +29,7 @@ import threading
 import time
 import traceback
 from builtins import str
+from collections import defaultdict, deque
 from concurrent.futures import Future
 from sys import platform
 
@@ -48,10 +49,23 @@ from uprotocol.uri.serializer.longuriserializer import LongUriSerializer
 from uprotocol.uri.validator.urivalidator import UriValidator
 from uprotocol.uuid.serializer.longuuidserializer import LongUuidSerializer
 
+from simulator.core.clock import get_clock
+from simulator.core.outbound_scheduler import MESSAGE_TYPE_RANK, OutboundScheduler, get_expiry_time
+from simulator.core.uri_trie import UriTrie
+
 # Dictionary to store requests
 m_requests = {}
 subscribers = {}  # remove element when ue unregister it
 MAX_MESSAGE_SIZE = 32767
+RECONNECT_INITIAL_DELAY = 0.05  # seconds before the second reconnect attempt
+RECONNECT_MAX_DELAY = 5  # upper bound for the exponential backoff, in seconds
+STATUS_TIMEOUT = 11  # seconds to wait for the host to acknowledge a request
+# actions the host acknowledges with a status, and the action of that status reply
+STATUS_ACTIONS = {
+    "subscribe": "subscribe_status",
+    "unsubscribe": "unsubscribe_status",
+    "register_rpc": "register_rpc_status",
+}
 RESPONSE_URI = UUri(entity=UEntity(name="simulator", version_major=1), resource=UResourceBuilder.for_rpc_response())
 
 
@@ -65,12 +79,71 @@ def add_request(req_id: str):
 
 
 def timeout_counter(response_future, reqid, timeout):
-    time.sleep(timeout / 1000)
+    get_clock().sleep(timeout / 1000)
     if not response_future.done():
         response_future.set_exception(
             TimeoutError('Not received response for request ' + reqid + ' within ' + str(timeout / 1000) + ' seconds'))
 
 
+class ReconnectManager:
+    """
+    Re-establishes the socket connection to the host off the caller's thread. Attempts are retried with
+    exponential backoff, and once connected, every registration the host lost along with the previous
+    connection is replayed in a single batch.
+    """
+
+    def __init__(self, client, initial_delay=RECONNECT_INITIAL_DELAY, max_delay=RECONNECT_MAX_DELAY, multiplier=2):
+        self.client = client
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.attempts = 0
+        self.reconnects = 0
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__stopped = False
+
+    def is_reconnecting(self) -> bool:
+        with self.__lock:
+            return self.__thread is not None
+
+    def trigger(self):
+        """
+        Starts a reconnect cycle unless one is already running. Returns immediately.
+        """
+        with self.__lock:
+            if self.__stopped or self.__thread is not None:
+                return
+            self.__thread = threading.Thread(target=self.__reconnect, daemon=True)
+            self.__thread.start()
+
+    def stop(self):
+        with self.__lock:
+            self.__stopped = True
+
+    def __reconnect(self):
+        delay = self.initial_delay
+        while True:
+            with self.__lock:
+                if self.__stopped:
+                    self.__thread = None
+                    return
+            self.attempts += 1
+            # registrations made meanwhile wait for the replay, so they reach the host after it
+            with self.client.exchange_lock:
+                replayed = self.client.open_connection() and self.client.replay_registrations()
+            with self.__lock:
+                # trigger() does nothing while the cycle runs, a connection lost during the replay is retried here
+                if replayed and self.client.connected:
+                    self.reconnects += 1
+                    print(f'socket reconnected after {self.attempts} attempt(s)')
+                    self.attempts = 0
+                    self.__thread = None
+                    return
+            time.sleep(delay)
+            delay = min(delay * self.multiplier, self.max_delay)
+
+
 class SocketClient:
     _instance = None
     _create_topic_status_callbacks = {}
@@ -91,6 +164,14 @@ class SocketClient:
             for topic in topics:
                 self.__add_create_topic_status_callback(topic, status_callback)
 
+    def unregister_create_topic_status_callback(self, topics, status_callback):
+        for topic in [topics] if isinstance(topics, str) else topics:
+            callbacks = self._create_topic_status_callbacks.get(topic)
+            if callbacks is not None and status_callback in callbacks:
+                callbacks.remove(status_callback)
+                if not callbacks:
+                    del self._create_topic_status_callbacks[topic]
+
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
             cls._instance = super(SocketClient, cls).__new__(cls)
@@ -104,49 +185,162 @@ class SocketClient:
             self.initialized = True
             self._subscribe_callbacks = {}
             self._rpc_request_callbacks = {}
-            self.receive_lock = threading.Lock()
-            self.received_data = None
+            self._wildcard_subscriptions = UriTrie()
+            self._subscription_refcounts = {}  # topic -> number of listeners relying on the host subscription
+            self._wildcard_topics = {}  # (pattern, listener) -> topics subscribed on behalf of the pattern
+            self.subscription_lock = threading.Lock()
+            self._started_services = []
+            self._created_topics = {}
+            self._received_statuses = defaultdict(deque)  # status action -> replies waiting to be collected
+            self._stale_statuses = defaultdict(int)  # status action -> replies nobody is waiting for anymore
+            self.receive_lock = threading.Condition()
+            self.connection_id = 0  # incremented for every new connection, replies never outlive theirs
+            # held while registrations are sent and their replies awaited, and while they are replayed after a reconnect
+            self.exchange_lock = threading.RLock()
+            # the outbound scheduler's writer and callers of exchange() share the socket, lines must not interleave
+            self.write_lock = threading.Lock()
+            self.reconnect_manager = ReconnectManager(self)
+            self.outbound_scheduler = OutboundScheduler(self.send_data)
+
+    def receive_data(self, action, timeout=STATUS_TIMEOUT, connection_id=None):
+        """
+        Waits for the next status reply of the given action. The host answers requests of one kind in order,
+        so replies are handed out first in, first out.
 
-    def receive_data(self):
-        start_time = time.time()
-        while True:
-            with self.receive_lock:
-                if self.received_data is not None:
-                    data = self.received_data
-                    self.received_data = None
-                    return data
-            if time.time() - start_time > 11:
-                return UStatus(code=UCode.UNKNOWN, message="Error: Timeout reached")
-            time.sleep(0.1)  # Adjust sleep time as needed to reduce CPU load
-
-    def handle_received_data(self, data):
+        :param connection_id: connection the request was sent on, the wait ends early if it is lost
+        """
+        deadline = get_clock().time() + timeout
         with self.receive_lock:
-            self.received_data = data
+            while not self._received_statuses[action]:
+                if connection_id is not None and (connection_id != self.connection_id or not self.connected):
+                    # the reply was lost along with the connection
+                    return UStatus(code=UCode.UNAVAILABLE, message="Error: Connection to the host lost")
+                remaining = deadline - get_clock().time()
+                if remaining <= 0:
+                    # the reply may still show up, it must not be mistaken for the answer to a later request
+                    self._stale_statuses[action] += 1
+                    return UStatus(code=UCode.UNKNOWN, message="Error: Timeout reached")
+                get_clock().wait(self.receive_lock, remaining)
+            return self._received_statuses[action].popleft()
+
+    def handle_received_data(self, action, data):
+        with self.receive_lock:
+            if self._stale_statuses[action] > 0:
+                self._stale_statuses[action] -= 1
+                return
+            self._received_statuses[action].append(data)
+            self.receive_lock.notify_all()
+
+    def exchange(self, requests):
+        """
+        Writes requests to the host in a single batch and waits for all of their status replies together.
+
+        :param requests: list of json maps whose action is one of STATUS_ACTIONS
+        :return: list of UStatus, in the order of the requests
+        """
+        with self.exchange_lock:
+            message_to_send = ''.join(json.dumps(json_map) + '\n' for json_map in requests)
+            if not self.send_data(message_to_send):
+                return [UStatus(code=UCode.UNAVAILABLE, message="Error: Unable to reach the host")] * len(requests)
+            # send_data may have opened the connection, reconnects wait for the exchange lock
+            connection_id = self.connection_id
+            deadline = get_clock().time() + STATUS_TIMEOUT
+            return [self.receive_data(STATUS_ACTIONS[json_map["action"]], deadline - get_clock().time(),
+                                      connection_id)
+                    for json_map in requests]
 
     def connect(self):
+        if self.connected:
+            return
+        if self.connection_id == 0 and not self.reconnect_manager.is_reconnecting():
+            # first connection, the host has nothing to be reminded of
+            self.open_connection()
+        else:
+            # only the reconnect manager reopens a lost connection, as it replays the registrations
+            self.reconnect_manager.trigger()
+
+    def open_connection(self) -> bool:
         try:
             if not self.connected:
-                self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                self.client_socket.connect(self.server_address)
-                self.connected = True
+                client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                client_socket.connect(self.server_address)
+                with self.receive_lock:
+                    self.client_socket = client_socket
+                    self.connection_id += 1
+                    # replies still expected on the previous connection will never arrive
+                    self._received_statuses.clear()
+                    self._stale_statuses.clear()
+                    self.connected = True
                 print('socket connected')
-                receive_thread = threading.Thread(target=self.__receive_data)
+                receive_thread = threading.Thread(target=self.__receive_data, args=(client_socket,), daemon=True)
                 receive_thread.start()
-                time.sleep(2)
+            return True
         except Exception:
             log = traceback.format_exc()
             print('connect method exception', log)
-            pass
+            return False
+
+    def replay_registrations(self):
+        """
+        Sends every service start, topic creation, rpc registration and subscription made on previous
+        connections to the host in a single write, so the host ends up in the same state as before.
+        Holds the exchange lock, so no request is waiting for replies that could be mistaken for the replay's.
+        """
+        with self.exchange_lock:
+            return self.__replay_registrations()
+
+    def __replay_registrations(self):
+        lines = []
+        for entity in self._started_services:
+            lines.append(json.dumps({"action": "start_service", "data": entity}))
+        for entity, topics in self._created_topics.items():
+            lines.append(json.dumps({"action": "create_topic", "data": entity, "topics": topics}))
+        for method_uri in self.rpc_request_callbacks.keys():
+            lines.append(json.dumps({"action": "register_rpc", "data": self.__serialize_long_uri(method_uri)}))
+        wire_subscriptions = list(self.subscription_refcounts.keys())
+        for topic in wire_subscriptions:
+            lines.append(json.dumps({"action": "subscribe", "data": self.__serialize_long_uri(topic)}))
+        if len(lines) == 0:
+            return True
+        # nobody waits for the replies to replayed registrations
+        ignored_statuses = {"register_rpc_status": len(self.rpc_request_callbacks),
+                            "subscribe_status": len(wire_subscriptions)}
+        with self.receive_lock:
+            for action, count in ignored_statuses.items():
+                self._stale_statuses[action] += count
+        print(f'replaying {len(lines)} registration(s) after reconnect')
+        if not self.send_data('\n'.join(lines) + '\n'):
+            with self.receive_lock:
+                for action, count in ignored_statuses.items():
+                    self._stale_statuses[action] = max(self._stale_statuses[action] - count, 0)
+            return False
+        return True
+
+    @staticmethod
+    def __serialize_long_uri(uri: str) -> str:
+        return Base64ProtobufSerializer().deserialize(LongUriSerializer().deserialize(uri).SerializeToString())
+
+    def __connection_lost(self, client_socket):
+        if client_socket is not self.client_socket:
+            # a stale receive thread noticed its old socket closing, the current connection is unaffected
+            return
+        print('socket connection lost')
+        self.disconnect()
+        self.reconnect_manager.trigger()
 
-    def __receive_data(self):
+    def __receive_data(self, client_socket):
         buffered_data = None
         BUFFER_FLAG = False
-        while self.connected:
+        while self.connected and client_socket is self.client_socket:
             try:
                 if platform == "linux" or platform == "linux2":
-                    received_data = self.client_socket.recv(MAX_MESSAGE_SIZE, socket.MSG_DONTWAIT)
+                    received_data = client_socket.recv(MAX_MESSAGE_SIZE, socket.MSG_DONTWAIT)
                 else:
-                    received_data = self.client_socket.recv(MAX_MESSAGE_SIZE)
+                    received_data = client_socket.recv(MAX_MESSAGE_SIZE)
+                if not received_data:
+                    # the host closed the connection
+                    self.__connection_lost(client_socket)
+                    break
                 for formatted_data in received_data.splitlines():
                     if BUFFER_FLAG:
                         formatted_data = buffered_data + formatted_data
@@ -166,9 +360,13 @@ class SocketClient:
                                 parsed_message.ParseFromString(serialized_data)
                                 if action == "topic_update":
                                     uri_str = LongUriSerializer().serialize(parsed_message.attributes.source)
-
-                                    if uri_str in self.subscribe_callbacks:
-                                        callbacks = self.subscribe_callbacks[uri_str]
+                                    callbacks = self.subscribe_callbacks.get(uri_str, [])
+                                    if len(self.wildcard_subscriptions) > 0:
+                                        wildcard_callbacks = self.wildcard_subscriptions.match(uri_str)
+                                        if wildcard_callbacks:
+                                            callbacks = callbacks + [callback for callback in wildcard_callbacks
+                                                                     if callback not in callbacks]
+                                    if callbacks:
                                         for callback in callbacks:
                                             callback.on_receive(parsed_message)
                                     else:
@@ -181,11 +379,10 @@ class SocketClient:
                                     else:
                                         print(f'No callback registered for uri: {uri_str}. Discarding!')
 
-                            elif action in ["publish_status", "subscribe_status", "register_rpc_status",
-                                            "send_rpc_status"]:
+                            elif action in STATUS_ACTIONS.values():
                                 parsed_message = UStatus()
                                 parsed_message.ParseFromString(serialized_data)
-                                self.handle_received_data(parsed_message)
+                                self.handle_received_data(action, parsed_message)
                             elif action == "rpc_response":
                                 parsed_message = UMessage()
                                 parsed_message.ParseFromString(serialized_data)
@@ -206,7 +403,8 @@ class SocketClient:
                                 if topic_uri_str in self._create_topic_status_callbacks:
                                     print(f'create topic status called {topic_uri_str}')
                                     callbacks = self._create_topic_status_callbacks[topic_uri_str]
-                                    for callback in callbacks:
+                                    # copied, callbacks may be unregistered meanwhile
+                                    for callback in list(callbacks):
                                         callback(topic_uri_str, parsed_message.code, parsed_message.message)
                                 else:
                                     print(f'No create topic callback registered for uri: {topic_uri_str}. Discarding!')
@@ -218,29 +416,34 @@ class SocketClient:
                 BUFFER_FLAG = True
 
     def send_data(self, message):
-
+        if not self.connected:
+            self.connect()
+        if not self.connected:
+            # fail fast, the reconnect manager replays registrations once the host is reachable again
+            self.reconnect_manager.trigger()
+            return False
         try:
-            self.client_socket.sendall(message.encode('utf-8'))
+            with self.write_lock:
+                self.client_socket.sendall(message.encode('utf-8'))
             return True
 
         except Exception:
-            self.disconnect()
-            self.connect()
-            try:
-                self.client_socket.sendall(message.encode('utf-8'))
-                return True
-            except Exception:
-                return False
+            self.__connection_lost(self.client_socket)
+            return False
 
     def disconnect(self):
         # close socket
         self.client_socket.close()
-        self.connected = False
+        with self.receive_lock:
+            self.connected = False
+            # wake the requests waiting for replies on this connection
+            self.receive_lock.notify_all()
 
     def __del__(self):
         """
         Default destructor. Disconnects underlying socket connection with VCU target.
         """
+        self.reconnect_manager.stop()
         self.disconnect()
 
     @property
@@ -251,6 +454,26 @@ class SocketClient:
     def rpc_request_callbacks(self):
         return self._rpc_request_callbacks
 
+    @property
+    def wildcard_subscriptions(self):
+        return self._wildcard_subscriptions
+
+    @property
+    def subscription_refcounts(self):
+        return self._subscription_refcounts
+
+    @property
+    def wildcard_topics(self):
+        return self._wildcard_topics
+
+    @property
+    def started_services(self):
+        return self._started_services
+
+    @property
+    def created_topics(self):
+        return self._created_topics
+
 
 class AndroidBinder(UTransport, RpcClient):
 
@@ -263,99 +486,282 @@ class AndroidBinder(UTransport, RpcClient):
         # write data to socket, this action will start the android mock service and create all topics
         json_map = {"action": "start_service", "data": entity}
         message_to_send = json.dumps(json_map) + '\n'
+        if entity not in self.client.started_services:
+            self.client.started_services.append(entity)
         return self.client.send_data(message_to_send)
 
     def create_topic(self, entity, topics, status_callback):
         print('create topic called')
         self.client.register_create_topic_status_callback(topics, status_callback)
+        # the instances of a fleet create the topics of their own authority under the same entity
+        created_topics = self.client.created_topics.setdefault(entity, [])
+        created_topics.extend(topic for topic in topics if topic not in created_topics)
         json_map = {"action": "create_topic", "data": entity, "topics": topics}
         message_to_send = json.dumps(json_map) + '\n'
         return self.client.send_data(message_to_send)
 
-    def unregister_listener(self, topic: UUri, listener: UListener) -> UStatus:
-        pass
+    def unregister_create_topic_callback(self, topics, status_callback):
+        self.client.unregister_create_topic_status_callback(topics, status_callback)
 
     def authenticate(self, u_entity: UEntity) -> UStatus:
         print("unimplemented, it is not needed in python components.")
 
     def send(self, umsg: UMessage) -> UStatus:
-        global json_map
         self.client.connect()
+        attributes = umsg.attributes
+        message_to_send, status = self.__encode(umsg)
+        if status is not None:
+            return status
+
+        try:
+            # queue data for the socket, the scheduler writes it out in priority order
+            self.client.outbound_scheduler.submit(attributes.priority, attributes.type, message_to_send,
+                                                  get_expiry_time(attributes))
+            received_data = None
+            if attributes.type in [UMessageType.UMESSAGE_TYPE_PUBLISH]:
+                # Wait for data to be received from the socket
+                received_data = UStatus(message="Successfully publish", code=UCode.OK)  # self.client.receive_data()
+            return received_data
+
+        except Exception as e:
+            return UStatus(message=str(e), code=UCode.UNKNOWN)
+
+    def send_batch(self, umsgs) -> UStatus:
+        """
+        Sends several messages as a single entry of the outbound queue, so they are written to the host in one
+        piece and stay adjacent on the wire. The batch is queued at the highest priority of its messages and
+        only dropped for its ttl once every message in it has expired. Nothing is sent if a message is invalid.
+        """
+        self.client.connect()
+        lines = []
+        priority = UPriority.UPRIORITY_UNSPECIFIED
+        message_type = UMessageType.UMESSAGE_TYPE_PUBLISH
+        expiry_times = []
+        for umsg in umsgs:
+            line, status = self.__encode(umsg)
+            if status is not None:
+                return status
+            lines.append(line)
+            attributes = umsg.attributes
+            priority = max(priority, attributes.priority)
+            message_type = max(message_type, attributes.type, key=lambda t: MESSAGE_TYPE_RANK.get(t, 0))
+            expiry_times.append(get_expiry_time(attributes))
+        if not lines:
+            return UStatus(message="Nothing to send", code=UCode.OK)
+        expiry_time = None if None in expiry_times else max(expiry_times)
+        try:
+            self.client.outbound_scheduler.submit(priority, message_type, ''.join(lines), expiry_time)
+            return UStatus(message=f"Successfully queued {len(lines)} messages", code=UCode.OK)
+        except Exception as e:
+            return UStatus(message=str(e), code=UCode.UNKNOWN)
+
+    def __encode(self, umsg: UMessage):
+        """
+        Validates a message and returns the line to write to the host for it, or the status of the failed check
+        """
         message_str = Base64ProtobufSerializer().deserialize(umsg.SerializeToString())
         attributes = umsg.attributes
         topic = attributes.source
+        json_map = None
         # validate attributes
         if attributes.type == UMessageType.UMESSAGE_TYPE_PUBLISH:
             # check uri
             status = UriValidator.validate(topic)
             if status.is_failure():
-                return status
+                return None, status
             json_map = {"action": "publish", "data": message_str}
 
         elif attributes.type == UMessageType.UMESSAGE_TYPE_REQUEST:
             # check uri
             status = UriValidator.validate_rpc_method(topic)
             if status.is_failure():
-                return status
+                return None, status
             json_map = {"action": "send_rpc", "data": message_str}
 
         elif attributes.type == UMessageType.UMESSAGE_TYPE_RESPONSE:
             status = UriValidator.validate_rpc_method(topic)
             if status.is_failure():
-                return status
+                return None, status
             json_map = {"action": "rpc_response", "data": message_str}
 
-        try:
-            # write data to socket
-            message_to_send = json.dumps(json_map) + '\n'
-            self.client.send_data(message_to_send)
-            received_data = None
-            if attributes.type in [UMessageType.UMESSAGE_TYPE_PUBLISH]:
-                # Wait for data to be received from the socket
-                received_data = UStatus(message="Successfully publish", code=UCode.OK)  # self.client.receive_data()
-            return received_data
+        if json_map is None:
+            return None, UStatus(message="Unsupported message type", code=UCode.INVALID_ARGUMENT)
+        return json.dumps(json_map) + '\n', None
 
-        except Exception as e:
-            return UStatus(message=str(e), code=UCode.UNKNOWN)
+    def get_outbound_metrics(self):
+        return self.client.outbound_scheduler.get_metrics()
 
     def register_listener(self, uri: UUri, listener: UListener) -> UStatus:
-        self.client.connect()
-        uri_str = Base64ProtobufSerializer().deserialize(uri.SerializeToString())
+        return self.register_listeners([uri], listener)[LongUriSerializer().serialize(uri)]
 
+    def register_listeners(self, uris, listener: UListener) -> dict:
+        """
+        Subscribes a listener to several topics at once. The subscribe actions that are needed are written
+        to the host in a single batch and their status replies are awaited together, so the time taken does
+        not grow with the number of topics.
+
+        :param uris: list of UUri to subscribe to
+        :param listener: the listener to call for every topic update
+        :return: dictionary of long uri -> UStatus
+        """
+        self.client.connect()
+        results = {}
         try:
+            topics = {}
+            for uri in uris:
+                topic = LongUriSerializer().serialize(uri)
+                if self.__add_subscribe_callback(topic, listener):
+                    topics[topic] = uri
+                else:
+                    results[topic] = UStatus(message="Listener is already subscribed", code=UCode.OK)
+            for topic, status in self.__acquire_subscriptions(topics).items():
+                if status.code != UCode.OK:
+                    # the host refused the subscription, do not leave a dangling callback behind
+                    self.__remove_subscribe_callback(topic, listener)
+                    self.__release_subscriptions({topic: topics[topic]}, False)
+                results[topic] = status
+        except Exception as e:
+            for uri in uris:
+                results.setdefault(LongUriSerializer().serialize(uri), UStatus(message=str(e), code=UCode.UNKNOWN))
+        return results
 
-            self.__add_subscribe_callback(LongUriSerializer().serialize(uri), listener)
-            # write data to socket
-            json_map = {"action": "subscribe", "data": uri_str}
-            print('subscribe to ', uri)
+    def register_wildcard_listener(self, pattern: str, topics, listener: UListener) -> UStatus:
+        """
+        Registers a single listener for every topic matching a wildcard pattern such as /chassis/1/tire.*
+        Matching is done locally on the receive path, the host is asked to deliver each of the given concrete
+        topics that this client is not already subscribed to.
 
-            message_to_send = json.dumps(json_map) + '\n'
-            self.client.send_data(message_to_send)
-            # Wait for data to be received from the socket
-            received_data = self.client.receive_data()
-            return received_data
+        :param pattern: long uri pattern, a component of "*" matches any value
+        :param topics: concrete long uris matching the pattern, typically taken from the resource catalog
+        :param listener: the listener to call for every matching topic update
+        """
+        self.client.connect()
+        try:
+            if not self.client.wildcard_subscriptions.insert(pattern, listener):
+                return UStatus(message="Listener is already subscribed", code=UCode.OK)
+            print('subscribe to pattern', pattern)
+            uris = {}
+            for topic in topics:
+                uri = LongUriSerializer().deserialize(topic)
+                uris[LongUriSerializer().serialize(uri)] = uri
+            self.client.wildcard_topics[(pattern, listener)] = list(uris.keys())
+            return self.__first_failure(self.__acquire_subscriptions(uris).values())
         except Exception as e:
             return UStatus(message=str(e), code=UCode.UNKNOWN)
 
-    def register_rpc_listener(self, uri: UUri, listener: UListener) -> UStatus:
+    def unregister_listener(self, topic: UUri, listener: UListener) -> UStatus:
         self.client.connect()
-        uri_str = Base64ProtobufSerializer().deserialize(uri.SerializeToString())
-
         try:
-            method_uri = LongUriSerializer().serialize(uri)
-            self.__add_rpc_request_callback(method_uri, listener)
-            # write data to socket
-            json_map = {"action": "register_rpc", "data": uri_str}
-            print('register rpc for ', uri)
-            message_to_send = json.dumps(json_map) + '\n'
-            self.client.send_data(message_to_send)
-            # Wait for data to be received from the socket
-            received_data = self.client.receive_data()
-            return received_data
+            topic_str = LongUriSerializer().serialize(topic)
+            if not self.__remove_subscribe_callback(topic_str, listener):
+                return UStatus(message=f"Listener is not subscribed to {topic_str}", code=UCode.NOT_FOUND)
+            return self.__release_subscriptions({topic_str: topic})[topic_str]
+        except Exception as e:
+            return UStatus(message=str(e), code=UCode.UNKNOWN)
 
+    def unregister_wildcard_listener(self, pattern: str, listener: UListener) -> UStatus:
+        self.client.connect()
+        try:
+            if not self.client.wildcard_subscriptions.remove(pattern, listener):
+                return UStatus(message=f"Listener is not subscribed to {pattern}", code=UCode.NOT_FOUND)
+            uris = {topic: LongUriSerializer().deserialize(topic)
+                    for topic in self.client.wildcard_topics.pop((pattern, listener), [])}
+            return self.__first_failure(self.__release_subscriptions(uris).values())
         except Exception as e:
             return UStatus(message=str(e), code=UCode.UNKNOWN)
 
+    @staticmethod
+    def __first_failure(statuses) -> UStatus:
+        for status in statuses:
+            if status.code != UCode.OK:
+                return status
+        return UStatus(message="OK", code=UCode.OK)
+
+    def __acquire_subscriptions(self, uris: dict) -> dict:
+        """
+        Takes a reference on the host subscription of each topic. Only topics gaining their first reference
+        are sent a subscribe action, in a single batch, the others succeed immediately.
+
+        :param uris: dictionary of long uri -> UUri
+        :return: dictionary of long uri -> UStatus
+        """
+        # the refcounts decide what a replay subscribes to, they must not change while it is written
+        with self.client.exchange_lock:
+            results = {}
+            to_subscribe = []
+            with self.client.subscription_lock:
+                for topic in uris.keys():
+                    count = self.client.subscription_refcounts.get(topic, 0)
+                    self.client.subscription_refcounts[topic] = count + 1
+                    if count > 0:
+                        results[topic] = UStatus(message="Already subscribed", code=UCode.OK)
+                    else:
+                        to_subscribe.append(topic)
+            if to_subscribe:
+                print('subscribe to ', to_subscribe)
+                requests = [{"action": "subscribe",
+                             "data": Base64ProtobufSerializer().deserialize(uris[topic].SerializeToString())}
+                            for topic in to_subscribe]
+                results.update(zip(to_subscribe, self.client.exchange(requests)))
+        return results
+
+    def __release_subscriptions(self, uris: dict, unsubscribe=True) -> dict:
+        """
+        Drops a reference on the host subscription of each topic. Only topics losing their last reference
+        are sent an unsubscribe action, in a single batch.
+
+        :param uris: dictionary of long uri -> UUri
+        :param unsubscribe: False to only drop the references, e.g. when the subscribe itself failed
+        :return: dictionary of long uri -> UStatus
+        """
+        with self.client.exchange_lock:
+            results = {}
+            to_unsubscribe = []
+            with self.client.subscription_lock:
+                for topic in uris.keys():
+                    count = self.client.subscription_refcounts.get(topic, 0) - 1
+                    if count > 0:
+                        self.client.subscription_refcounts[topic] = count
+                    else:
+                        self.client.subscription_refcounts.pop(topic, None)
+                    if count > 0 or not unsubscribe:
+                        results[topic] = UStatus(message="OK", code=UCode.OK)
+                    else:
+                        to_unsubscribe.append(topic)
+            if to_unsubscribe:
+                print('unsubscribe from ', to_unsubscribe)
+                requests = [{"action": "unsubscribe",
+                             "data": Base64ProtobufSerializer().deserialize(uris[topic].SerializeToString())}
+                            for topic in to_unsubscribe]
+                results.update(zip(to_unsubscribe, self.client.exchange(requests)))
+        return results
+
+    def register_rpc_listener(self, uri: UUri, listener: UListener) -> UStatus:
+        return self.register_rpc_listeners([(uri, listener)])[LongUriSerializer().serialize(uri)]
+
+    def register_rpc_listeners(self, listeners) -> dict:
+        """
+        Registers several rpc methods at once, written to the host in a single batch whose replies are
+        awaited together.
+
+        :param listeners: list of (UUri, UListener) pairs
+        :return: dictionary of long uri -> UStatus
+        """
+        self.client.connect()
+        requests = []
+        # a replay must not pick up the callbacks before their own registration has been sent
+        with self.client.exchange_lock:
+            for uri, listener in listeners:
+                self.__add_rpc_request_callback(LongUriSerializer().serialize(uri), listener)
+                uri_str = Base64ProtobufSerializer().deserialize(uri.SerializeToString())
+                requests.append({"action": "register_rpc", "data": uri_str})
+            try:
+                # Wait for data to be received from the socket
+                statuses = self.client.exchange(requests)
+            except Exception as e:
+                statuses = [UStatus(message=str(e), code=UCode.UNKNOWN)] * len(requests)
+        return {LongUriSerializer().serialize(uri): status for (uri, _), status in zip(listeners, statuses)}
+
     def invoke_method(self, method_uri: UUri, payload: UPayload, calloptions: CallOptions) -> Future:
 
         if method_uri is None or method_uri == UUri():
@@ -384,14 +790,31 @@ class AndroidBinder(UTransport, RpcClient):
 
         :param topic: A topic name to which subscription is to be made
         :param callback: This is a method that will be invoked upon receiving
+        :return: False if the callback was already registered for the topic
         """
         if topic in self.client.subscribe_callbacks:
             callbacks = self.client.subscribe_callbacks[topic]
-            if callback not in callbacks:
-                callbacks.append(callback)
+            if callback in callbacks:
+                return False
+            callbacks.append(callback)
         else:
             callbacks = [callback]
             self.client.subscribe_callbacks[topic] = callbacks
+        return True
+
+    def __remove_subscribe_callback(self, topic: str, callback: UListener):
+        """
+        Removes a callback from a topic, dropping the topic entirely once no callbacks are left.
+
+        :return: False if the callback was not registered for the topic
+        """
+        callbacks = self.client.subscribe_callbacks.get(topic)
+        if callbacks is None or callback not in callbacks:
+            return False
+        callbacks.remove(callback)
+        if len(callbacks) == 0:
+            del self.client.subscribe_callbacks[topic]
+        return True
 
     def __add_rpc_request_callback(self, method_uri: str, callback: UListener):
         self.client.rpc_request_callbacks[method_uri] = callback
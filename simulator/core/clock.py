@@ -0,0 +1,155 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+import threading
+import time
+import weakref
+
+
+class RealClock:
+    """
+    Wall clock time, the default
+    """
+
+    def time(self):
+        """
+        Seconds since epoch
+        """
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def wait(self, condition, timeout=None):
+        """
+        Waits on a threading.Condition, which the caller must hold, for at most timeout seconds of this clock.
+        Like Condition.wait() it may return early, callers recheck their deadline.
+        """
+        return condition.wait(timeout)
+
+
+class ScaledClock(RealClock):
+    """
+    Time running speed times faster than the wall clock, starting from the current time
+    """
+
+    def __init__(self, speed):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.speed = speed
+        self.__real_start = time.monotonic()
+        self.__epoch_start = time.time()
+
+    def monotonic(self):
+        return self.__real_start + (time.monotonic() - self.__real_start) * self.speed
+
+    def time(self):
+        return self.__epoch_start + (time.monotonic() - self.__real_start) * self.speed
+
+    def sleep(self, seconds):
+        time.sleep(seconds / self.speed)
+
+    def wait(self, condition, timeout=None):
+        return condition.wait(None if timeout is None else timeout / self.speed)
+
+
+class SteppedClock(RealClock):
+    """
+    Virtual time which only moves when advance() is called, so scenarios run as fast as they are stepped
+    and timeouts fire at exactly reproducible points. Threads waiting on the clock are woken on every step,
+    without polling in between.
+    """
+
+    def __init__(self, start=None):
+        self.__now = time.time() if start is None else start
+        self.__monotonic = 0.0
+        self.__lock = threading.Condition()
+        self.__waiters = weakref.WeakSet()  # conditions waited on through the clock, notified when time moves
+
+    def time(self):
+        return self.__now
+
+    def monotonic(self):
+        return self.__monotonic
+
+    def advance(self, seconds):
+        """
+        Moves time forward and wakes every thread waiting on the clock
+        """
+        with self.__lock:
+            self.__now += seconds
+            self.__monotonic += seconds
+            waiters = list(self.__waiters)
+            self.__lock.notify_all()
+        for condition in waiters:
+            with condition:
+                condition.notify_all()
+
+    def sleep(self, seconds):
+        with self.__lock:
+            deadline = self.__monotonic + seconds
+            while self.__monotonic < deadline:
+                self.__lock.wait()
+
+    def wait(self, condition, timeout=None):
+        """
+        Waits until the condition is notified or time moves. advance() needs the condition to notify it, so a
+        step cannot slip in between the caller reading the time and waiting. A step taken before the clock knew
+        the condition could, so the first wait on a condition returns right away, for the caller to recheck.
+        """
+        if timeout is None:
+            return condition.wait()
+        if timeout <= 0:
+            return False
+        with self.__lock:
+            if condition not in self.__waiters:
+                self.__waiters.add(condition)
+                return False
+        return condition.wait()
+
+
+_clock = RealClock()
+
+
+def get_clock():
+    """
+    Returns the clock used by the simulator core
+    """
+    return _clock
+
+
+def set_clock(clock):
+    """
+    Replaces the clock used by the simulator core, e.g. with a ScaledClock or SteppedClock for tests.
+    Set it before starting services, threads already waiting keep the previous clock until they wake up.
+    Message ttls are not affected: they are stamped into message ids with the wall clock by every uE, so they
+    keep expiring in real time.
+    """
+    global _clock
+    _clock = clock
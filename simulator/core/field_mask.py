@@ -0,0 +1,160 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import functools
+
+from google.protobuf.descriptor import FieldDescriptor
+
+from simulator.core.exceptions import ValidationError
+
+WILDCARD = "*"
+
+
+class CompiledFieldMask:
+    """
+    A FieldMask resolved against a message descriptor. Paths are parsed and checked once, applying the mask
+    then only walks the selected fields. Build it with get_field_mask(), which caches it per mask.
+    """
+
+    def __init__(self, descriptor, tree):
+        """
+        :param descriptor: descriptor of the masked message
+        :param tree: field name -> subtree of the nested fields selected, None selects the whole field
+        """
+        self.descriptor = descriptor
+        self.entries = []  # (field descriptor, mask of its nested fields or None for the whole field)
+        for name, subtree in tree.items():
+            field = descriptor.fields_by_name[name]
+            self.entries.append((field, None if subtree is None else CompiledFieldMask(field.message_type, subtree)))
+        self.fields = [field.name for field, _ in self.entries]  # top level fields, in mask order
+        self.__field_set = frozenset(self.fields)
+
+    def __contains__(self, name):
+        return name in self.__field_set
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def apply(self, source, target, field=None):
+        """
+        Copies the masked fields of the source message into target, a message of the same type or a state
+        dictionary of field name -> value such as BaseService.init_message_state() returns.
+
+        :param field: optional top level field to copy alone, e.g. while validating the mask field by field
+        """
+        for descriptor, mask in self.entries:
+            name = descriptor.name
+            if field is not None and name != field:
+                continue
+            value = getattr(source, name)
+            if mask is not None:
+                mask.apply(value, target[name] if isinstance(target, dict) else getattr(target, name))
+            elif isinstance(target, dict):
+                target[name] = value
+            else:
+                copy_field(descriptor, value, target)
+
+
+def copy_field(field, value, target):
+    """
+    Sets a field of target to value, replacing repeated fields and maps rather than appending to them
+    """
+    name = field.name
+    if field.label == FieldDescriptor.LABEL_REPEATED:
+        container = getattr(target, name)
+        if field.message_type is not None and field.message_type.GetOptions().map_entry:
+            container.clear()
+            for key, item in value.items():
+                if field.message_type.fields_by_name["value"].message_type is not None:
+                    container[key].CopyFrom(item)
+                else:
+                    container[key] = item
+        else:
+            del container[:]
+            container.extend(value)
+    elif field.message_type is not None:
+        getattr(target, name).CopyFrom(value)
+    else:
+        setattr(target, name, value)
+
+
+def get_field_mask(descriptor, paths, prefix=None) -> CompiledFieldMask:
+    """
+    Returns the compiled mask of a FieldMask's paths over a message, e.g. get_field_mask(Zone.DESCRIPTOR,
+    request.update_mask.paths, "zone") for an update_mask whose paths address the zone field of a request.
+
+    An empty mask, "*", or "zone.*" select every field, a trailing "*" selects every field of a nested message,
+    and nested fields are addressed in dot notation. Paths may start with prefix or the message name, which
+    are dropped. Raises a ValidationError for paths naming unknown fields.
+
+    :param descriptor: descriptor of the masked message
+    :param paths: paths of the mask
+    :param prefix: optional name of the field holding the masked message, as used in the paths
+    """
+    return _compile(descriptor, tuple(paths), prefix)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile(descriptor, paths, prefix):
+    prefixes = {descriptor.name.lower()}
+    if prefix:
+        prefixes.add(prefix.lower())
+    tree = {}
+    for path in paths:
+        parts = [part.strip() for part in path.split(".")]
+        if len(parts) > 1 and parts[0].lower() in prefixes:
+            parts = parts[1:]
+        if parts == [WILDCARD]:
+            return CompiledFieldMask(descriptor, _all_fields(descriptor))
+        _insert(descriptor, tree, parts, path)
+    return CompiledFieldMask(descriptor, tree or _all_fields(descriptor))
+
+
+def _all_fields(descriptor):
+    return {field.name: None for field in descriptor.fields}
+
+
+def _insert(descriptor, tree, parts, path):
+    """
+    Adds the field addressed by parts to the mask tree of a message
+    """
+    name, rest = parts[0], parts[1:]
+    field = descriptor.fields_by_name.get(name)
+    if field is None:
+        raise ValidationError(3, f"Invalid field mask path {path}: {descriptor.full_name} has no field {name}")
+    if not rest or rest == [WILDCARD]:
+        tree[name] = None
+        return
+    if field.message_type is None or field.label == FieldDescriptor.LABEL_REPEATED:
+        raise ValidationError(3, f"Invalid field mask path {path}: {name} has no nested fields")
+    if name in tree and tree[name] is None:
+        # the whole field is selected already
+        return
+    _insert(field.message_type, tree.setdefault(name, {}), rest, path)
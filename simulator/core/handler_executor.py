@@ -0,0 +1,100 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+import itertools
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class HandlerExecutor:
+    """
+    Runs the rpc handlers of a mock service off the transport receive thread.
+
+    By default handlers run concurrently on a pool of worker threads, so a burst of requests from many
+    clients is served in parallel. With serialize_per_resource, requests are spread over single threaded
+    lanes by resource key instead: requests for the same resource (zone, tire, brake...) run one at a time
+    and in arrival order, while requests for different resources still run in parallel. A request for several
+    resources, given as a frozenset of resource keys, holds the lanes of all of them while it runs, so it keeps
+    its order with the requests for each of them.
+    """
+
+    def __init__(self, workers, serialize_per_resource=False, name="rpc"):
+        self.workers = workers
+        self.serialize_per_resource = serialize_per_resource
+        self.__round_robin = itertools.count()
+        # requests spanning lanes are queued on all of them in the same order, so none waits for another in a cycle
+        self.__spanning_lock = threading.Lock()
+        if serialize_per_resource:
+            self.__lanes = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-lane{index}")
+                            for index in range(workers)]
+        else:
+            self.__lanes = [ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)]
+
+    def submit(self, resource_key, task, *args):
+        """
+        Schedules task(*args). Tasks with the same resource_key, or sharing a resource key of their frozensets,
+        keep their order when serializing per resource, tasks without a key are spread evenly over the lanes.
+        """
+        if len(self.__lanes) == 1:
+            return self.__lanes[0].submit(self.__run, task, *args)
+        if resource_key is None or resource_key == frozenset():
+            return self.__lanes[next(self.__round_robin) % len(self.__lanes)].submit(self.__run, task, *args)
+        if not isinstance(resource_key, frozenset):
+            return self.__lanes[hash(resource_key) % len(self.__lanes)].submit(self.__run, task, *args)
+        lanes = sorted({hash(key) % len(self.__lanes) for key in resource_key})
+        if len(lanes) == 1:
+            return self.__lanes[lanes[0]].submit(self.__run, task, *args)
+        arrived = threading.Barrier(len(lanes))
+        done = threading.Event()
+
+        def hold():
+            # keeps the lane free of later requests until the task ran
+            arrived.wait()
+            done.wait()
+
+        def run():
+            arrived.wait()
+            try:
+                return self.__run(task, *args)
+            finally:
+                done.set()
+
+        with self.__spanning_lock:
+            for lane in lanes[1:]:
+                self.__lanes[lane].submit(hold)
+            return self.__lanes[lanes[0]].submit(run)
+
+    def shutdown(self, wait=True):
+        for lane in self.__lanes:
+            lane.shutdown(wait=wait)
+
+    @staticmethod
+    def __run(task, *args):
+        try:
+            return task(*args)
+        except Exception:
+            print('Exception in rpc handler:', traceback.format_exc())
@@ -0,0 +1,195 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+import threading
+import time
+from collections import deque
+
+from uprotocol.proto.uattributes_pb2 import UAttributes, UMessageType, UPriority
+from uprotocol.uuid.factory.uuidutils import UUIDUtils
+
+MAX_BATCH_SIZE = 32  # maximum number of queued messages written to the socket at once
+RETRY_DELAY = 0.5  # seconds to wait before writing a batch again after the sink failed
+MAX_QUEUED_PUBLISHES = 10000  # publishes queued at most, further publishers wait for the writer to catch up
+
+# within one priority class, responses go first since a caller is already waiting on them
+MESSAGE_TYPE_RANK = {
+    UMessageType.UMESSAGE_TYPE_RESPONSE: 2,
+    UMessageType.UMESSAGE_TYPE_REQUEST: 1,
+    UMessageType.UMESSAGE_TYPE_PUBLISH: 0,
+}
+PUBLISH_RANK = MESSAGE_TYPE_RANK[UMessageType.UMESSAGE_TYPE_PUBLISH]
+
+
+def get_expiry_time(attributes: UAttributes):
+    """
+    Returns the time in milliseconds since epoch after which the message is stale, or None if it has no ttl.
+    The creation time comes from the wall clock stamped into the message id, so the expiry must be compared
+    with time.time(), never with the simulation clock.
+    """
+    if not attributes.HasField('ttl') or attributes.ttl <= 0:
+        return None
+    created = UUIDUtils.getTime(attributes.id)
+    if created is None:
+        return None
+    return created + attributes.ttl
+
+
+class OutboundScheduler:
+    """
+    Orders outgoing messages by UPriority before they are written to the transport, so high priority traffic
+    (typically rpc responses) does not wait behind bursts of low priority periodic publishes. Messages of the
+    same priority are sent responses first, then requests, then publishes, each in submission order.
+    A single writer thread drains the queues and hands the data to the sink. Messages whose ttl runs out while
+    they are queued are dropped instead of sent, since their receiver has already given up on them.
+    The sink returns whether the write succeeded. A failed batch is put back at the front of its queues and
+    written again after retry_delay, e.g. once the transport has reconnected.
+    Publishes are queued up to max_queued_publishes, beyond that submitting one blocks until the writer made room,
+    so a publisher outrunning the transport is slowed down instead of filling the memory. Requests and responses
+    are never held up.
+    """
+
+    def __init__(self, sink, max_batch_size=MAX_BATCH_SIZE, retry_delay=RETRY_DELAY,
+                 max_queued_publishes=MAX_QUEUED_PUBLISHES):
+        self.__sink = sink
+        self.__max_batch_size = max_batch_size
+        self.__retry_delay = retry_delay
+        self.__max_queued_publishes = max_queued_publishes
+        self.__queued_publishes = 0
+        self.__queues = {}
+        for priority in UPriority.values():
+            for rank in set(MESSAGE_TYPE_RANK.values()):
+                self.__queues[(priority, rank)] = deque()
+        self.__order = sorted(self.__queues.keys(), reverse=True)
+        self.__condition = threading.Condition()
+        self.__depth = {priority: 0 for priority in UPriority.values()}
+        self.__max_depth = {priority: 0 for priority in UPriority.values()}
+        self.__enqueued = {priority: 0 for priority in UPriority.values()}
+        self.__sent = {priority: 0 for priority in UPriority.values()}
+        self.__expired = {priority: 0 for priority in UPriority.values()}
+        self.__failed = {priority: 0 for priority in UPriority.values()}  # messages of batches the sink refused
+        self.__writer = threading.Thread(target=self.__write_loop, daemon=True)
+        self.__writer.start()
+
+    def submit(self, priority, message_type, data: str, expiry_time=None):
+        """
+        Queues serialized data for sending. Returns immediately, unless max_queued_publishes publishes are
+        already queued and the data is a publish, which then waits for room.
+
+        :param priority: UPriority of the message
+        :param message_type: UMessageType of the message
+        :param data: the newline terminated string to write to the transport
+        :param expiry_time: optional time in milliseconds since epoch after which the message is dropped
+        """
+        if priority not in self.__depth:
+            priority = UPriority.UPRIORITY_UNSPECIFIED
+        rank = MESSAGE_TYPE_RANK.get(message_type, 0)
+        with self.__condition:
+            if rank == PUBLISH_RANK:
+                while self.__queued_publishes >= self.__max_queued_publishes:
+                    self.__condition.wait()
+                self.__queued_publishes += 1
+            self.__queues[(priority, rank)].append((data, expiry_time))
+            self.__depth[priority] += 1
+            self.__enqueued[priority] += 1
+            if self.__depth[priority] > self.__max_depth[priority]:
+                self.__max_depth[priority] = self.__depth[priority]
+            # publishers waiting for room share the condition with the writer
+            self.__condition.notify_all()
+
+    def get_queue_depths(self):
+        """
+        Returns the number of queued messages keyed by UPriority name
+        """
+        with self.__condition:
+            return {UPriority.Name(priority): depth for priority, depth in self.__depth.items()}
+
+    def get_metrics(self):
+        """
+        Returns the current depth, the maximum depth seen, and the enqueued, sent, expired and failed counters for
+        each priority. Messages of a failed write are requeued, failed counts each attempt.
+        """
+        with self.__condition:
+            return {
+                UPriority.Name(priority): {
+                    "depth": self.__depth[priority],
+                    "max_depth": self.__max_depth[priority],
+                    "enqueued": self.__enqueued[priority],
+                    "sent": self.__sent[priority],
+                    "expired": self.__expired[priority],
+                    "failed": self.__failed[priority],
+                }
+                for priority in self.__depth.keys()
+            }
+
+    def __next_batch(self):
+        """
+        Takes the next messages to write off the queues, as a list of (queue key, data, expiry time)
+        """
+        batch = []
+        freed = 0  # publishes taken off the queues, sent or expired
+        now = int(time.time() * 1000)
+        for key in self.__order:
+            queue = self.__queues[key]
+            while queue and len(batch) < self.__max_batch_size:
+                data, expiry_time = queue.popleft()
+                self.__depth[key[0]] -= 1
+                if key[1] == PUBLISH_RANK:
+                    self.__queued_publishes -= 1
+                    freed += 1
+                if expiry_time is not None and expiry_time < now:
+                    self.__expired[key[0]] += 1
+                    continue
+                batch.append((key, data, expiry_time))
+            if len(batch) >= self.__max_batch_size:
+                break
+        if freed:
+            # wake publishers waiting for room
+            self.__condition.notify_all()
+        return batch
+
+    def __write_loop(self):
+        while True:
+            with self.__condition:
+                batch = self.__next_batch()
+                while not batch:
+                    self.__condition.wait()
+                    batch = self.__next_batch()
+            written = self.__sink(''.join(data for _, data, _ in batch))
+            with self.__condition:
+                if written:
+                    for key, _, _ in batch:
+                        self.__sent[key[0]] += 1
+                    continue
+                # put the batch back in front of anything queued since, keeping its order
+                for key, data, expiry_time in reversed(batch):
+                    self.__queues[key].appendleft((data, expiry_time))
+                    self.__depth[key[0]] += 1
+                    if key[1] == PUBLISH_RANK:
+                        self.__queued_publishes += 1
+                    self.__failed[key[0]] += 1
+            print(f'Writing {len(batch)} queued message(s) failed, retrying in {self.__retry_delay} s')
+            time.sleep(self.__retry_delay)
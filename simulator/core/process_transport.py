@@ -0,0 +1,248 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+import itertools
+import queue
+import threading
+import traceback
+from concurrent.futures import Future
+
+from google.protobuf import symbol_database
+from google.protobuf.message import Message
+from uprotocol.proto.ustatus_pb2 import UStatus, UCode
+
+
+class ListenerHandle:
+    """
+    Stands in for a listener or callback of a worker process in messages sent to the supervisor
+    """
+
+    def __init__(self, handle):
+        self.handle = handle
+
+
+class EncodedMessage:
+    """
+    A protobuf message in a form that can cross a pipe. Pickle finds classes by module, and the classes generated
+    by up-python claim top level modules such as umessage_pb2 that cannot be imported, so messages travel as
+    their full name and serialized bytes and are looked up in the symbol database on the other side.
+    """
+
+    def __init__(self, message: Message):
+        self.full_name = message.DESCRIPTOR.full_name
+        self.data = message.SerializeToString()
+
+    def decode(self):
+        message = symbol_database.Default().GetSymbol(self.full_name)()
+        message.ParseFromString(self.data)
+        return message
+
+
+def encode(value, to_handle=None):
+    """
+    Prepares a value for a pipe: protobuf messages are encoded and, if to_handle is given,
+    listeners and callbacks are replaced by what it returns for them. Containers are walked.
+    """
+    if isinstance(value, Message):
+        return EncodedMessage(value)
+    if isinstance(value, (list, tuple)):
+        return type(value)(encode(item, to_handle) for item in value)
+    if isinstance(value, dict):
+        return {key: encode(item, to_handle) for key, item in value.items()}
+    if to_handle is not None and (hasattr(value, "on_receive") or callable(value)):
+        return to_handle(value)
+    return value
+
+
+def decode(value, from_handle=None):
+    """
+    Reverses encode(), from_handle maps each ListenerHandle to the object standing in for it
+    """
+    if isinstance(value, EncodedMessage):
+        return value.decode()
+    if isinstance(value, ListenerHandle):
+        return from_handle(value.handle)
+    if isinstance(value, (list, tuple)):
+        return type(value)(decode(item, from_handle) for item in value)
+    if isinstance(value, dict):
+        return {key: decode(item, from_handle) for key, item in value.items()}
+    return value
+
+
+class ProcessTransport:
+    """
+    Transport of a mock service running in a worker process of the ServiceSupervisor. Every call is forwarded
+    over a pipe to the supervisor, which performs it on the single host connection, and topic updates, rpc
+    requests and status callbacks come back the same way. Listeners stay in the worker and are referred to by
+    handle. Incoming events are delivered on a dispatch thread, so listeners may call back into the transport.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, "initialized"):
+            self.initialized = True
+            self.conn = None
+            self.__send_lock = threading.Lock()
+            self.__calls = {}  # call id -> Future of the result
+            self.__call_ids = itertools.count()
+            self.__handles = {}  # id of listener -> handle
+            self.__listeners = {}  # handle -> listener or callback
+            self.__events = queue.Queue()
+            self.__closed = threading.Event()
+
+    def attach(self, conn):
+        """
+        Connects the transport to the supervisor end of a pipe and starts receiving from it
+        """
+        self.conn = conn
+        threading.Thread(target=self.__receive_loop, name="process-transport-receive", daemon=True).start()
+        threading.Thread(target=self.__dispatch_loop, name="process-transport-dispatch", daemon=True).start()
+
+    def wait_closed(self):
+        """
+        Blocks until the supervisor closes the pipe
+        """
+        self.__closed.wait()
+
+    def start_service(self, entity) -> bool:
+        return self.__call("start_service", entity)
+
+    def create_topic(self, entity, topics, status_callback):
+        return self.__call("create_topic", entity, topics, status_callback)
+
+    def authenticate(self, u_entity):
+        return self.__call("authenticate", u_entity)
+
+    def send(self, umsg) -> UStatus:
+        # fire and forget like the outbound queue of the binder, errors are reported by the supervisor
+        if not self.__post(("post", None, "send", (umsg,))):
+            return UStatus(message="Supervisor connection closed", code=UCode.UNAVAILABLE)
+        return UStatus(message="Message queued", code=UCode.OK)
+
+    def send_batch(self, umsgs) -> UStatus:
+        if not self.__post(("post", None, "send_batch", (list(umsgs),))):
+            return UStatus(message="Supervisor connection closed", code=UCode.UNAVAILABLE)
+        return UStatus(message="Messages queued", code=UCode.OK)
+
+    def register_listener(self, uri, listener) -> UStatus:
+        return self.__call("register_listener", uri, listener)
+
+    def register_listeners(self, uris, listener) -> dict:
+        return self.__call("register_listeners", uris, listener)
+
+    def register_wildcard_listener(self, pattern, topics, listener) -> UStatus:
+        return self.__call("register_wildcard_listener", pattern, topics, listener)
+
+    def unregister_listener(self, uri, listener) -> UStatus:
+        return self.__call("unregister_listener", uri, listener)
+
+    def unregister_wildcard_listener(self, pattern, listener) -> UStatus:
+        return self.__call("unregister_wildcard_listener", pattern, listener)
+
+    def register_rpc_listener(self, uri, listener) -> UStatus:
+        return self.__call("register_rpc_listener", uri, listener)
+
+    def register_rpc_listeners(self, listeners) -> dict:
+        return self.__call("register_rpc_listeners", listeners)
+
+    def invoke_method(self, method_uri, payload, calloptions) -> Future:
+        return self.__submit("invoke_method", method_uri, payload, calloptions)
+
+    def get_outbound_metrics(self):
+        return self.__call("get_outbound_metrics")
+
+    def __call(self, method, *args):
+        return self.__submit(method, *args).result()
+
+    def __submit(self, method, *args) -> Future:
+        future = Future()
+        call_id = next(self.__call_ids)
+        self.__calls[call_id] = future
+        if not self.__post(("call", call_id, method, args)):
+            self.__calls.pop(call_id, None)
+            future.set_exception(ConnectionError("Supervisor connection closed"))
+        return future
+
+    def __post(self, request) -> bool:
+        kind, call_id, method, args = request
+        try:
+            with self.__send_lock:
+                self.conn.send((kind, call_id, method, encode(args, self.__to_handle)))
+            return True
+        except (OSError, ValueError, AttributeError):
+            return False
+
+    def __to_handle(self, listener):
+        handle = self.__handles.get(id(listener))
+        if handle is None:
+            handle = len(self.__listeners)
+            self.__handles[id(listener)] = handle
+            self.__listeners[handle] = listener
+        return ListenerHandle(handle)
+
+    def __receive_loop(self):
+        while True:
+            try:
+                kind, key, value = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            if kind in ("result", "error"):
+                future = self.__calls.pop(key, None)
+                if future is None:
+                    continue
+                if kind == "result":
+                    future.set_result(decode(value))
+                else:
+                    future.set_exception(RuntimeError(value))
+            else:
+                self.__events.put((kind, key, value))
+        self.__closed.set()
+        for future in self.__calls.values():
+            future.set_exception(ConnectionError("Supervisor connection closed"))
+        self.__calls.clear()
+        self.__events.put(None)
+
+    def __dispatch_loop(self):
+        while True:
+            event = self.__events.get()
+            if event is None:
+                return
+            kind, handle, value = event
+            listener = self.__listeners.get(handle)
+            if listener is None:
+                continue
+            try:
+                if kind == "listener":
+                    listener.on_receive(*decode(value))
+                else:
+                    listener(*decode(value))
+            except Exception:
+                print("Listener failed:", traceback.format_exc())
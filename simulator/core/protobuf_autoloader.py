@@ -38,6 +38,7 @@ from collections import defaultdict
 from google.protobuf.descriptor import FieldDescriptor
 
 from target import protofiles as proto
+from simulator.core.uri_trie import UriTrie
 from simulator.utils.constant import RESOURCE_CATALOG_CSV_NAME, RESOURCE_CATALOG_JSON_NAME
 import simulator.utils.constant as CONSTANTS
 
@@ -209,6 +210,14 @@ def get_topics_by_proto_service_name(service_name):
     return topics
 
 
+# returns the topics of the resource catalog matching a wildcard pattern such as up:/chassis/1/tire.*
+def get_topics_by_pattern(pattern):
+    global topic_messages
+    trie = UriTrie()
+    trie.insert(pattern, pattern)
+    return [pair[0] for pair in topic_messages if trie.matches(pair[0])]
+
+
 def get_services():
     global service_id
     return service_id.keys()
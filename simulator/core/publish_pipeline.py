@@ -0,0 +1,222 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+import heapq
+import itertools
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+
+from simulator.core.clock import get_clock
+
+CANCELLED = object()  # message of a heap entry superseded by a batch, skipped when it comes up
+
+
+class PublishPipeline:
+    """
+    Sends a service's publishes from a background thread so the caller, typically an rpc handler, returns
+    immediately. Publishes go out in submission order unless a topic is paced, in which case consecutive
+    publishes on that topic are spaced at least the configured interval apart without holding up other topics.
+    With a coalesce window, a publish is held back for that long and replaced by any later publish on the
+    same topic in the meantime, so a burst of updates results in a single publish of the latest one.
+    Publishes submitted together as a batch are sent together, once every topic in it may be published.
+    A batch replaces the publishes still held back on its topics, so an older message never follows it.
+    Each publish may name its own send callable, so the instances of a fleet can share one pipeline and thread.
+    Submitting returns a Future resolved with what the send callable returned once the publish went out,
+    or with the outcome of the publish that replaced it.
+    """
+
+    def __init__(self, send=None, default_interval=0, coalesce_window=0, send_batch=None):
+        """
+        :param send: callable taking (topic, message) which performs the actual publish, used for publishes
+            submitted without their own
+        :param send_batch: callable taking a list of (topic, message) which publishes them together
+        :param default_interval: minimum number of seconds between two publishes on the same topic, 0 to disable
+        :param coalesce_window: seconds a publish waits for newer publishes on its topic, 0 to disable
+        """
+        self.__send = send
+        self.__send_batch = send_batch
+        self.__default_interval = default_interval
+        self.__coalesce_window = coalesce_window
+        self.__pending = {}  # topic -> heap entry not sent yet, used for coalescing
+        self.coalesced = 0  # publishes replaced by a newer one before they were sent
+        self.__intervals = {}  # topic -> pacing interval overriding the default
+        self.__next_slot = {}  # topic -> earliest time its next publish may go out
+        self.__heap = []
+        self.__sequence = itertools.count()
+        self.__in_flight = 0
+        self.__stopped = False
+        self.__condition = threading.Condition()
+        self.__worker = threading.Thread(target=self.__publish_loop, daemon=True)
+        self.__worker.start()
+
+    def set_interval(self, topic, interval):
+        """
+        Sets the minimum number of seconds between two publishes on a topic. None restores the default.
+        """
+        with self.__condition:
+            if interval is None:
+                self.__intervals.pop(topic, None)
+            else:
+                self.__intervals[topic] = interval
+
+    def set_rate(self, topic, rate):
+        """
+        Limits a topic to at most rate publishes per second. None or 0 removes the limit.
+        """
+        self.set_interval(topic, 1 / rate if rate else None)
+
+    def set_coalesce_window(self, window):
+        with self.__condition:
+            self.__coalesce_window = window
+
+    def submit(self, topic, message, send=None):
+        """
+        Queues a publish, sent with send(topic, message) or the pipeline's send callable if None.
+        Returns a Future of the send callable's result.
+        """
+        future = Future()
+        with self.__condition:
+            if self.__coalesce_window > 0:
+                pending = self.__pending.get(topic)
+                if pending is not None:
+                    # not sent yet, send the newer message in its place
+                    pending[3] = message
+                    pending[5].append(future)
+                    self.coalesced += 1
+                    return future
+            now = get_clock().monotonic()
+            ready = max(now + self.__coalesce_window, self.__next_slot.get(topic, now))
+            interval = self.__intervals.get(topic, self.__default_interval)
+            if interval > 0:
+                self.__next_slot[topic] = ready + interval
+            entry = [ready, next(self.__sequence), topic, message, send or self.__send, [future]]
+            if self.__coalesce_window > 0:
+                self.__pending[topic] = entry
+            heapq.heappush(self.__heap, entry)
+            self.__condition.notify()
+        return future
+
+    def submit_batch(self, items, send_batch=None):
+        """
+        Queues several publishes, a list of (topic, message), to be sent together with send_batch(items).
+        Publishes on the same topics still waiting in the coalesce window are dropped in favour of the batch.
+        Without any send_batch callable, the publishes are queued one by one.
+        Returns a list with the Future of every publish, those of a batch all get the batch's result.
+        """
+        send_batch = send_batch or self.__send_batch
+        if send_batch is None:
+            return [self.submit(topic, message) for topic, message in items]
+        futures = [Future() for _ in items]
+        with self.__condition:
+            replaced = []
+            for topic, _ in items:
+                pending = self.__pending.pop(topic, None)
+                if pending is not None:
+                    pending[3] = CANCELLED
+                    replaced.extend(pending[5])
+                    self.coalesced += 1
+            now = get_clock().monotonic()
+            ready = max([now] + [self.__next_slot.get(topic, now) for topic, _ in items])
+            for topic, _ in items:
+                interval = self.__intervals.get(topic, self.__default_interval)
+                if interval > 0:
+                    self.__next_slot[topic] = ready + interval
+            # a topic of None marks a batch
+            heapq.heappush(self.__heap, [ready, next(self.__sequence), None, items, send_batch, futures + replaced])
+            self.__condition.notify()
+        return futures
+
+    def pending(self):
+        with self.__condition:
+            return len(self.__heap) + self.__in_flight
+
+    def wait_for_room(self, max_pending, timeout=None) -> bool:
+        """
+        Blocks until fewer than max_pending publishes are queued or being sent, for producers which must not
+        outrun the transport. Returns False if the timeout, in real seconds, expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.__condition:
+            while len(self.__heap) + self.__in_flight >= max_pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.__condition.wait(remaining)
+            return True
+
+    def flush(self, timeout=None) -> bool:
+        """
+        Blocks until every submitted publish has been sent. Returns False if the timeout, in real seconds
+        whatever the simulation clock, expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.__condition:
+            while self.__heap or self.__in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.__condition.wait(remaining)
+            return True
+
+    def stop(self):
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+
+    def __publish_loop(self):
+        while True:
+            with self.__condition:
+                while not self.__stopped:
+                    if self.__heap:
+                        delay = self.__heap[0][0] - get_clock().monotonic()
+                        if delay <= 0:
+                            break
+                        get_clock().wait(self.__condition, delay)
+                    else:
+                        self.__condition.wait()
+                if self.__stopped:
+                    return
+                ready, sequence, topic, message, send, futures = heapq.heappop(self.__heap)
+                if message is CANCELLED:
+                    self.__condition.notify_all()
+                    continue
+                if topic is not None and self.__pending.get(topic) is not None and self.__pending[topic][1] == sequence:
+                    del self.__pending[topic]
+                self.__in_flight += 1
+            try:
+                result = send(message) if topic is None else send(topic, message)
+                for future in futures:
+                    future.set_result(result)
+            except Exception as e:
+                print(f'Unable to publish {topic or [item[0] for item in message]}:', traceback.format_exc())
+                for future in futures:
+                    future.set_exception(e)
+            finally:
+                with self.__condition:
+                    self.__in_flight -= 1
+                    self.__condition.notify_all()
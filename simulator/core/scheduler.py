@@ -0,0 +1,141 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+import heapq
+import itertools
+import threading
+import traceback
+
+from simulator.core.clock import get_clock
+
+
+class PeriodicTask:
+    """
+    Handle for a callback registered with the PeriodicScheduler.
+    """
+
+    def __init__(self, period, callback, args, name=None):
+        self.period = period
+        self.callback = callback
+        self.args = args
+        self.name = name or getattr(callback, '__name__', 'task')
+        self.cancelled = False
+        self.runs = 0
+        self.skipped = 0  # ticks dropped because the previous run, or another task, overran them
+
+    def cancel(self):
+        PeriodicScheduler().cancel(self)
+
+
+class PeriodicScheduler:
+    """
+    Runs periodic callbacks, typically topic publishers, for every service from a single thread.
+    Tasks are kept in a heap ordered by their next deadline and the thread sleeps until the earliest one is due.
+    Each run is scheduled from the previous deadline rather than from the time the callback finished, so
+    periods do not drift, and ticks missed because a callback overran are skipped instead of run back to back.
+    Callbacks should be short, e.g. a publish, since a slow callback delays the others.
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self._initialized = True
+            self.__heap = []
+            self.__sequence = itertools.count()
+            self.__condition = threading.Condition()
+            self.__worker = None
+
+    def schedule(self, period, callback, *args, align=False, delay=None, name=None) -> PeriodicTask:
+        """
+        Registers a callback to run every period seconds.
+
+        :param period: seconds between two runs
+        :param callback: callable invoked with args on the scheduler thread
+        :param align: True to run on multiples of the period on the wall clock, e.g. at the start of every
+            second or minute, rather than relative to now
+        :param delay: seconds before the first run, defaults to one period, or to the next boundary when aligned
+        :param name: name used in error reports, defaults to the callback's name
+        :return: the task, which can be passed to cancel()
+        """
+        if period <= 0:
+            raise ValueError("period must be positive")
+        task = PeriodicTask(period, callback, args, name)
+        if delay is None:
+            delay = period - (get_clock().time() % period) if align else period
+        with self.__condition:
+            heapq.heappush(self.__heap, (get_clock().monotonic() + delay, next(self.__sequence), task))
+            if self.__worker is None:
+                self.__worker = threading.Thread(target=self.__run_loop, name="periodic-scheduler", daemon=True)
+                self.__worker.start()
+            self.__condition.notify()
+        return task
+
+    def cancel(self, task: PeriodicTask):
+        """
+        Stops a task. Its heap entry is discarded the next time it comes up.
+        """
+        with self.__condition:
+            task.cancelled = True
+            self.__condition.notify()
+
+    def get_tasks(self):
+        with self.__condition:
+            return [task for _, _, task in self.__heap if not task.cancelled]
+
+    def __run_loop(self):
+        while True:
+            with self.__condition:
+                while True:
+                    while self.__heap and self.__heap[0][2].cancelled:
+                        heapq.heappop(self.__heap)
+                    if not self.__heap:
+                        self.__condition.wait()
+                        continue
+                    delay = self.__heap[0][0] - get_clock().monotonic()
+                    if delay <= 0:
+                        break
+                    get_clock().wait(self.__condition, delay)
+                deadline, _, task = heapq.heappop(self.__heap)
+            try:
+                task.callback(*task.args)
+            except Exception:
+                print(f'Periodic task {task.name} failed:', traceback.format_exc())
+            task.runs += 1
+            next_deadline = deadline + task.period
+            now = get_clock().monotonic()
+            if next_deadline <= now:
+                missed = int((now - next_deadline) // task.period) + 1
+                task.skipped += missed
+                next_deadline += missed * task.period
+            with self.__condition:
+                if not task.cancelled:
+                    heapq.heappush(self.__heap, (next_deadline, next(self.__sequence), task))
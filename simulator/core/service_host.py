@@ -0,0 +1,159 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+import argparse
+import functools
+import importlib
+import signal
+import threading
+
+import simulator.utils.constant as CONSTANTS
+
+
+def load_service_class(entity, allow_class_path=False):
+    """
+    Returns the mock service class registered for an entity in MOCK_SERVICES. With allow_class_path, entity
+    may also be the class path of a BaseService which is not bundled, e.g. one in simulator.oem_mockservices.
+    Only allow it for names given on the command line, as it imports whatever module the path names.
+    Returns None if no such service exists.
+    """
+    class_path = CONSTANTS.MOCK_SERVICES.get(entity)
+    if class_path is not None:
+        module_name, class_name = class_path.rsplit(".", 1)
+        return getattr(importlib.import_module(module_name), class_name)
+    if not allow_class_path:
+        return None
+    from simulator.core.abstract_service import BaseService
+    module_name, _, class_name = entity.rpartition(".")
+    try:
+        service_class = getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError, ValueError):
+        return None
+    if not isinstance(service_class, type) or not issubclass(service_class, BaseService):
+        return None
+    return service_class
+
+
+class ServiceHost:
+    """
+    Runs several mock services in one process. The services share the process wide transport connection
+    and proto registry, so running the full vehicle needs a single registry load and a single socket.
+    Each service handles its rpc requests on its own worker threads rather than on the shared receive thread.
+    Given a list of authorities, the host runs a fleet: one instance of every service per authority, each
+    with its own state, topics and rpc methods qualified by the authority. The instances of a service share
+    its publish and rpc worker threads, and every state file is written by one flusher thread, so the thread
+    count does not grow with the fleet.
+    In generic mode, services without a mock service run as a GenericService, so the whole resource catalog
+    can be stood up at once.
+    """
+
+    def __init__(self, entities=None, portal_callback=None, rpc_workers=1, authorities=None, generic=False):
+        """
+        :param entities: entity names of the services to run, defaults to every bundled service, or every
+            service of the resource catalog in generic mode. Class paths are accepted, see load_service_class().
+        :param portal_callback: callback passed to every service, see BaseService
+        :param rpc_workers: number of rpc worker threads per service, 0 shares the transport receive thread
+        :param authorities: names of the vehicles of the fleet, None runs a single vehicle without authority
+        :param generic: True to run a GenericService for entities without a mock service
+        """
+        self.generic = generic
+        if not entities and generic:
+            from simulator.core import protobuf_autoloader
+            entities = protobuf_autoloader.get_services()
+        self.entities = list(entities or CONSTANTS.MOCK_SERVICES.keys())
+        self.portal_callback = portal_callback
+        self.rpc_workers = rpc_workers
+        self.authorities = list(authorities or [None])
+        self.services = {}  # (entity, authority) -> running service
+        self.__stopped = threading.Event()
+
+    def start(self):
+        """
+        Starts the services one after the other, each is ready once the host confirmed its rpc registrations.
+        Returns the entities which could not be started.
+        """
+        failed = []
+        for entity in self.entities:
+            service_class = load_service_class(entity, allow_class_path=True)
+            if service_class is None and self.generic:
+                from simulator.mockservices.generic import GenericService
+                service_class = functools.partial(GenericService, entity)
+            if service_class is None:
+                print(f"No mock service registered for {entity}")
+                failed.append(entity)
+                continue
+            for authority in self.authorities:
+                if authority is None:
+                    service = service_class(self.portal_callback)
+                else:
+                    service = service_class(self.portal_callback, authority=authority)
+                if self.rpc_workers > 0 and service.rpc_workers == 0:
+                    service.set_rpc_workers(self.rpc_workers, service.rpc_serialize_per_resource)
+                service.start()
+                self.services[(entity, authority)] = service
+        print(f"Started {len(self.services)} mock services")
+        return failed
+
+    def stop(self):
+        for service in self.services.values():
+            service.disconnect()
+        self.services.clear()
+        self.__stopped.set()
+
+    def get_service(self, entity, authority=None):
+        return self.services.get((entity, authority))
+
+    def wait(self):
+        """
+        Blocks until stop() is called
+        """
+        while not self.__stopped.wait(1):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs several mock services in one process")
+    parser.add_argument("services", nargs="*",
+                        help="entity names or service class paths to start, all bundled services if omitted")
+    parser.add_argument("--generic", action="store_true",
+                        help="run a generic mock service for services without one, all catalog services if omitted")
+    parser.add_argument("--rpc-workers", type=int, default=1, help="rpc worker threads per service")
+    parser.add_argument("--fleet", type=int, default=0, help="number of vehicles to simulate, 0 for a single one")
+    parser.add_argument("--authority-format", default="vehicle-{}",
+                        help="authority of the n-th vehicle of the fleet, {} is replaced by n")
+    args = parser.parse_args()
+
+    authorities = [args.authority_format.format(n) for n in range(1, args.fleet + 1)]
+    host = ServiceHost(args.services, rpc_workers=args.rpc_workers, authorities=authorities, generic=args.generic)
+    host.start()
+    # installed after the services, which register their own handlers when created
+    signal.signal(signal.SIGINT, lambda sig, frame: host.stop())
+    signal.signal(signal.SIGTERM, lambda sig, frame: host.stop())
+    host.wait()
+
+
+if __name__ == "__main__":
+    main()
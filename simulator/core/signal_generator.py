@@ -0,0 +1,239 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import threading
+import traceback
+
+import numpy as np
+from google.protobuf.descriptor import FieldDescriptor
+
+from simulator.core import protobuf_autoloader
+from simulator.core.clock import get_clock
+from simulator.core.scheduler import PeriodicScheduler
+from simulator.tools.common_methods import get_max, get_min_value
+
+SINE = "sine"
+RAMP = "ramp"
+RANDOM_WALK = "random_walk"
+STEP = "step"
+NOISE = "noise"
+WAVEFORMS = (SINE, RAMP, RANDOM_WALK, STEP, NOISE)
+
+INTEGER_TYPES = (FieldDescriptor.CPPTYPE_INT32, FieldDescriptor.CPPTYPE_INT64, FieldDescriptor.CPPTYPE_UINT32,
+                 FieldDescriptor.CPPTYPE_UINT64)
+UNSIGNED_TYPES = (FieldDescriptor.CPPTYPE_UINT32, FieldDescriptor.CPPTYPE_UINT64)
+FLOAT_TYPES = (FieldDescriptor.CPPTYPE_FLOAT, FieldDescriptor.CPPTYPE_DOUBLE)
+
+
+def get_field_descriptor(message_class, path):
+    """
+    Returns the descriptor of a field of message_class given in dot notation, e.g. pressure.value
+    """
+    descriptor = message_class.DESCRIPTOR
+    field = None
+    for name in path.split("."):
+        field = None if descriptor is None else descriptor.fields_by_name.get(name)
+        if field is None:
+            raise ValueError(f"{message_class.DESCRIPTOR.full_name} has no field {path}")
+        descriptor = field.message_type
+    return field
+
+
+class SignalGenerator:
+    """
+    Computes synthetic values for many fields at once. Every signal is one entry of a set of NumPy arrays,
+    so a tick costs a few array operations whatever the number of fields.
+
+    Waveforms, all kept between the signal's minimum and maximum:
+    sine and ramp repeat every period seconds, step alternates between minimum and maximum every half period,
+    random_walk moves by a normally distributed amount of step times the range on every tick and noise is
+    uniformly distributed.
+    """
+
+    def __init__(self, seed=None):
+        self.__rng = np.random.default_rng(seed)
+        self.__lock = threading.Lock()
+        self.__index = {}  # (topic, field) -> position in the arrays
+        self.__names = []
+        self.__waveform = np.empty(0, dtype=np.int8)
+        self.__minimum = np.empty(0)
+        self.__maximum = np.empty(0)
+        self.__period = np.empty(0)
+        self.__phase = np.empty(0)
+        self.__step = np.empty(0)
+        self.__integer = np.empty(0, dtype=bool)
+        self.__walk = np.empty(0)  # current value of the random walks
+
+    def __len__(self):
+        return len(self.__names)
+
+    def add(self, topic, field, waveform=SINE, minimum=None, maximum=None, period=10.0, phase=0.0, step=0.05,
+            integer=False):
+        """
+        Adds a signal, replacing any existing one for the same topic field.
+
+        :param topic: topic uri the field belongs to
+        :param field: field of the topic message in dot notation
+        :param waveform: one of WAVEFORMS
+        :param minimum: lowest value, by default the minimum of the field in maxmin_field, required if it has none
+        :param maximum: highest value, by default the maximum of the field in maxmin_field, required if it has none
+        :param period: seconds after which sine, ramp and step repeat
+        :param phase: offset of sine, ramp and step as a fraction of the period
+        :param step: standard deviation of a random walk step as a fraction of the range
+        :param integer: True to round values, for integer fields
+        """
+        if waveform not in WAVEFORMS:
+            raise ValueError(f"Unknown waveform {waveform}, expected one of {', '.join(WAVEFORMS)}")
+        if period <= 0:
+            raise ValueError("period must be positive")
+        minimum = get_min_value(field) if minimum is None else minimum
+        maximum = get_max(field) if maximum is None else maximum
+        if minimum is None or maximum is None:
+            raise ValueError(f"No {'minimum' if minimum is None else 'maximum'} is known for {field}, pass one")
+        if minimum > maximum:
+            raise ValueError(f"minimum {minimum} of {field} is above its maximum {maximum}")
+        with self.__lock:
+            self.__remove((topic, field))
+            self.__index[(topic, field)] = len(self.__names)
+            self.__names.append((topic, field))
+            self.__waveform = np.append(self.__waveform, WAVEFORMS.index(waveform))
+            self.__minimum = np.append(self.__minimum, minimum)
+            self.__maximum = np.append(self.__maximum, maximum)
+            self.__period = np.append(self.__period, period)
+            self.__phase = np.append(self.__phase, phase)
+            self.__step = np.append(self.__step, step)
+            self.__integer = np.append(self.__integer, integer)
+            self.__walk = np.append(self.__walk, (minimum + maximum) / 2)
+
+    def remove(self, topic, field):
+        with self.__lock:
+            self.__remove((topic, field))
+
+    def __remove(self, name):
+        position = self.__index.pop(name, None)
+        if position is None:
+            return
+        del self.__names[position]
+        for i, other in enumerate(self.__names[position:], position):
+            self.__index[other] = i
+        for attribute in ("waveform", "minimum", "maximum", "period", "phase", "step", "integer", "walk"):
+            attribute = f"_SignalGenerator__{attribute}"
+            setattr(self, attribute, np.delete(getattr(self, attribute), position))
+
+    def compute(self, t):
+        """
+        Returns the values of all signals at t seconds as an array, in the order the signals were added.
+        Random walks take one step per call.
+        """
+        with self.__lock:
+            count = len(self.__names)
+            low = self.__minimum
+            span = self.__maximum - low
+            cycle = np.mod(t / self.__period + self.__phase, 1.0)
+            self.__walk = np.clip(self.__walk + self.__rng.normal(0.0, 1.0, count) * self.__step * span,
+                                  low, self.__maximum)
+            values = np.choose(self.__waveform, (
+                low + span * (0.5 + 0.5 * np.sin(2 * np.pi * cycle)),  # SINE
+                low + span * cycle,  # RAMP
+                self.__walk,  # RANDOM_WALK
+                np.where(cycle < 0.5, low, self.__maximum),  # STEP
+                low + span * self.__rng.random(count),  # NOISE
+            ))
+            return np.where(self.__integer, np.rint(values), values)
+
+    def tick(self, t):
+        """
+        Returns the values of all signals at t seconds grouped by topic, as {topic: {field: value}}
+        """
+        values = self.compute(t)
+        with self.__lock:
+            names = list(self.__names)
+            integer = self.__integer.tolist()
+        topics = {}
+        for (topic, field), value, is_integer in zip(names, values.tolist(), integer):
+            topics.setdefault(topic, {})[field] = int(value) if is_integer else value
+        return topics
+
+
+class SignalFeed:
+    """
+    Publishes the signals of a SignalGenerator through a mock service every interval seconds,
+    all topics of a tick as one batch.
+    """
+
+    def __init__(self, service, interval=1.0, seed=None):
+        """
+        :param service: the BaseService publishing the signals
+        :param interval: seconds between ticks
+        :param seed: seed of the random waveforms, for reproducible runs
+        """
+        self.service = service
+        self.interval = interval
+        self.generator = SignalGenerator(seed)
+        self.ticks = 0
+        self.__task = None
+        self.__start = None
+
+    def add(self, topic, field, waveform=SINE, **kwargs):
+        """
+        Adds a signal for a numeric field of a topic message, see SignalGenerator.add() for the options.
+        Integer fields are rounded and unsigned ones kept at 0 or above.
+        """
+        message_class = protobuf_autoloader.get_request_class_from_topic_uri(topic)
+        if message_class is None:
+            raise ValueError(f"No message is known for topic {topic}")
+        descriptor = get_field_descriptor(message_class, field)
+        if descriptor.label == FieldDescriptor.LABEL_REPEATED or \
+                descriptor.cpp_type not in INTEGER_TYPES + FLOAT_TYPES:
+            raise ValueError(f"Field {field} of {message_class.DESCRIPTOR.full_name} is not a numeric field")
+        kwargs.setdefault("integer", descriptor.cpp_type in INTEGER_TYPES)
+        if descriptor.cpp_type in UNSIGNED_TYPES:
+            minimum = kwargs.get("minimum")
+            if minimum is None:
+                minimum = get_min_value(field)
+            kwargs["minimum"] = 0 if minimum is None else max(minimum, 0)
+        self.generator.add(topic, field, waveform, **kwargs)
+        return self
+
+    def start(self):
+        self.__start = get_clock().monotonic()
+        self.__task = PeriodicScheduler().schedule(self.interval, self.__tick, name=f"signals-{self.service.service}")
+        return self
+
+    def stop(self):
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+
+    def __tick(self):
+        try:
+            topics = self.generator.tick(get_clock().monotonic() - self.__start)
+            if topics:
+                self.service.publish_many(list(topics.items()))
+            self.ticks += 1
+        except Exception:
+            print(f"Signal feed of {self.service.service} failed:", traceback.format_exc())
@@ -0,0 +1,251 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+import os
+import pickle
+import threading
+import time
+import traceback
+
+DELETED = object()  # marks a key removed from the state in the change log
+LOG_SUFFIX = ".log"
+
+
+class StatePersistence:
+    """
+    Persists a mock service's state dictionary as a snapshot file plus an append-only change log.
+    Changes are recorded per top level key, e.g. one zone or tire, and appended to the log by a background
+    flusher shared by the process, so saving costs as much as the change rather than the whole state and
+    never waits on the disk.
+    Once the log outgrows the snapshot it is folded into a new snapshot. Loading reads the snapshot and
+    replays the log on top of it. The snapshot has the format of the former single pickle file.
+    Instead of being handed changes through record(), the persistence may watch a StateStore, see watch().
+    """
+
+    def __init__(self, path, flush_interval=0.5, min_compact_size=1 << 20, flusher=None):
+        """
+        :param path: snapshot file, the log is written next to it
+        :param flush_interval: seconds changes may wait before being written
+        :param min_compact_size: log size in bytes below which the log is never compacted
+        :param flusher: StateFlusher writing the changes, defaults to the one shared by the whole process
+        """
+        self.path = path
+        self.log_path = path + LOG_SUFFIX
+        self.flush_interval = flush_interval
+        self.min_compact_size = min_compact_size
+        self.__entries = {}  # key -> pickled value as last written, used to build snapshots
+        self.__pending = {}  # key -> pickled value, or DELETED, not written yet
+        self.__snapshot_requested = False
+        self.__log_size = 0
+        self.__snapshot_size = 0
+        self.__writing = False
+        self.__condition = threading.Condition()
+        self.__flusher = flusher or shared_flusher
+        self.__store = None
+        self.__collect_lock = threading.Lock()  # keeps the store's changes in order on their way to __pending
+
+    def load(self) -> dict:
+        """
+        Returns the state from the snapshot and the change log. A record cut short by a crash ends the replay.
+        """
+        state = {}
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+            self.__snapshot_size = os.path.getsize(self.path)
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "rb") as f:
+                while True:
+                    try:
+                        key, value = pickle.load(f)
+                    except EOFError:
+                        break
+                    except (pickle.UnpicklingError, ValueError, AttributeError):
+                        print(f"Ignoring truncated record at the end of {self.log_path}")
+                        break
+                    if value is None:
+                        state.pop(key, None)
+                    else:
+                        state[key] = pickle.loads(value)
+                self.__log_size = f.tell()
+        with self.__condition:
+            self.__entries = {key: pickle.dumps(value) for key, value in state.items()}
+        return state
+
+    def record(self, key, value=DELETED):
+        """
+        Queues the new value of a key, or its removal when no value is given. The value is
+        serialized right away, so it may be modified as soon as this returns.
+        """
+        data = value if value is DELETED else pickle.dumps(value)
+        with self.__condition:
+            self.__pending[key] = data
+        # give further changes the chance to be batched into the same write
+        self.__flusher.schedule(self, self.flush_interval)
+
+    def watch(self, store):
+        """
+        Persists the entries of a StateStore as serialized messages, load() then returns those to restore.
+        A change to an entry only schedules a write, the entry is serialized when it is written, so a burst
+        of changes to it costs a single record.
+        """
+        self.__store = store
+        store.set_change_listener(lambda key: self.__flusher.schedule(self, self.flush_interval))
+
+    def __collect(self):
+        """
+        Queues the entries of the watched store which changed since they were last collected
+        """
+        if self.__store is None or not self.__store.has_unsaved():
+            return
+        with self.__collect_lock:
+            entries = {key: pickle.dumps(data) for key, data in self.__store.take_unsaved().items()}
+            with self.__condition:
+                self.__pending.update(entries)
+
+    def snapshot(self, state: dict):
+        """
+        Queues a full snapshot of state, replacing the log
+        """
+        entries = {key: pickle.dumps(value) for key, value in state.items()}
+        with self.__condition:
+            self.__pending.clear()
+            self.__entries = entries
+            self.__snapshot_requested = True
+        self.__flusher.schedule(self, 0)
+
+    def flush(self, timeout=None) -> bool:
+        """
+        Blocks until every queued change is on disk. Returns False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.__collect()
+        self.__flusher.schedule(self, 0)
+        with self.__condition:
+            while self.__pending or self.__snapshot_requested or self.__writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.__condition.wait(remaining)
+            return True
+
+    def write_pending(self):
+        """
+        Writes the queued changes, called by the flusher
+        """
+        self.__collect()
+        with self.__condition:
+            if not (self.__pending or self.__snapshot_requested):
+                return
+            pending, self.__pending = self.__pending, {}
+            for key, data in pending.items():
+                if data is DELETED:
+                    self.__entries.pop(key, None)
+                else:
+                    self.__entries[key] = data
+            compact = self.__snapshot_requested
+            self.__snapshot_requested = False
+            self.__writing = True
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            if not compact:
+                self.__append(pending)
+                compact = self.__log_size > max(self.min_compact_size, self.__snapshot_size)
+            if compact:
+                self.__compact()
+        except Exception:
+            print("Unable to save state:", traceback.format_exc())
+        finally:
+            with self.__condition:
+                self.__writing = False
+                self.__condition.notify_all()
+
+    def __append(self, pending):
+        with open(self.log_path, "ab") as f:
+            for key, data in pending.items():
+                pickle.dump((key, None if data is DELETED else data), f)
+            f.flush()
+            self.__log_size = f.tell()
+
+    def __compact(self):
+        with self.__condition:
+            entries = dict(self.__entries)
+        state = {key: pickle.loads(data) for key, data in entries.items()}
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self.__snapshot_size = os.path.getsize(self.path)
+        # every change appended so far is part of the snapshot
+        with open(self.log_path, "wb"):
+            pass
+        self.__log_size = 0
+
+
+class StateFlusher:
+    """
+    Writes the changes of several StatePersistence instances from a single background thread, so a process
+    running many services, e.g. a fleet, does not need one writer thread per state file.
+    """
+
+    def __init__(self):
+        self.__due = {}  # StatePersistence -> time.monotonic() at which its changes are written
+        self.__condition = threading.Condition()
+        self.__thread = None
+
+    def schedule(self, persistence, delay):
+        """
+        Has the changes of persistence written within delay seconds
+        """
+        with self.__condition:
+            due = time.monotonic() + delay
+            if persistence in self.__due and self.__due[persistence] <= due:
+                return
+            self.__due[persistence] = due
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__flush_loop, name="state-flusher", daemon=True)
+                self.__thread.start()
+            self.__condition.notify()
+
+    def __flush_loop(self):
+        while True:
+            with self.__condition:
+                while True:
+                    if not self.__due:
+                        self.__condition.wait()
+                        continue
+                    persistence, due = min(self.__due.items(), key=lambda item: item[1])
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        del self.__due[persistence]
+                        break
+                    self.__condition.wait(remaining)
+            persistence.write_pending()
+
+
+shared_flusher = StateFlusher()  # flusher of every StatePersistence created without one
@@ -0,0 +1,226 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+import threading
+
+from google.protobuf.json_format import ParseDict
+from google.protobuf.message import DecodeError, Message
+
+
+class StateStore:
+    """
+    Keeps a mock service's state as live protobuf messages, keyed by name, e.g. a zone or tire name.
+    Each entry may be bound to the topic it is published on. Fields are updated in place through
+    set_fields(), which records which entries changed since they were last published, so that
+    publishing an entry only needs a copy of its message instead of rebuilding it from a dictionary.
+    Entries changed since they were last saved are tracked separately, see StatePersistence.watch().
+    """
+
+    def __init__(self):
+        self.__messages = {}
+        self.__topics = {}  # key -> topic uri the entry is published on
+        self.__dirty = set()
+        self.__unsaved = set()
+        self.__saved = {}  # key -> serialized message restored by restore(), applied when the entry is registered
+        self.__change_listener = None
+        self.__lock = threading.RLock()
+
+    @property
+    def lock(self):
+        """
+        Lock held while the store is modified, hold it to read several fields consistently
+        """
+        return self.__lock
+
+    def register(self, key, message, topic=None, **fields):
+        """
+        Adds an entry to the store.
+
+        :param key: name of the entry
+        :param message: message class, or message instance used as the initial state
+        :param topic: optional topic uri the entry is published on
+        :param fields: initial field values, see set_fields()
+        :return: the live message
+        """
+        with self.__lock:
+            if isinstance(message, type):
+                message = message()
+            self.__messages[key] = message
+            if topic is not None:
+                self.__topics[key] = topic
+            self.set_fields(key, **fields)
+            if key in self.__saved:
+                self.__restore_entry(key)
+            else:
+                self.__changed(key)
+            return message
+
+    def restore(self, entries):
+        """
+        Restores entries saved by a previous run, a dictionary of key -> serialized message. Entries which are
+        not registered yet get their saved state when they are.
+        """
+        with self.__lock:
+            self.__saved.update(entries)
+            for key in entries:
+                if key in self.__messages:
+                    self.__restore_entry(key)
+
+    def __restore_entry(self, key):
+        data = self.__saved.pop(key)
+        try:
+            self.__messages[key].ParseFromString(data)
+        except DecodeError:
+            print(f"Unable to restore the saved state of {key}")
+            self.__changed(key)
+            return
+        # the restored state has yet to be published, but is already saved
+        self.__dirty.add(key)
+        self.__unsaved.discard(key)
+
+    def set_change_listener(self, listener):
+        """
+        Calls listener(key) whenever an entry changes. It is called with the store locked and must not block.
+        """
+        with self.__lock:
+            self.__change_listener = listener
+
+    def __changed(self, key):
+        self.__dirty.add(key)
+        self.__unsaved.add(key)
+        if self.__change_listener is not None:
+            self.__change_listener(key)
+
+    def get(self, key):
+        """
+        Returns the live message of an entry. Changes made to it directly are not tracked, call mark_dirty().
+        """
+        return self.__messages[key]
+
+    def __getitem__(self, key):
+        return self.__messages[key]
+
+    def __contains__(self, key):
+        return key in self.__messages
+
+    def keys(self):
+        return self.__messages.keys()
+
+    def items(self):
+        return self.__messages.items()
+
+    def get_topic(self, key):
+        return self.__topics.get(key)
+
+    def set_field(self, key, path, value) -> bool:
+        """
+        Sets one field of an entry. path may address a nested field with dot notation, e.g. "fan.speed".
+        Messages are copied, lists replace repeated fields and dictionaries are parsed into message fields.
+        Returns True if the entry changed.
+        """
+        with self.__lock:
+            parent = self.__messages[key]
+            *parents, name = path.split(".")
+            for part in parents:
+                parent = getattr(parent, part)
+            field = parent.DESCRIPTOR.fields_by_name[name]
+            if field.label == field.LABEL_REPEATED:
+                container = getattr(parent, name)
+                if field.message_type is not None and field.message_type.GetOptions().map_entry:
+                    container.clear()
+                    container.update(value)
+                else:
+                    del container[:]
+                    container.extend(value)
+            elif field.message_type is not None:
+                target = getattr(parent, name)
+                if isinstance(value, Message):
+                    target.CopyFrom(value)
+                else:
+                    target.Clear()
+                    ParseDict(value, target)
+            elif getattr(parent, name) == value:
+                return False
+            else:
+                setattr(parent, name, value)
+            self.__changed(key)
+            return True
+
+    def set_fields(self, key, **fields) -> bool:
+        """
+        Sets several fields of an entry, e.g. set_fields("row1_left", temperature=22).
+        Use set_field() with a dotted path to set a single nested field. Returns True if the entry changed.
+        """
+        changed = False
+        with self.__lock:
+            for path, value in fields.items():
+                changed = self.set_field(key, path, value) or changed
+        return changed
+
+    def update(self, key, message):
+        """
+        Replaces the state of an entry with a copy of message
+        """
+        with self.__lock:
+            self.__messages[key].CopyFrom(message)
+            self.__changed(key)
+
+    def mark_dirty(self, key):
+        """
+        Records a change made to the live message of an entry directly, so it is published and saved
+        """
+        with self.__lock:
+            self.__changed(key)
+
+    def is_dirty(self, key):
+        return key in self.__dirty
+
+    def dirty_keys(self):
+        with self.__lock:
+            return [key for key in self.__messages if key in self.__dirty]
+
+    def snapshot(self, key, clear_dirty=True):
+        """
+        Returns a copy of an entry, safe to hand to another thread while the entry keeps changing
+        """
+        with self.__lock:
+            message = self.__messages[key]
+            copy = type(message)()
+            copy.CopyFrom(message)
+            if clear_dirty:
+                self.__dirty.discard(key)
+            return copy
+
+    def take_unsaved(self) -> dict:
+        """
+        Returns the entries changed since the last call as a dictionary of key -> serialized message
+        """
+        with self.__lock:
+            unsaved, self.__unsaved = self.__unsaved, set()
+            return {key: self.__messages[key].SerializeToString(deterministic=True) for key in unsaved}
+
+    def has_unsaved(self) -> bool:
+        return bool(self.__unsaved)
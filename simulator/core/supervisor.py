@@ -0,0 +1,309 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+import argparse
+import multiprocessing
+import signal
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+
+from uprotocol.uri.serializer.longuriserializer import LongUriSerializer
+
+from simulator.core.process_transport import ProcessTransport, encode, decode
+from simulator.core.service_host import load_service_class
+from simulator.core.transport_layer import TransportLayer
+import simulator.utils.constant as CONSTANTS
+
+RESTART_INITIAL_DELAY = 0.5
+RESTART_MAX_DELAY = 30
+STABLE_RUN_TIME = 60  # seconds a worker must run before its restart delay is reset
+
+# transport calls a worker may forward to the supervisor
+FORWARDED_CALLS = {"start_service", "create_topic", "authenticate", "send", "send_batch", "register_listener",
+                   "register_listeners",
+                   "register_wildcard_listener", "unregister_listener", "unregister_wildcard_listener",
+                   "register_rpc_listener", "register_rpc_listeners", "invoke_method", "get_outbound_metrics"}
+
+
+def run_worker(target, conn, rpc_workers):
+    """
+    Entry point of a worker process, runs one mock service on a ProcessTransport until the pipe closes
+    """
+    TransportLayer.default_transport = "PROCESS"
+    transport = ProcessTransport()
+    transport.attach(conn)
+    service = load_service_class(target, allow_class_path=True)()
+    if rpc_workers > 0 and service.rpc_workers == 0:
+        service.set_rpc_workers(rpc_workers, service.rpc_serialize_per_resource)
+    service.start()
+    transport.wait_closed()
+
+
+class ListenerProxy:
+    """
+    Registered with the host connection in place of a listener or callback living in a worker process
+    """
+
+    def __init__(self, worker, conn, handle):
+        self.worker = worker
+        self.conn = conn  # pipe of the worker process the handle belongs to, a restarted worker has a new one
+        self.handle = handle
+
+    def on_receive(self, umsg):
+        self.worker.post("listener", self.handle, encode((umsg,)), self.conn)
+
+    def __call__(self, *args):
+        self.worker.post("callback", self.handle, encode(args), self.conn)
+
+
+class Worker:
+    """
+    A mock service running in its own process, and the supervisor side of its pipe
+    """
+
+    def __init__(self, target, transport_layer, rpc_workers, context):
+        self.target = target
+        self.transport_layer = transport_layer
+        self.rpc_workers = rpc_workers
+        self.context = context
+        self.process = None
+        self.conn = None
+        self.started_at = 0
+        self.restarts = 0
+        self.restart_delay = RESTART_INITIAL_DELAY
+        self.__send_lock = threading.Lock()
+        self.__proxies = {}  # handle -> ListenerProxy
+        # (method, topic | pattern | entity, handle) -> (uri | pattern | topics, proxy) registered for the worker
+        self.__subscriptions = {}
+
+    def start(self):
+        self.conn, child_conn = self.context.Pipe()
+        self.__proxies = {}
+        self.__subscriptions = {}
+        self.process = self.context.Process(target=run_worker, args=(self.target, child_conn, self.rpc_workers),
+                                            name=f"mock-{self.target}", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.started_at = time.monotonic()
+        threading.Thread(target=self.__serve, args=(self.conn,), name=f"supervisor-{self.target}",
+                         daemon=True).start()
+
+    def stop(self, timeout=2):
+        if self.process is None:
+            return
+        self.conn.close()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.release()
+
+    def release(self):
+        """
+        Drops the subscriptions and create topic status callbacks held for the worker, whose proxies point at
+        its closed pipe. Its rpc registrations are replaced once it restarts.
+        """
+        for (method, _, _), (uri, proxy) in list(self.__subscriptions.items()):
+            try:
+                if method == "register_wildcard_listener":
+                    self.transport_layer.unregister_wildcard_listener(uri, proxy)
+                elif method == "create_topic":
+                    self.transport_layer.unregister_create_topic_callback(uri, proxy)
+                else:
+                    self.transport_layer.unregister_listener(uri, proxy)
+            except Exception:
+                print(f"Unable to release subscription of {self.target}:", traceback.format_exc())
+        self.__subscriptions.clear()
+
+    def post(self, kind, key, value, conn=None):
+        try:
+            with self.__send_lock:
+                (conn or self.conn).send((kind, key, value))
+        except (OSError, ValueError):
+            print(f"Dropping {kind} for {self.target}, worker is not running")
+
+    def __proxy(self, handle):
+        proxy = self.__proxies.get(handle)
+        if proxy is None:
+            proxy = self.__proxies[handle] = ListenerProxy(self, self.conn, handle)
+        return proxy
+
+    def __serve(self, conn):
+        while True:
+            try:
+                kind, call_id, method, args = conn.recv()
+            except (EOFError, OSError):
+                return
+            if method not in FORWARDED_CALLS:
+                self.post("error", call_id, f"{method} cannot be forwarded")
+                continue
+            try:
+                args = decode(args, self.__proxy)
+                result = getattr(self.transport_layer, method)(*args)
+                self.__track(method, args)
+            except Exception as e:
+                print(f"{method} failed for {self.target}:", traceback.format_exc())
+                if kind == "call":
+                    self.post("error", call_id, str(e))
+                continue
+            if kind != "call":
+                if result is not None and result.code != 0:
+                    print(f"Send from {self.target} failed: {result.message}")
+            elif isinstance(result, Future):
+                result.add_done_callback(lambda future, call_id=call_id: self.__complete(call_id, future))
+            else:
+                self.post("result", call_id, encode(result))
+
+    def __complete(self, call_id, future):
+        if future.exception() is not None:
+            self.post("error", call_id, str(future.exception()))
+        else:
+            self.post("result", call_id, encode(future.result()))
+
+    def __track(self, method, args):
+        # remember the subscriptions and callbacks registered for the worker, to drop them if it dies
+        if method == "create_topic":
+            self.__subscriptions[(method, args[0], args[2].handle)] = (args[1], args[2])
+        elif method == "register_listener":
+            self.__subscriptions[(method, LongUriSerializer().serialize(args[0]), args[1].handle)] = args[:2]
+        elif method == "register_listeners":
+            for uri in args[0]:
+                self.__subscriptions[("register_listener", LongUriSerializer().serialize(uri), args[1].handle)] = \
+                    (uri, args[1])
+        elif method == "register_wildcard_listener":
+            self.__subscriptions[(method, args[0], args[2].handle)] = (args[0], args[2])
+        elif method == "unregister_listener":
+            self.__subscriptions.pop(("register_listener", LongUriSerializer().serialize(args[0]), args[1].handle),
+                                     None)
+        elif method == "unregister_wildcard_listener":
+            self.__subscriptions.pop(("register_wildcard_listener", args[0], args[1].handle), None)
+
+
+class ServiceSupervisor:
+    """
+    Runs each mock service in its own worker process, so CPU heavy handlers in one service do not hold up
+    the others, while all of them share the supervisor's single host connection. Workers that exit with an
+    error are restarted with a backoff that grows with every crash in a row.
+    """
+
+    def __init__(self, targets=None, rpc_workers=1, start_method="spawn"):
+        """
+        :param targets: entity names of bundled services, see MOCK_SERVICES, or class paths such as
+            simulator.oem_mockservices.my_service.MyService. Defaults to every bundled service.
+        :param rpc_workers: number of rpc worker threads in each worker process
+        :param start_method: multiprocessing start method, spawn avoids inheriting the supervisor's threads
+        """
+        self.targets = list(targets or CONSTANTS.MOCK_SERVICES.keys())
+        self.transport_layer = TransportLayer()
+        context = multiprocessing.get_context(start_method)
+        self.workers = [Worker(target, self.transport_layer, rpc_workers, context) for target in self.targets]
+        self.__stopped = threading.Event()
+        self.__restart_lock = threading.Lock()  # keeps the monitor from restarting a worker while stopping
+        self.__restarts = {}  # crashed worker -> time.monotonic() at which it is restarted, used by the monitor
+        self.__running = set()  # workers whose exit the monitor has not handled yet, used by the monitor
+
+    def start(self):
+        for target in self.targets:
+            if load_service_class(target, allow_class_path=True) is None:
+                raise ValueError(f"No mock service found for {target}")
+        for worker in self.workers:
+            worker.start()
+        self.__running = set(self.workers)
+        threading.Thread(target=self.__monitor, name="supervisor-monitor", daemon=True).start()
+
+    def stop(self):
+        with self.__restart_lock:
+            self.__stopped.set()
+        for worker in self.workers:
+            worker.stop()
+
+    def wait(self):
+        while not self.__stopped.wait(1):
+            pass
+
+    def __monitor(self):
+        while not self.__stopped.is_set():
+            # the sentinel of a worker that died before this point is ready at once, so no exit is missed
+            sentinels = {worker.process.sentinel: worker for worker in self.__running}
+            # wake up for the next scheduled restart, other workers may crash while it is pending
+            timeout = min([1] + [due - time.monotonic() for due in self.__restarts.values()])
+            if sentinels:
+                ready = wait(list(sentinels), timeout=max(timeout, 0))
+            else:
+                ready = []
+                self.__stopped.wait(max(timeout, 0))
+            if self.__stopped.is_set():
+                return
+            for sentinel in ready:
+                worker = sentinels[sentinel]
+                self.__running.discard(worker)
+                worker.process.join()
+                worker.release()
+                if worker.process.exitcode == 0:
+                    print(f"Mock service {worker.target} exited")
+                    continue
+                self.__schedule_restart(worker)
+            self.__restart_due_workers()
+
+    def __schedule_restart(self, worker):
+        if time.monotonic() - worker.started_at > STABLE_RUN_TIME:
+            worker.restart_delay = RESTART_INITIAL_DELAY
+        print(f"Mock service {worker.target} crashed with exit code {worker.process.exitcode}, "
+              f"restarting in {worker.restart_delay} s")
+        self.__restarts[worker] = time.monotonic() + worker.restart_delay
+        worker.restart_delay = min(worker.restart_delay * 2, RESTART_MAX_DELAY)
+
+    def __restart_due_workers(self):
+        now = time.monotonic()
+        for worker, due in list(self.__restarts.items()):
+            if due <= now:
+                del self.__restarts[worker]
+                with self.__restart_lock:
+                    if self.__stopped.is_set():
+                        return
+                    worker.restarts += 1
+                    worker.start()
+                self.__running.add(worker)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs each mock service in its own process")
+    parser.add_argument("services", nargs="*",
+                        help="entity names or service class paths to start, all bundled services if omitted")
+    parser.add_argument("--rpc-workers", type=int, default=1, help="rpc worker threads per service")
+    args = parser.parse_args()
+
+    supervisor = ServiceSupervisor(args.services, rpc_workers=args.rpc_workers)
+    signal.signal(signal.SIGINT, lambda sig, frame: supervisor.stop())
+    signal.signal(signal.SIGTERM, lambda sig, frame: supervisor.stop())
+    supervisor.start()
+    supervisor.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+import csv
+import json
+import os
+import threading
+import traceback
+from datetime import datetime
+
+from simulator.core.clock import get_clock
+
+TIMESTAMP_FIELD = "timestamp"
+TOPIC_FIELD = "topic"
+MAX_PENDING_PUBLISHES = 256  # publishes of a replay queued at most before it waits for the transport
+STOP_CHECK_INTERVAL = 0.1  # real seconds between checks for stop() while waiting for the transport
+
+
+def parse_timestamp(value):
+    """
+    Returns a trace timestamp in seconds, given as a number of seconds or an ISO 8601 date and time
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def parse_csv_value(value):
+    """
+    Converts a CSV cell to a number, boolean, list or dictionary when it is written as one in JSON,
+    otherwise keeps it as a string, e.g. an enum name
+    """
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def read_trace(path):
+    """
+    Streams the records of a trace file one at a time, without loading the file, as (timestamp, topic, fields).
+
+    CSV files have a header with a timestamp and a topic column, every other column is a field of the topic
+    message, nested fields in dot notation such as pressure.value. Empty cells are left out of the record.
+    JSONL files have one object per line with timestamp and topic keys and the fields either in a "fields"
+    object or as the remaining keys.
+    """
+    if os.path.splitext(path)[1].lower() == ".csv":
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                timestamp = parse_timestamp(row.pop(TIMESTAMP_FIELD))
+                topic = row.pop(TOPIC_FIELD)
+                fields = {name: parse_csv_value(value) for name, value in row.items() if value not in (None, "")}
+                yield timestamp, topic, fields
+    else:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                timestamp = parse_timestamp(record.pop(TIMESTAMP_FIELD))
+                topic = record.pop(TOPIC_FIELD)
+                yield timestamp, topic, record.pop("fields", record)
+
+
+class TraceReplay:
+    """
+    Publishes a recorded trace through a mock service, keeping the timing of the recording scaled by a speed
+    factor, e.g. 10 replays ten times faster than recorded. Records are read from the file as they are due, so
+    traces of any length replay in constant memory. Records sharing a timestamp are published as one batch.
+    When publishing cannot keep up with the speed factor, records are sent as fast as possible, none is skipped.
+    No more records are read while max_pending publishes wait in the service's publish pipeline, and the
+    transport holds up the pipeline once its own queue is full, so a slow host slows the replay down instead
+    of the queues growing with the trace.
+    """
+
+    def __init__(self, service, path, speed=1.0, loop=False, max_pending=MAX_PENDING_PUBLISHES):
+        """
+        :param service: the BaseService publishing the trace
+        :param path: CSV or JSONL trace file, see read_trace()
+        :param speed: replay speed relative to the recording
+        :param loop: True to restart from the beginning at the end of the trace
+        :param max_pending: number of publishes queued at most before the replay waits for the transport
+        """
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.service = service
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.max_pending = max_pending
+        self.published = 0
+        self.max_lag = 0  # seconds the replay fell furthest behind the schedule
+        self.__stopped = False
+        self.__condition = threading.Condition()  # notified when the replay is stopped
+        self.__thread = None
+
+    def start(self):
+        with self.__condition:
+            self.__stopped = False
+        self.__thread = threading.Thread(target=self.__run, name=f"replay-{os.path.basename(self.path)}", daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+
+    def wait(self, timeout=None) -> bool:
+        """
+        Blocks until the trace has been replayed or the replay stopped. Returns False if the timeout expired first.
+        """
+        self.__thread.join(timeout)
+        return not self.__thread.is_alive()
+
+    def __run(self):
+        try:
+            while not self.__stopped:
+                self.__replay_once()
+                if not self.loop:
+                    break
+        except Exception:
+            print(f"Replay of {self.path} failed:", traceback.format_exc())
+
+    def __replay_once(self):
+        start = None
+        batch = []
+        batch_time = None
+        for timestamp, topic, fields in read_trace(self.path):
+            if start is None:
+                start = (timestamp, get_clock().monotonic())
+            if batch and timestamp != batch_time:
+                self.__publish(batch)
+                batch = []
+            if not batch:
+                batch_time = timestamp
+                # wait until the record is due, scaled by the speed factor
+                due = start[1] + (timestamp - start[0]) / self.speed
+                delay = due - get_clock().monotonic()
+                if delay > 0:
+                    if self.__wait_until(due):
+                        return
+                else:
+                    self.max_lag = max(self.max_lag, -delay)
+            if self.__stopped:
+                return
+            batch.append((topic, fields))
+        if batch:
+            self.__publish(batch)
+
+    def __wait_until(self, due) -> bool:
+        """
+        Waits until the monotonic time of the simulation clock reaches due. Returns True if the replay was stopped.
+        """
+        with self.__condition:
+            while not self.__stopped:
+                delay = due - get_clock().monotonic()
+                if delay <= 0:
+                    break
+                get_clock().wait(self.__condition, delay)
+            return self.__stopped
+
+    def __publish(self, batch):
+        while not self.service.publish_pipeline.wait_for_room(self.max_pending, STOP_CHECK_INTERVAL):
+            if self.__stopped:
+                return
+        if len(batch) == 1:
+            self.service.publish(*batch[0])
+        else:
+            self.service.publish_many(batch)
+        self.published += len(batch)
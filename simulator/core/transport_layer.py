@@ -35,11 +35,13 @@ from uprotocol.rpc.calloptions import CallOptions
 from uprotocol.transport.ulistener import UListener
 
 from simulator.core.binder_utransport import AndroidBinder
+from simulator.core.process_transport import ProcessTransport
 
 
 class TransportLayer:
     _instance = None
     _initialized = False
+    default_transport = "BINDER"  # PROCESS in worker processes of the ServiceSupervisor
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
@@ -53,7 +55,7 @@ class TransportLayer:
             self.__instance = None
             self.__ZENOH_IP = '10.0.3.3'
             self.__ZENOH_PORT = 9090
-            self.__utransport = "BINDER"
+            self.__utransport = self.default_transport
             self._update_instance()
 
     def set_transport(self, transport: str):
@@ -74,6 +76,8 @@ class TransportLayer:
     def _update_instance(self):
         if self.__utransport == "BINDER":
             self.__instance = AndroidBinder()
+        elif self.__utransport == "PROCESS":
+            self.__instance = ProcessTransport()
 
     def invoke_method(self, topic: UUri, payload: UPayload, calloptions: CallOptions) -> Future:
         return self.__instance.invoke_method(topic, payload, calloptions)
@@ -84,21 +88,45 @@ class TransportLayer:
     def send(self, umessage: UMessage) -> UStatus:
         return self.__instance.send(umessage)
 
+    def send_batch(self, umessages) -> UStatus:
+        return self.__instance.send_batch(umessages)
+
     def register_listener(self, topic: UUri, listener: UListener) -> UStatus:
         return self.__instance.register_listener(topic, listener)
 
+    def register_listeners(self, topics, listener: UListener) -> dict:
+        return self.__instance.register_listeners(topics, listener)
+
+    def register_wildcard_listener(self, pattern: str, topics, listener: UListener) -> UStatus:
+        return self.__instance.register_wildcard_listener(pattern, topics, listener)
+
     def unregister_listener(self, topic: UUri, listener: UListener) -> UStatus:
         return self.__instance.unregister_listener(topic, listener)
 
+    def unregister_wildcard_listener(self, pattern: str, listener: UListener) -> UStatus:
+        return self.__instance.unregister_wildcard_listener(pattern, listener)
+
     def register_rpc_listener(self, topic: UUri, listener: UListener) -> UStatus:
         return self.__instance.register_rpc_listener(topic, listener)
 
+    def register_rpc_listeners(self, listeners) -> dict:
+        return self.__instance.register_rpc_listeners(listeners)
+
     def start_service(self, entity) -> bool:
-        if self.__utransport == "BINDER":
+        if self.__utransport in ("BINDER", "PROCESS"):
             return self.__instance.start_service(entity)
         else:
             return True
 
     def create_topic(self, entity, topics, listener):
-        if self.__utransport == "BINDER":
+        if self.__utransport in ("BINDER", "PROCESS"):
             return self.__instance.create_topic(entity, topics, listener)
+
+    def unregister_create_topic_callback(self, topics, listener):
+        if self.__utransport == "BINDER":
+            self.__instance.unregister_create_topic_callback(topics, listener)
+
+    def get_outbound_metrics(self):
+        if self.__utransport in ("BINDER", "PROCESS"):
+            return self.__instance.get_outbound_metrics()
+        return {}
@@ -0,0 +1,159 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+import threading
+
+WILDCARD = "*"
+URI_PREFIX = "up:"
+
+
+def is_wildcard(uri: str) -> bool:
+    return WILDCARD in uri
+
+
+def split_long_uri(uri: str, fill=""):
+    """
+    Splits a long uri such as up://vcu.vin/chassis/1/tire.front_left#Tire into its six components
+    [authority, entity, version, resource name, resource instance, message].
+
+    :param uri: the long uri string, with or without the up: prefix
+    :param fill: value used for components the uri leaves out. Patterns pass WILDCARD so that a pattern
+        which stops early, such as /chassis/1/*, matches everything below it.
+    """
+    if uri.startswith(URI_PREFIX):
+        uri = uri[len(URI_PREFIX):]
+    authority = ""
+    if uri.startswith("//"):
+        authority, _, uri = uri[2:].partition("/")
+        uri = "/" + uri
+    parts = uri.strip("/").split("/", 2)
+    while len(parts) < 3:
+        parts.append(fill)
+    entity, version, resource = parts
+    resource, has_message, message = resource.partition("#")
+    name, has_instance, instance = resource.partition(".")
+    if not name:
+        name = fill
+    if not has_instance:
+        instance = fill
+    if not has_message:
+        message = fill
+    return [authority, entity or fill, version, name, instance, message]
+
+
+class UriTrie:
+    """
+    Stores listeners under uri patterns and finds every listener whose pattern matches a concrete topic uri.
+    A pattern component of "*" matches any value in that position. The lookup walks at most two branches per
+    level of a fixed six level tree, so its cost does not grow with the number of registered patterns.
+    """
+
+    def __init__(self):
+        self.__root = {}
+        self.__listeners = {}  # pattern -> listeners, also the terminal node of the pattern
+        self.__lock = threading.Lock()
+
+    def insert(self, pattern: str, listener) -> bool:
+        """
+        Registers a listener for a pattern. Returns False if the listener was already registered for it.
+        """
+        with self.__lock:
+            node = self.__root
+            for component in split_long_uri(pattern, WILDCARD):
+                node = node.setdefault(component, {})
+            listeners = node.setdefault(None, [])
+            if listener in listeners:
+                return False
+            # copy on write so the receive thread can iterate without holding the lock
+            node[None] = listeners + [listener]
+            self.__listeners[pattern] = node[None]
+            return True
+
+    def remove(self, pattern: str, listener) -> bool:
+        """
+        Removes a listener from a pattern, pruning branches that become empty. Returns False if it was not found.
+        """
+        with self.__lock:
+            path = [self.__root]
+            for component in split_long_uri(pattern, WILDCARD):
+                node = path[-1].get(component)
+                if node is None:
+                    return False
+                path.append(node)
+            listeners = path[-1].get(None, [])
+            if listener not in listeners:
+                return False
+            listeners = [registered for registered in listeners if registered != listener]
+            if listeners:
+                path[-1][None] = listeners
+                self.__listeners[pattern] = listeners
+                return True
+            del path[-1][None]
+            self.__listeners.pop(pattern, None)
+            components = split_long_uri(pattern, WILDCARD)
+            for depth in range(len(components), 0, -1):
+                if path[depth]:
+                    break
+                del path[depth - 1][components[depth - 1]]
+            return True
+
+    def match(self, uri: str):
+        """
+        Returns the listeners of every pattern matching the concrete uri
+        """
+        nodes = [self.__root]
+        for component in split_long_uri(uri):
+            next_nodes = []
+            for node in nodes:
+                child = node.get(component)
+                if child is not None:
+                    next_nodes.append(child)
+                if component != WILDCARD:
+                    child = node.get(WILDCARD)
+                    if child is not None:
+                        next_nodes.append(child)
+            if not next_nodes:
+                return []
+            nodes = next_nodes
+        listeners = []
+        for node in nodes:
+            for listener in node.get(None, []):
+                if listener not in listeners:
+                    listeners.append(listener)
+        return listeners
+
+    def matches(self, uri: str) -> bool:
+        return len(self.match(uri)) > 0
+
+    def patterns(self):
+        with self.__lock:
+            return list(self.__listeners.keys())
+
+    def listeners(self, pattern: str):
+        return self.__listeners.get(pattern, [])
+
+    def __len__(self):
+        return len(self.__listeners)
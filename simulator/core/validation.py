@@ -0,0 +1,188 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import operator
+
+from simulator.core.exceptions import ValidationError
+
+
+def enum_values(enum_type, exclude=()):
+    """
+    Returns the set of values of a protobuf enum, e.g. enum_values(AirDistribution, exclude=["AD_OFF"])
+
+    :param enum_type: the enum wrapper of a generated module, such as RideHeight.RideHeightLevel
+    :param exclude: names of the values to leave out
+    """
+    return frozenset(value for value in enum_type.values() if enum_type.Name(value) not in exclude)
+
+
+class Rule:
+    """
+    A check of a request. Rules are compiled once into a function raising a ValidationError with the rule's
+    code when the request fails the check.
+
+    The message may be a string, formatted with the service, the request and the value of the checked field,
+    e.g. "Unsupported brake name: {value}", or a function of the service and the request returning it.
+    """
+
+    def __init__(self, code=2, message="Validation Error.", when=None, request_class=None):
+        """
+        :param code: code of the ValidationError raised when the check fails
+        :param message: message of the ValidationError
+        :param when: optional function of the service and the request, the rule only applies if it returns True
+        :param request_class: optional request class, or tuple of classes, the rule applies to
+        """
+        self.code = code
+        self.message = message
+        self.when = when
+        self.request_class = request_class
+
+    def compile_test(self):
+        """
+        Returns a function of the service and the request, True if the request passes the check
+        """
+        raise NotImplementedError
+
+    def get_value(self, request):
+        return None
+
+    def compile(self):
+        test = self.compile_test()
+        when = self.when
+        request_class = self.request_class
+        code = self.code
+        message = self.message
+
+        def check(service, request):
+            if request_class is not None and not isinstance(request, request_class):
+                return
+            if when is not None and not when(service, request):
+                return
+            if not test(service, request):
+                if callable(message):
+                    raise ValidationError(code, message(service, request))
+                raise ValidationError(code, message.format(service=service, request=request,
+                                                           value=self.get_value(request)))
+
+        return check
+
+
+class Range(Rule):
+    """
+    Checks that a numeric field of the request is within minimum and maximum, both included
+    """
+
+    def __init__(self, field, minimum=None, maximum=None, **kwargs):
+        """
+        :param field: field of the request in dot notation, e.g. zone.blower_level
+        :param minimum: lowest valid value, or a function of the service returning it, None for no minimum
+        :param maximum: highest valid value, or a function of the service returning it, None for no maximum
+        """
+        super().__init__(**kwargs)
+        self.field = field
+        self.minimum = minimum
+        self.maximum = maximum
+        self.__getter = operator.attrgetter(field)
+
+    def get_value(self, request):
+        return self.__getter(request)
+
+    def compile_test(self):
+        getter = self.__getter
+        minimum = self.minimum
+        maximum = self.maximum
+        if not callable(minimum) and not callable(maximum):
+            low = float("-inf") if minimum is None else minimum
+            high = float("inf") if maximum is None else maximum
+            return lambda service, request: low <= getter(request) <= high
+
+        def test(service, request):
+            value = getter(request)
+            low = minimum(service) if callable(minimum) else minimum
+            high = maximum(service) if callable(maximum) else maximum
+            return (low is None or value >= low) and (high is None or value <= high)
+
+        return test
+
+
+class AllowedValues(Rule):
+    """
+    Checks that a field of the request has one of a set of values, see enum_values() for enum fields
+    """
+
+    def __init__(self, field, values, **kwargs):
+        """
+        :param field: field of the request in dot notation, e.g. zone.air_distribution
+        :param values: the valid values
+        """
+        super().__init__(**kwargs)
+        self.field = field
+        self.values = frozenset(values)
+        self.__getter = operator.attrgetter(field)
+
+    def get_value(self, request):
+        return self.__getter(request)
+
+    def compile_test(self):
+        getter = self.__getter
+        values = self.values
+        return lambda service, request: getter(request) in values
+
+
+class Precondition(Rule):
+    """
+    Checks a condition on the request and the service's state, such as a precondition set by a feature file
+    """
+
+    def __init__(self, predicate, **kwargs):
+        """
+        :param predicate: function of the service and the request, True if the request is valid
+        """
+        super().__init__(**kwargs)
+        self.predicate = predicate
+
+    def compile_test(self):
+        return self.predicate
+
+
+class Validator:
+    """
+    A list of rules compiled into one validation function, checked in order. Define it once as a class
+    attribute of the mock service and call validate() for each request.
+    """
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        self.__checks = tuple(rule.compile() for rule in self.rules)
+
+    def validate(self, service, request):
+        """
+        Raises a ValidationError for the first rule the request fails. Returns True if it passes all of them.
+        """
+        for check in self.__checks:
+            check(service, request)
+        return True
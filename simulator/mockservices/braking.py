@@ -34,24 +34,38 @@ from uprotocol.transport.ulistener import UListener
 
 from simulator.core.abstract_service import BaseService
 from simulator.core.exceptions import ValidationError
+from simulator.core.validation import AllowedValues, Precondition, Validator
 from simulator.utils.constant import KEY_URI_PREFIX
 
+S_OK = HealthState.State.Value("S_OK")
+S_DISABLED = HealthState.State.Value("S_DISABLED")
+S_UNSUPPORTED = HealthState.State.Value("S_UNSUPPORTED")
+
 
 class BrakingService(BaseService):
     """
     The BrakingService object handles mock services for the lighting interior service
     """
 
-    brake_names = []
     timeout = 9  # timeout time in seconds for discovery service
-    state = {}
-
-    def __init__(self, portal_callback=None):
+    validation_rules = Validator([
+        AllowedValues("name", ["brake_pads.front", "brake_pads.rear"], code=12,
+                      message="Unsupported brake name: {value}",
+                      request_class=(ResetHealthRequest, ManageHealthMonitoringRequest)),
+        Precondition(lambda service, request: service.state_store[request.name].health.state != S_UNSUPPORTED, code=2,
+                     message=lambda service, request: f"Heath state for {request.name} set to "
+                     f"{service.state_store[request.name].health.state}.", request_class=ResetHealthRequest),
+        Precondition(lambda service, request: service.state_store["brake_pads.front"].health.state != S_UNSUPPORTED
+                     or service.state_store["brake_pads.rear"].health.state != S_UNSUPPORTED, code=2,
+                     message="Health monitoring unsupported.", request_class=ManageHealthMonitoringRequest),
+    ])
+
+    def __init__(self, portal_callback=None, authority=None):
         """
         BrakingService constructor
         """
 
-        super().__init__("chassis.braking", portal_callback)
+        super().__init__("chassis.braking", portal_callback, authority=authority)
         self.init_state()
 
     def start_rpc_service(self):
@@ -68,20 +82,17 @@ class BrakingService(BaseService):
         """
         Initializes internal data structures for keeping track of the current state of the braking service
         """
-        self.state = {}
+        self.brake_names = []
 
         for brake in BrakePads.Resources.keys():
             brake = "brake_pads." + brake
             self.brake_names.append(brake)
-            self.state[brake] = self.init_message_state(BrakePads)
-            self.state[brake]["name"] = brake
-            self.state[brake]["health"] = self.init_message_state(HealthState)
-
-        self.state["brake_pads"] = self.init_message_state(ManageHealthMonitoringRequest)
+            self.state_store.register(brake, BrakePads, KEY_URI_PREFIX + ":/chassis.braking/1/" + brake + "#BrakePads",
+                                      name=brake)
 
     def set_topic_state(self, uri, message):
         """
-        Sets state dictionary with values passed by the uBus, overwritting default values assigned during initialization
+        Sets the state with values passed by the uBus, overwritting default values assigned during initialization
 
         Args:
             uri (str): String to identify specific car component eg.
@@ -96,8 +107,8 @@ class BrakingService(BaseService):
         # assumes message is of format {'health': {'remaining_life': 0, 'state': 3}} as defined by protobuf
 
         # value setting then being reset
-        self.state["brake_pads.front"]["health"]["state"] = message.health.state
-        self.state["brake_pads.rear"]["health"]["state"] = message.health.state
+        self.state_store.set_field("brake_pads.front", "health.state", message.health.state)
+        self.state_store.set_field("brake_pads.rear", "health.state", message.health.state)
 
     @BaseService.RequestListener
     def ResetHealth(self, request, response):
@@ -107,6 +118,12 @@ class BrakingService(BaseService):
     def ManageHealthMonitoring(self, request, response):
         return self.handle_request(request, response)
 
+    def get_request_resource(self, request):
+        """
+        ManageHealthMonitoring updates both brakes, so all braking requests are handled in order
+        """
+        return "brake_pads"
+
     def handle_request(self, request, response):
         """
         Generic function for all braking RPC calls
@@ -133,51 +150,30 @@ class BrakingService(BaseService):
 
     def validate_braking_req(self, request):
         """
-        Validates incoming requests for setting various brake settings. Raises an exception upon failure.
+        Validates incoming requests for setting various brake settings and applies them to the state.
+        Raises an exception upon failure.
 
         Args:
             request(protobuf): the request object to be validated
         """
+        self.validation_rules.validate(self, request)
+
         # Reset Health Request
         if isinstance(request, ResetHealthRequest):
-            if request.name not in ["brake_pads.front", "brake_pads.rear"]:
-                raise ValidationError(12, f"Unsupported brake name: {request.name}")
-
-            elif self.state[request.name]["health"]["state"] == HealthState.State.Value("S_UNSUPPORTED"):
-                raise ValidationError(
-                    2, f"Heath state for {request.name} set to " f"{self.state[request.name]['health']['state']}."
-                )
-
-            else:
-                self.state[request.name]["name"] = request.name
-                self.state[request.name]["health"]["remaining_life"] = 100
-                self.state[request.name]["health"]["state"] = HealthState.State.Value("S_OK")
+            self.state_store.set_fields(request.name, **{"name": request.name, "health.remaining_life": 100,
+                                                         "health.state": S_OK})
 
         # Manage Health Monitoring Request
         if isinstance(request, ManageHealthMonitoringRequest):
-            if request.name not in ["brake_pads.front", "brake_pads.rear"]:
-                raise ValidationError(12, f"Unsupported brake name: {request.name}")
-
-            elif self.state["brake_pads.front"]["health"]["state"] == HealthState.State.Value("S_UNSUPPORTED") and self.state[
-                "brake_pads.rear"
-            ]["health"]["state"] == HealthState.State.Value("S_UNSUPPORTED"):
-                raise ValidationError(2, "Health monitoring unsupported.")
-
-            elif (
-                self.state["brake_pads.front"]["health"]["state"] != HealthState.State.Value("S_DISABLED")
-                or self.state["brake_pads.front"]["health"]["state"] != HealthState.State.Value("S_UNSUPPORTED")
-                or self.state["brake_pads.rear"]["health"]["state"] != HealthState.State.Value("S_DISABLED")
-                or self.state["brake_pads.rear"]["health"]["state"] != HealthState.State.Value("S_UNSUPPORTED")
-            ) and request.is_enabled is False:
-                self.state["brake_pads.front"]["health"]["state"] = HealthState.State.Value("S_DISABLED")
-                self.state["brake_pads.rear"]["health"]["state"] = HealthState.State.Value("S_DISABLED")
-
-            elif (
-                self.state["brake_pads.front"]["health"]["state"] == HealthState.State.Value("S_DISABLED")
-                or self.state["brake_pads.rear"]["health"]["state"] == HealthState.State.Value("S_DISABLED")
-            ) and request.is_enabled is True:
-                self.state["brake_pads.front"]["health"]["state"] = HealthState.State.Value("S_OK")
-                self.state["brake_pads.rear"]["health"]["state"] = HealthState.State.Value("S_OK")
+            front_state = self.state_store["brake_pads.front"].health.state
+            rear_state = self.state_store["brake_pads.rear"].health.state
+            if request.is_enabled is False:
+                self.state_store.set_field("brake_pads.front", "health.state", S_DISABLED)
+                self.state_store.set_field("brake_pads.rear", "health.state", S_DISABLED)
+
+            elif S_DISABLED in (front_state, rear_state) and request.is_enabled is True:
+                self.state_store.set_field("brake_pads.front", "health.state", S_OK)
+                self.state_store.set_field("brake_pads.rear", "health.state", S_OK)
 
         return True
 
@@ -189,17 +185,10 @@ class BrakingService(BaseService):
             request(protobuf): the protobuf containing the rpc request
         """
         # publish brake info based on current state
-        topic_prefix = KEY_URI_PREFIX + ":/chassis.braking/1/"
-
         if isinstance(request, ResetHealthRequest):
-            topic = topic_prefix + request.name + "#BrakePads"
-            self.publish(topic, self.state[request.name], True)
+            self.publish_state(request.name, True)
         else:
-            topic = topic_prefix + "brake_pads.front#BrakePads"
-            self.publish(topic, self.state["brake_pads.front"], True)
-
-            topic = topic_prefix + "brake_pads.rear#BrakePads"
-            self.publish(topic, self.state["brake_pads.rear"], True)
+            self.publish_states(["brake_pads.front", "brake_pads.rear"], True)
 
 
 class BrakingPreconditions(UListener):
@@ -31,6 +31,8 @@ from google.protobuf.json_format import MessageToDict
 
 from simulator.core.abstract_service import BaseService
 from simulator.core.exceptions import ValidationError
+from simulator.core.field_mask import get_field_mask
+from simulator.core.validation import AllowedValues, Precondition, Range, Validator, enum_values
 from simulator.utils.constant import KEY_URI_PREFIX
 from target.protofiles.vehicle.body.cabin_climate.v1 import cabin_climate_topics_pb2
 from target.protofiles.vehicle.body.cabin_climate.v1.cabin_climate_service_pb2 import (
@@ -42,21 +44,51 @@ from target.protofiles.vehicle.body.cabin_climate.v1.cabin_climate_service_pb2 i
 )
 
 
+def in_zone_mask(field):
+    """
+    Returns a rule condition which is True if the update mask of a zone request contains field
+    """
+    return lambda service, request: field in service.get_zone_mask(request)
+
+
 class CabinClimateService(BaseService):
     """
     The CabinClimateService object handles mock services for the cabin climate service
     """
 
     zone_names = []
-    state = {}  # state for all zones
-    settings_state = {}  # state for system settings
-
-    def __init__(self, portal_callback=None):
+    zone_rules = Validator([  # checks of ExecuteClimateCommand requests
+        Precondition(lambda service, request: request.zone.id in service.zone_names, code=2,
+                     message="Unsupported zone id."),
+        Precondition(lambda service, request: not service.get_fields_needing_power(request), code=9,
+                     message=lambda service, request: f"Unable to set {service.get_fields_needing_power(request)[0]} "
+                     f"when zone power is off."),
+        # air_distribution_auto_state can only be AM_OFF or AM_AUTO when power is on.
+        AllowedValues("zone.air_distribution_auto_state",
+                      [cabin_climate_topics_pb2.AutomaticMode.Value("AM_AUTO"),
+                       cabin_climate_topics_pb2.AutomaticMode.Value("AM_OFF")],
+                      code=2, message="Zone must be powered off to set air_distribution_auto_state to {value}.",
+                      when=in_zone_mask("air_distribution_auto_state")),
+        # air_distribution cannot be AD_OFF, AD_AUTO, or AD_UNSPECIFIED when power is off
+        AllowedValues("zone.air_distribution",
+                      enum_values(cabin_climate_topics_pb2.AirDistribution,
+                                  exclude=["AD_OFF", "AD_AUTO", "AD_UNSPECIFIED"]),
+                      code=2, message="Zone must be powered off to set air_distribution_auto_state to "
+                      "{request.zone.air_distribution_auto_state}.", when=in_zone_mask("air_distribution")),
+        # check temp in range. in the future, the discovery service will propigate min/max values
+        Range("zone.temperature_setpoint", lambda service: int(service.min), lambda service: int(service.max), code=2,
+              message="Temperature out of range.", when=in_zone_mask("temperature_setpoint")),
+        # blower level in range
+        Range("zone.blower_level", 0, 100, code=2, message="Blower level out of range.",
+              when=in_zone_mask("blower_level")),
+    ])
+
+    def __init__(self, portal_callback=None, authority=None):
         """
         CabinClimateService constructor
         """
 
-        super().__init__("body.cabin_climate", portal_callback)
+        super().__init__("body.cabin_climate", portal_callback, authority=authority)
 
         self.init_state()
 
@@ -79,14 +111,14 @@ class CabinClimateService(BaseService):
         self.max = 31
         self.min = 16
 
-        self.state = {}
         self.number_of_zones = 0
         for zone in self.zone_names:
-            self.state[zone] = self.init_message_state(cabin_climate_topics_pb2.Zone)
-            self.state[zone]["id"] = zone
+            self.state_store.register(zone, cabin_climate_topics_pb2.Zone,
+                                      KEY_URI_PREFIX + ":/body.cabin_climate/1/" + zone + "#Zone", id=zone)
         self.calc_number_of_zones()
         self.zone_names = set(self.zone_names)
-        self.settings_state = self.init_message_state(cabin_climate_topics_pb2.SystemSettings)
+        self.state_store.register("system_settings", cabin_climate_topics_pb2.SystemSettings,
+                                  KEY_URI_PREFIX + ":/body.cabin_climate/1/system_settings#SystemSettings")
 
     def calc_number_of_zones(self):
         self.number_of_zones = 0
@@ -113,9 +145,9 @@ class CabinClimateService(BaseService):
         # validation passed
         response.code = 0
         response.message = "OK"
-        # publish message from request data
-        self.publish_synced_fields(request, zone_str)
-        self.publish_zone(zone_str)
+        # publish message from request data, together with the zone synced to it if any
+        synced_zone = self.update_synced_fields(request, zone_str)
+        self.publish_zones([synced_zone, zone_str] if synced_zone else [zone_str])
 
         return response
 
@@ -157,6 +189,18 @@ class CabinClimateService(BaseService):
     def SetLock(self, request, response):
         return self.handle_request(request, response)
 
+    def get_request_resource(self, request):
+        """
+        Requests for the same row are handled in order. Left and right zones of a row share a key
+        since some fields are synced between them.
+        """
+        if request.DESCRIPTOR.fields_by_name.get("zone") is not None:
+            groups = re.search(r"(row\d)", request.zone.id)
+            return groups.group(1) if groups else request.zone.id
+        if request.DESCRIPTOR.fields_by_name.get("settings") is not None:
+            return "system_settings"
+        return None
+
     def handle_request(self, request, response):
 
         # handle SetTemperature request
@@ -187,32 +231,18 @@ class CabinClimateService(BaseService):
         response.status.message = "OK"
         return response
 
-    def normalize_field_mask(self, request, zone_str):
+    def get_zone_mask(self, request):
         """
-        Normalizes the field mask and returns a new one
+        Returns the compiled update mask of an ExecuteClimateCommand request, every zone field if it is empty
         """
-        # check if all fields need updating or just fields in the field mask
-        field_mask = request.update_mask.paths
-        if field_mask == "Zone.*" or field_mask == "zone.*" or field_mask == "*":
-            field_mask = []
-        if len(field_mask) == 0:
-            # update all fields by adding them to the field mask
-            for field in self.state[zone_str].keys():
-                # add "zone." prefix. this gets removed later, but services send this prefix
-                field_mask.append("zone." + str(field))
-
-        # remove "zone." prefix from field mask
-        field_mask_normalized = []
-        for field in field_mask:
-            field = field.split(".")[1]
-            field_mask_normalized.append(field)
-
-        return field_mask_normalized
-
-    def publish_synced_fields(self, request, zone_str):
+        # services prefix the paths with "zone."
+        return get_field_mask(request.zone.DESCRIPTOR, request.update_mask.paths, "zone")
+
+    def update_synced_fields(self, request, zone_str):
         """
         If "blower_level", "air_distribution", "air_distribution_auto_state", or "auto_on" fields
         are sent with a resource of rowX_left, we need to publish on rowX_right as well.
+        Updates the state of the synced zone and returns its name, or None if no field is synced.
         """
         groups = re.search(r"(row\d)_(left|right)", zone_str)
         if not groups:
@@ -220,7 +250,7 @@ class CabinClimateService(BaseService):
             return None
         row = groups.group(1)
         side = groups.group(2)
-        mask = set(self.normalize_field_mask(request, zone_str))
+        mask = set(self.get_zone_mask(request))
         synced_fields = set(["blower_level", "air_distribution", "air_distribution_auto_state", "auto_on", "is_power_on"])
         fields_to_update = mask & synced_fields
         if fields_to_update:
@@ -229,81 +259,45 @@ class CabinClimateService(BaseService):
             elif side == "left":
                 new_row = row + "_right"
             for field in mask & synced_fields:
-                self.state[new_row][field] = self.state[zone_str][field]
-            self.publish_zone(new_row)
+                self.state_store.set_field(new_row, field, getattr(self.state_store[zone_str], field))
+            return new_row
+        return None
 
-    def validate_zone_req(self, request, zone_str):
+    def get_fields_needing_power(self, request):
         """
-        Validates incoming ExecuteClimateCommand requests. Raises an exception upon failure
+        Returns the fields a zone request sets although the zone is powered off and the request does not
+        power it on, none if the request is allowed
         """
+        if self.state_store[request.zone.id].is_power_on:
+            return []
+        mask = self.get_zone_mask(request)
+        if ("is_power_on" in mask) and (request.zone.is_power_on is True):
+            return []
+        return [field for field in mask if field != "is_power_on"]
 
-        # min/max values for various fields. in the future, the discovery service
-        # will propigate these
-        min_temp = int(self.min)
-        max_temp = int(self.max)
-
-        max_blower_level = 100
-        min_blower_level = 0
-
-        if zone_str not in self.zone_names:
-            raise ValidationError(2, "Unsupported zone id.")
-
-        field_mask_normalized = self.normalize_field_mask(request, zone_str)
-
-        # loop through the field mask
-        for field in field_mask_normalized:
-
-            if self.state[zone_str]["is_power_on"] is False:
-                # power is currently off
-                fields_that_need_is_power_on = list(self.state[zone_str].keys())
-                fields_that_need_is_power_on.remove("is_power_on")
-                if field in fields_that_need_is_power_on:
-                    # if not turning power on and using a field which needs the power on, fail
-                    if not (("is_power_on" in field_mask_normalized) and (request.zone.is_power_on is True)):
-                        raise ValidationError(9, f"Unable to set {field} when zone power is off.")
-
-            # air_distribution_auto_state can only be AM_OFF or AM_AUTO when power is on.
-            if field == "air_distribution_auto_state":
-                if request.zone.air_distribution_auto_state not in [
-                    cabin_climate_topics_pb2.AutomaticMode.Value("AM_AUTO"),
-                    cabin_climate_topics_pb2.AutomaticMode.Value("AM_OFF"),
-                ]:
-                    raise ValidationError(
-                        2,
-                        f"Zone must be powered off to set air_distribution_auto_state to "
-                        f"{request.zone.air_distribution_auto_state}.",
-                    )
-
-            # air_distribution cannot be AD_OFF, AD_AUTO, or AD_UNSPECIFIED when power is off
-            if field == "air_distribution":
-                air_distrib_valid_values = cabin_climate_topics_pb2.AirDistribution.values()
-                air_distrib_valid_values.remove(cabin_climate_topics_pb2.AirDistribution.Value("AD_OFF"))
-                air_distrib_valid_values.remove(cabin_climate_topics_pb2.AirDistribution.Value("AD_AUTO"))
-                air_distrib_valid_values.remove(cabin_climate_topics_pb2.AirDistribution.Value("AD_UNSPECIFIED"))
-                if request.zone.air_distribution not in air_distrib_valid_values:
-                    raise ValidationError(
-                        2,
-                        f"Zone must be powered off to set air_distribution_auto_state to "
-                        f"{request.zone.air_distribution_auto_state}.",
-                    )
-
-            # check temp in range
-            if field == "temperature_setpoint":
-                request.zone.temperature_setpoint = float(round(request.zone.temperature_setpoint))
-                if (request.zone.temperature_setpoint > max_temp) or (request.zone.temperature_setpoint < min_temp):
-                    raise ValidationError(2, "Temperature out of range.")
-
-            # blower level in range
-            if field == "blower_level":
-                if (request.zone.blower_level > max_blower_level) or (request.zone.blower_level < min_blower_level):
-                    raise ValidationError(2, "Blower level out of range.")
-
-            # update state
-            self.state[zone_str][field] = getattr(request.zone, field)
-
+    def validate_zone_req(self, request, zone_str):
+        """
+        Validates incoming ExecuteClimateCommand requests and applies them to the zone. Raises an exception upon
+        failure, in which case the zone is left unchanged
+        """
+        mask = self.get_zone_mask(request)
+        if "temperature_setpoint" in mask:
+            # validate and apply the rounded setpoint, the caller's request is left as it was sent
+            rounded = type(request)()
+            rounded.CopyFrom(request)
+            rounded.zone.temperature_setpoint = float(round(request.zone.temperature_setpoint))
+            request = rounded
+
+        self.zone_rules.validate(self, request)
+
+        # update state
+        with self.state_store.lock:
+            zone = self.state_store[zone_str]
+            mask.apply(request.zone, zone)
             # blower level needs a calculation
-            if field == "blower_level":
-                self.state[zone_str][field] = self.get_blower_level(self.state[zone_str][field])
+            if "blower_level" in mask:
+                zone.blower_level = self.get_blower_level(zone.blower_level)
+            self.state_store.mark_dirty(zone_str)
 
         return True
 
@@ -312,40 +306,36 @@ class CabinClimateService(BaseService):
         Publishes a system settings message based on the current state
         """
         # publish zone info based on current state
-        topic = KEY_URI_PREFIX + ":/body.cabin_climate/1/" + zone_name + "#Zone"
-        self.publish(topic, self.state[zone_name], True)
+        self.publish_state(zone_name, True)
+
+    def publish_zones(self, zone_names):
+        """
+        Publishes the zone messages of several zones as one batch
+        """
+        self.publish_states(zone_names, True)
 
     def get_est_cabin_temp(self):
         """
         Calculate the estimated_cabin_temperature
         """
-        temp_sum = 0
-        for zone in self.state.keys():
-            # loop through all zones which have power on
-            if self.state[zone]["is_power_on"]:
-                temp_sum += self.state[zone]["temperature_setpoint"]
-        return temp_sum / len(self.state.keys())
+        zones = [zone for _, zone in self.state_store.items() if isinstance(zone, cabin_climate_topics_pb2.Zone)]
+        # sum up the zones which have power on
+        temp_sum = sum(zone.temperature_setpoint for zone in zones if zone.is_power_on)
+        return temp_sum / len(zones)
 
     def validate_settings_req(self, request):
         """
         Validates incoming UpdateSystemSettings requests. Raises an exception upon failure
         """
-        # add all fields to the field mask if it's empty
-        field_mask = request.update_mask.paths
-        if field_mask == "Zone.*" or field_mask == "zone.*" or field_mask == "*":
-            field_mask = []
-        if len(field_mask) == 0:
-            # update all fields
-            for field in self.state.keys():
-                field_mask.append("settings." + str(field))
+        # all fields are updated if the field mask is empty
+        mask = get_field_mask(request.settings.DESCRIPTOR, request.update_mask.paths, "settings")
 
         # loop through each field
-        for field in field_mask:
-            field = field.split(".")[1].strip()
+        for field in mask:
 
             # override estimated_cabin_temperature with average of zone temps
             if field == "estimated_cabin_temperature":
-                self.settings_state[field] = self.get_est_cabin_temp()
+                self.state_store.set_field("system_settings", field, self.get_est_cabin_temp())
             if field == "ac_compressor_setting":
                 if request.settings.ac_compressor_setting == cabin_climate_topics_pb2.SystemSettings.CompressorSetting.Value(
                     "CS_UNSPECIFIED"
@@ -369,15 +359,16 @@ class CabinClimateService(BaseService):
                         2, "sync_3rdRow_to_driver and third_row_zone_lockout are not available when " "there is no third row."
                     )
 
-            self.settings_state[field] = getattr(request.settings, field)
+            with self.state_store.lock:
+                mask.apply(request.settings, self.state_store["system_settings"], field)
+                self.state_store.mark_dirty("system_settings")
 
     def publish_system_settings(self):
         """
         Publishes a system settings message based on the current state
         """
-        topic = KEY_URI_PREFIX + ":/body.cabin_climate/1/system_settings#SystemSettings"
         # publish system settings based on current state
-        self.publish(topic, self.settings_state, True)
+        self.publish_state("system_settings", True)
 
     def get_blower_level(self, number):
         """
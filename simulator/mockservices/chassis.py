@@ -45,15 +45,11 @@ class ChassisService(BaseService):
     The ChassisService object handles mock services for the chassis service
     """
 
-    # valid tire names
-    tire_names = []
     timeout = 9  # timeout time in seconds for discovery service
 
-    state = {}
+    def __init__(self, portal_callback=None, authority=None):
 
-    def __init__(self, portal_callback=None):
-
-        super().__init__("chassis", portal_callback)
+        super().__init__("chassis", portal_callback, authority=authority)
         self.init_state()
 
     def start_rpc_service(self):
@@ -74,20 +70,20 @@ class ChassisService(BaseService):
         """
         Initializes internal data structures for keeping track of the current state of the tire update service
         """
-        self.state = {}
+        # valid tire names
+        self.tire_names = []
 
         for tire in Tire.Resources.keys():
             tire = "tire." + tire
             self.tire_names.append(tire)
 
         for tire in self.tire_names:
-            self.state[tire] = self.init_message_state(Tire)
-            self.state[tire]["resource_name"] = tire
+            self.state_store.register(tire, Tire, KEY_URI_PREFIX + ":/chassis/1/" + tire + "#Tire", resource_name=tire)
 
     # Topic Name grabs From the Environment.py Finds the Messages to the Ubus Leak State and So on
     def set_topic_state(self, uri, message):
         """
-        Sets state dictionary with values passed by the uBus, overwritting default values assigned during initialization
+        Sets the state with values passed by the uBus, overwritting default values assigned during initialization
 
         Args:
             uri (str): String to identify specific car component eg.
@@ -99,8 +95,8 @@ class ChassisService(BaseService):
 
         # assign value from message
         # assumes message is of format {'leak_state': true} as defined by protobuf
-        self.state[topic]["leak_state"] = message.leak_state
-        self.state[topic]["is_leak_detection_enabled"] = message.is_leak_detection_enabled
+        self.state_store.set_fields(topic, leak_state=message.leak_state,
+                                    is_leak_detection_enabled=message.is_leak_detection_enabled)
 
     @BaseService.RequestListener
     def UpdateTire(self, request, response):
@@ -122,45 +118,48 @@ class ChassisService(BaseService):
         self.publish_tire(request)
         return response
 
+    def get_request_resource(self, request):
+        """
+        UpdateTire requests update every tire, so they are all handled in order
+        """
+        return "tire"
+
     def validate_tire(self, request):
         if isinstance(request, UpdateTireRequest):
             for tire in self.tire_names:
                 # TestCase_02
                 if (
-                    self.state[tire]["leak_state"]
+                    self.state_store[tire].leak_state
                     not in [Tire.TireLeakState.Value("TLS_NO_LEAK"), Tire.TireLeakState.Value("TLS_UNSPECIFIED")]
-                    and self.state[tire]["is_leak_detection_enabled"] is True
+                    and self.state_store[tire].is_leak_detection_enabled is True
                 ):
-                    self.state[tire]["is_leak_present"] = True
-                    self.state[tire]["leak_state"] = Tire.TireLeakState.Value("TLS_NO_LEAK")
+                    self.state_store.set_fields(tire, is_leak_present=True, leak_state=Tire.TireLeakState.Value("TLS_NO_LEAK"))
 
                 # Testcase_03
                 elif (
-                    self.state[tire]["leak_state"] in Tire.TireLeakState.values()
+                    self.state_store[tire].leak_state in Tire.TireLeakState.values()
                     and request.is_leak_present is False
-                    and self.state[tire]["is_leak_detection_enabled"] is False
+                    and self.state_store[tire].is_leak_detection_enabled is False
                 ):
-                    self.state[tire]["is_leak_present"] = False
+                    self.state_store.set_field(tire, "is_leak_present", False)
 
                 # Testcase_04
-                elif self.state[tire]["is_leak_detection_enabled"] is False and request.is_leak_present is True:
-                    self.state[tire]["is_leak_present"] = True
-                    self.state[tire]["is_leak_notification_enabled"] = True
+                elif self.state_store[tire].is_leak_detection_enabled is False and request.is_leak_present is True:
+                    self.state_store.set_fields(tire, is_leak_present=True, is_leak_notification_enabled=True)
                     raise ValidationError(2, "is_leak_detection_enabled: False")
 
                 # Testcase_05
                 elif (
-                    self.state[tire]["is_leak_detection_enabled"] is False
+                    self.state_store[tire].is_leak_detection_enabled is False
                     and request.is_leak_notification_enabled is True
                     and request.is_leak_present is True
                 ):
-                    self.state[tire]["is_leak_present"] = True
-                    self.state[tire]["is_leak_notification_enabled"] = True
+                    self.state_store.set_fields(tire, is_leak_present=True, is_leak_notification_enabled=True)
                     raise ValidationError(2, "is_leak_detection_enabled: False")
 
                 # Testcase_01
                 else:
-                    self.state[tire]["is_leak_detection_enabled"] = request.is_leak_notification_enabled
+                    self.state_store.set_field(tire, "is_leak_detection_enabled", request.is_leak_notification_enabled)
 
         return True
 
@@ -168,9 +167,7 @@ class ChassisService(BaseService):
         """
         Publishes a message based on the current tire
         """
-        for tire in self.tire_names:
-            topic = KEY_URI_PREFIX + ":/chassis/1/" + tire + "#Tire"
-            self.publish(topic, self.state[tire], True)
+        self.publish_states(self.tire_names, True)
 
 
 class ChassisPreconditions(UListener):
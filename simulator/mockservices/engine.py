@@ -34,11 +34,11 @@ from target.protofiles.vehicle.propulsion.engine.v1.engine_service_pb2 import (
 
 class EngineService(BaseService):
 
-    def __init__(self, portal_callback=None):
+    def __init__(self, portal_callback=None, authority=None):
         """
         EngineService constructor
         """
-        super().__init__("propulsion.engine", portal_callback)
+        super().__init__("propulsion.engine", portal_callback, authority=authority)
         self.init_state()
 
     def init_state(self):
@@ -30,11 +30,11 @@ from simulator.core.abstract_service import BaseService
 
 class VehicleExteriorService(BaseService):
 
-    def __init__(self, portal_callback=None):
+    def __init__(self, portal_callback=None, authority=None):
         """
         VehicleExteriorService constructor
         """
-        super().__init__('vehicle.exterior', portal_callback)
+        super().__init__('vehicle.exterior', portal_callback, authority=authority)
         self.init_state()
 
     def init_state(self):
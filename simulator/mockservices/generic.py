@@ -0,0 +1,177 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2023 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2023 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import sys
+
+from google.protobuf.descriptor import FieldDescriptor
+
+from simulator.core import protobuf_autoloader
+from simulator.core.abstract_service import BaseService
+from simulator.core.exceptions import ValidationError
+from simulator.core.field_mask import get_field_mask
+
+
+def echo_request(service, request, response):
+    return service.handle_request(request, response)
+
+
+def is_compatible(field, other):
+    """
+    Returns True if a value of field can be assigned to other, i.e. both have the same type
+    """
+    if field.label != other.label or field.cpp_type != other.cpp_type:
+        return False
+    if field.message_type is not None:
+        return field.message_type.full_name == other.message_type.full_name
+    if field.enum_type is not None:
+        return field.enum_type.full_name == other.enum_type.full_name
+    return True
+
+
+class GenericService(BaseService):
+    """
+    Mock service for any service of the resource catalog, built from its descriptors instead of a hand-written
+    class. Every rpc method is answered with OK after its request fields are echoed into the state of the
+    topics the request addresses, which are then published:
+
+    - topics whose resource is named by a string field of the request, e.g. a zone or tire name
+    - otherwise the service's only topic
+
+    Topics are not matched by message type, which would update every zone or tire on a request naming none.
+
+    Set request fields are copied into the topic fields of the same name and type, except name, and a
+    request field of the topic's message type is merged into the topic state, limited to the request's
+    update_mask if it has one.
+    """
+
+    def __init__(self, service_name, portal_callback=None, authority=None):
+        """
+        GenericService constructor
+
+        :param service_name: name of the service in the resource catalog, see protobuf_autoloader.get_services()
+        """
+        super().__init__(service_name, portal_callback, authority=authority)
+        self.init_state()
+
+    def init_state(self):
+        """
+        Registers one state store entry per topic of the service, keyed by the topic's resource name
+        """
+        self.resources = {}  # resource name, and the instance part of dotted names such as tire.front_left -> keys
+        for topic, message_class in protobuf_autoloader.get_topics_by_service(self.service):
+            if message_class is None:
+                continue
+            resource = topic.rsplit("/", 1)[-1].split("#")[0]
+            name_field = message_class.DESCRIPTOR.fields_by_name.get("name")
+            fields = {}
+            if name_field is not None and name_field.cpp_type == FieldDescriptor.CPPTYPE_STRING:
+                fields["name"] = resource
+            self.state_store.register(resource, message_class, topic, **fields)
+            self.resources.setdefault(resource, []).append(resource)
+            if "." in resource:
+                self.resources.setdefault(resource.rsplit(".", 1)[1], []).append(resource)
+
+    def get_state_name(self):
+        # every entity runs as a GenericService, each needs a state file of its own
+        return self.__class__.__name__ + "." + self.service
+
+    def rpc_handlers(self):
+        return {method: echo_request for method in protobuf_autoloader.get_methods_by_service(self.service)}
+
+    def get_request_resource(self, request):
+        """
+        Returns every state store entry the request addresses, so requests sharing one are handled in order
+        """
+        return frozenset(self.find_targets(request))
+
+    def handle_request(self, request, response):
+        try:
+            keys = [key for key in self.find_targets(request) if self.echo_request(key, request)]
+        except ValidationError as e:
+            print(f"ValidationError: return code {e.code} with message {e.message}")
+            return self.set_status(response, e.code, e.message)
+        self.publish_many([(self.state_store.get_topic(key), self.state_store.snapshot(key)) for key in keys], True)
+        return self.set_status(response, 0, "OK")
+
+    def set_status(self, response, code, message):
+        for field in response.DESCRIPTOR.fields:
+            # the status field of the response, whatever its type, has a code and a message
+            if field.message_type is not None and {"code", "message"} <= set(field.message_type.fields_by_name):
+                status = getattr(response, field.name)
+                status.code = code
+                status.message = message
+                break
+        return response
+
+    def find_targets(self, request):
+        """
+        Returns the keys of the state store entries a request addresses
+        """
+        keys = []
+        for field, value in request.ListFields():
+            if field.cpp_type != FieldDescriptor.CPPTYPE_STRING:
+                continue
+            for name in (value if field.label == FieldDescriptor.LABEL_REPEATED else [value]):
+                for key in self.resources.get(name, []):
+                    if key not in keys:
+                        keys.append(key)
+        if keys:
+            return keys
+        return list(self.state_store.keys()) if len(self.state_store.keys()) == 1 else []
+
+    def echo_request(self, key, request) -> bool:
+        """
+        Copies the set fields of a request into a state store entry. Returns True if the entry changed.
+        """
+        store = self.state_store
+        changed = False
+        masked = "update_mask" in request.DESCRIPTOR.fields_by_name and request.HasField("update_mask")
+        with store.lock:
+            state = store.get(key)
+            state_fields = state.DESCRIPTOR.fields_by_name
+            for field, value in request.ListFields():
+                if field.label != FieldDescriptor.LABEL_REPEATED and field.message_type is not None and \
+                        field.message_type.full_name == state.DESCRIPTOR.full_name:
+                    merged = type(state)()
+                    merged.CopyFrom(state)
+                    if masked:
+                        get_field_mask(state.DESCRIPTOR, request.update_mask.paths, field.name).apply(value, merged)
+                    else:
+                        merged.MergeFrom(value)
+                    if merged != state:
+                        store.update(key, merged)
+                        changed = True
+                # the name addresses the resource, it is not copied
+                elif field.name in state_fields and field.name != "name" and \
+                        is_compatible(field, state_fields[field.name]):
+                    changed = store.set_field(key, field.name, value) or changed
+        return changed
+
+
+if __name__ == "__main__":
+    service = GenericService(sys.argv[1])
+    service.start()
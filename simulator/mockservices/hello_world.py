@@ -25,13 +25,13 @@
 # -------------------------------------------------------------------------
 
 from datetime import datetime
-from threading import Thread
 
-from google.protobuf.json_format import MessageToDict
 from google.protobuf.text_format import MessageToString
 from google.type.timeofday_pb2 import TimeOfDay
 
 from simulator.core.abstract_service import BaseService
+from simulator.core.clock import get_clock
+from simulator.core.scheduler import PeriodicScheduler
 from simulator.utils.constant import KEY_URI_PREFIX
 from target.protofiles.example.hello_world.v1.hello_world_topics_pb2 import Timer
 
@@ -56,15 +56,36 @@ class HelloWorldService(BaseService):
     message HelloResponse { string message = 1; }
     """
 
-    def __init__(self, portal_callback=None):
+    def __init__(self, portal_callback=None, authority=None):
         """
         Mock service constructor. Specify the service name to the parent constructor.
         """
-        super().__init__("example.hello_world", portal_callback)
+        super().__init__("example.hello_world", portal_callback, authority=authority)
+        self.state_store.register("one_second", Timer, KEY_URI_PREFIX + ":/example.hello_world/1/one_second#Timer")
+        self.state_store.register("one_minute", Timer, KEY_URI_PREFIX + ":/example.hello_world/1/one_minute#Timer")
+        self.timer_tasks = []
+
+    def start_rpc_service(self):
+        started = super().start_rpc_service()
+        # the timers publish once the topics exist on the host
+        self.start_publishing()
+        return started
+
+    def disconnect(self):
+        self.stop_publishing()
+        super().disconnect()
 
     def start_publishing(self):
-        timer_pub_thread = Thread(target=self.PublishTimerMessage(), daemon=True)
-        timer_pub_thread.start()
+        if self.timer_tasks:
+            return
+        scheduler = PeriodicScheduler()
+        self.timer_tasks = [scheduler.schedule(1, self.PublishTimerMessage, "one_second", align=True),
+                            scheduler.schedule(60, self.PublishTimerMessage, "one_minute", align=True)]
+
+    def stop_publishing(self):
+        for task in self.timer_tasks:
+            task.cancel()
+        self.timer_tasks = []
 
     # The UltifiLink.RequestListener decorator is used to define an RPC
     # handler. This decorator registers the method by using the method name.
@@ -76,7 +97,9 @@ class HelloWorldService(BaseService):
     # response (a HelloResponse message).
     # The response object will be sent to the caller as the RPC response
     # after it returns from this method.
-    @BaseService.RequestListener
+    # The response only depends on the request, so memoize=True lets
+    # repeated requests be answered from a cache without calling it.
+    @BaseService.RequestListener(memoize=True)
     def SayHello(self, request, response):
         """
         Handles SayHello RPC calls. This method is called whenever a SayHello
@@ -96,27 +119,12 @@ class HelloWorldService(BaseService):
         print(MessageToString(response))
         return response
 
-    def PublishTimerMessage(service):
+    def PublishTimerMessage(self, timer):
         """
-        Publishes a Timer message based on the current timestamp after every second and every minute
+        Publishes a Timer message with the current time of day, called by the scheduler every second
+        for the one second timer and every minute for the one minute timer
         """
-        # Create a TimeOfDay instance
-        time_of_day = TimeOfDay()
-        one_sec_topic = KEY_URI_PREFIX + ":/example.hello_world/1/one_second#Timer"
-        one_min_topic = KEY_URI_PREFIX + ":/example.hello_world/1/one_minute#Timer"
-
-        while True:
-            # Get current time
-            current_time = datetime.now().time()
-
-            # Set the time fields
-            time_of_day.hours = current_time.hour
-
-            if time_of_day.seconds != current_time.second:
-                time_of_day.seconds = current_time.second
-                if time_of_day.minutes != current_time.minute:
-                    time_of_day.minutes = current_time.minute
-                    # publish one minute topic with payload every minute
-                    service.publish(one_min_topic, MessageToDict(Timer(time=time_of_day)))
-                # publish one second topic with payload every second
-                service.publish(one_sec_topic, MessageToDict(Timer(time=time_of_day)))
+        current_time = datetime.fromtimestamp(get_clock().time()).time()
+        self.state_store.set_fields(timer, time=TimeOfDay(hours=current_time.hour, minutes=current_time.minute,
+                                                          seconds=current_time.second))
+        self.publish_state(timer)
@@ -17,21 +17,19 @@ class HornService(BaseService):
     The HornService object handles mock services for the horn lighting service
     """
 
-    state = {}
-
-    def __init__(self, portal_callback=None):
+    def __init__(self, portal_callback=None, authority=None):
         """
         HornService constructor:
         """
 
-        super().__init__("body.horn", portal_callback)
+        super().__init__("body.horn", portal_callback, authority=authority)
         self.init_state()
 
     def init_state(self):
         """
         Initializes internal data structures for keeping track of the current state of the horn service
         """
-        self.state["horn_status"] = self.init_message_state(HornStatus)
+        self.state_store.register("horn_status", HornStatus, KEY_URI_PREFIX + ":/body.horn/1/horn#HornStatus")
 
     @BaseService.RequestListener
     def ActivateHorn(self, request, response):
@@ -87,5 +85,4 @@ class HornService(BaseService):
         request(protobuf): the protobuf containing the rpc request
         """
 
-        topic = KEY_URI_PREFIX + ":/body.horn/1/horn#HornStatus"
-        self.publish(topic, self.state["horn_status"], True)
+        self.publish_state("horn_status", True)
@@ -42,11 +42,11 @@ from target.protofiles.vehicle.body.mirrors.v1.mirrors_service_pb2 import (
 
 class BodyMirrorsService(BaseService):
 
-    def __init__(self, portal_callback=None):
+    def __init__(self, portal_callback=None, authority=None):
         """
         BodyMirrorsService constructor
         """
-        super().__init__("body.mirrors", portal_callback)
+        super().__init__("body.mirrors", portal_callback, authority=authority)
         self.init_state()
 
     def init_state(self):
@@ -11,23 +11,43 @@ from uprotocol.transport.ulistener import UListener
 
 from simulator.core.abstract_service import BaseService
 from simulator.core.exceptions import ValidationError
+from simulator.core.validation import AllowedValues, Precondition, Validator, enum_values
 from simulator.utils.constant import KEY_URI_PREFIX
 
+RHL_UNSPECIFIED = RideHeight.RideHeightLevel.Value("RHL_UNSPECIFIED")
+S_USER = RideHeightSystemStatus.Source.Value("S_USER")
+S_APP = RideHeightSystemStatus.Source.Value("S_APP")
+MSC_UNSPECIFIED = SetRideHeightRequest.MotionSpeedCommand.Value("MSC_UNSPECIFIED")
+MTC_UNSPECIFIED = SetRideHeightRequest.MotionTypeCommand.Value("MTC_UNSPECIFIED")
+
 
 class SuspensionService(BaseService):
     """
     The SuspensionService object handles mock services for the sound service
     """
 
-    state = {}
-
-    def __init__(self, portal_callback=None):
+    validation_rules = Validator([
+        AllowedValues("command", enum_values(RideHeight.RideHeightLevel), code=12,
+                      message="Command value not supported."),
+        # with an app controlling the ride height, the command must be specified
+        Precondition(lambda service, request: request.command != RHL_UNSPECIFIED, code=3,
+                     message="Command value unspecified.", request_class=SetRideHeightRequest,
+                     when=lambda service, request: service.get_external_control_status() == "active"
+                     and service.state_store["ride_height_system_status"].source == S_APP),
+        Precondition(lambda service, request: service.get_external_control_status() not in
+                     ("Temporary Inhibit", "Internally Arbitrated"), code=10, message="Value is not supported",
+                     request_class=SetRideHeightRequest),
+        Precondition(lambda service, request: service.get_external_control_status() != "Failed", code=1,
+                     message="Cannot happen.", request_class=SetRideHeightRequest),
+    ])
+
+    def __init__(self, portal_callback=None, authority=None):
         """
         SuspensionService constructor:
         """
         # todo: move uninstall to BaseService class
 
-        super().__init__("chassis.suspension", portal_callback)
+        super().__init__("chassis.suspension", portal_callback, authority=authority)
         self.init_state()
 
     def start_rpc_service(self):
@@ -40,26 +60,23 @@ class SuspensionService(BaseService):
         )
 
     def init_state(self):
-        self.state = {}
-
         for ride_height in RideHeight.Resources.keys():
-            self.state[ride_height] = self.init_message_state(RideHeight)
-            self.state[ride_height]["name"] = ride_height
+            self.state_store.register(ride_height, RideHeight,
+                                      KEY_URI_PREFIX + ":/chassis.suspension/1/" + ride_height + "#RideHeight",
+                                      name=ride_height)
 
         for status in RideHeightSystemStatus.Resources.keys():
-            self.state[status] = self.init_message_state(RideHeightSystemStatus)
-            self.state[status]["name"] = status
+            self.state_store.register(status, RideHeightSystemStatus, name=status)
 
-        self.state["preconditions"] = {}
+        self.preconditions = {}  # conditions set by feature files, see handle_precondition()
 
         # populate supported and available heights
         heights = [x for x in range(1, 13)]
-        self.state["ride_height"]["supported_heights"] = heights
-        self.state["ride_height"]["available_heights"] = heights
+        self.state_store.set_fields("ride_height", supported_heights=heights, available_heights=heights)
 
     def set_topic_state(self, uri, message):
         """
-        Sets state dictionary with values passed by the uBus, overwritting default values assigned during initialization
+        Sets the state with values passed by the uBus, overwritting default values assigned during initialization
 
         Args:
             uri (str): String to identify specific car component eg.
@@ -73,12 +90,18 @@ class SuspensionService(BaseService):
         # assign value from message
         # assumes message is of format {'source': 'S_APP'} as defined by protobuf
         if "ride_height_system_status" in topic:
-            self.state[topic]["source"] = message.source
+            self.state_store.set_field(topic, "source", message.source)
 
     @BaseService.RequestListener
     def SetRideHeight(self, request, response):
         return self.handle_request(request, response)
 
+    def get_request_resource(self, request):
+        """
+        All requests update the single ride_height resource
+        """
+        return "ride_height"
+
     def handle_precondition(self, condition, value):
         """
         Handles preconditions set by feature file and passed from BDD
@@ -87,7 +110,7 @@ class SuspensionService(BaseService):
             condition(string): corresponds to a condition listed by a feature file and sets it in state
             value(any): corresponds to a condition's value listed by a feature file and sets it in state
         """
-        self.state["preconditions"][condition] = value
+        self.preconditions[condition] = value
 
     def handle_request(self, request, response):
         """
@@ -113,64 +136,55 @@ class SuspensionService(BaseService):
         self.publish_suspension()
         return response
 
+    def get_external_control_status(self):
+        """
+        Returns the ride height external control status precondition passed through bdd, None if it is not set
+        """
+        return self.preconditions.get("ride height external control status")
+
     def validate_suspension_req(self, request):
         """
-        Validates incoming requests for setting various suspension settings. Raises an exception upon failure.
+        Validates incoming requests for setting various suspension settings and applies them to the state.
+        Raises an exception upon failure.
 
         Args:
             request(protobuf): the request object to be validated
         """
-
-        # check command value
-        if request.command not in RideHeight.RideHeightLevel.values():
-            raise ValidationError(12, "Command value not supported.")
+        self.validation_rules.validate(self, request)
 
         # Set Ride Height Request
-        elif isinstance(request, SetRideHeightRequest):
+        if isinstance(request, SetRideHeightRequest):
             # handle preconditions passed through bdd
-
-            if "ride height external control status" in self.state["preconditions"]:
-
-                if self.state["preconditions"]["ride height external control status"] == "active":
-
-                    if self.state["ride_height_system_status"]["source"] == RideHeightSystemStatus.Source.Value("S_USER"):
-                        self.state["ride_height"]["target_height"] = request.command
-                        self.state["ride_height"]["current_height"] = request.command
-
-                    elif self.state["ride_height_system_status"]["source"] == RideHeightSystemStatus.Source.Value("S_APP"):
-
-                        if request.command == RideHeight.RideHeightLevel.Value("RHL_UNSPECIFIED"):
-                            raise ValidationError(3, "Command value unspecified.")
-                        elif request.command in self.state["ride_height"]["supported_heights"]:
-
-                            self.state["ride_height"]["target_height"] = request.command
-                            self.state["ride_height"]["current_height"] = request.command
-
-                            if request.motion_speed != SetRideHeightRequest.MotionSpeedCommand.Value("MSC_UNSPECIFIED"):
-                                self.state["ride_height"]["motion_speed"] = request.motion_speed
-                            if request.motion_type != SetRideHeightRequest.MotionTypeCommand.Value("MTC_UNSPECIFIED"):
-                                self.state["ride_height"]["motion_type"] = request.motion_type
-
-                elif self.state["preconditions"]["ride height external control status"] == "Temporary Inhibit":
-                    raise ValidationError(10, "Value is not supported")
-
-                elif self.state["preconditions"]["ride height external control status"] == "Internally Arbitrated":
-                    raise ValidationError(10, "Value is not supported")
-
-                elif self.state["preconditions"]["ride height external control status"] == "Failed":
-                    raise ValidationError(1, "Cannot happen.")
-
-            else:
-                if request.command in self.state["ride_height"]["supported_heights"]:
-                    self.state["ride_height"]["target_height"] = request.command
-                    self.state["ride_height"]["current_height"] = request.command
-                if request.motion_speed != SetRideHeightRequest.MotionSpeedCommand.Value("MSC_UNSPECIFIED"):
-                    self.state["ride_height"]["motion_speed"] = request.motion_speed
-                if request.motion_type != SetRideHeightRequest.MotionTypeCommand.Value("MTC_UNSPECIFIED"):
-                    self.state["ride_height"]["motion_type"] = request.motion_type
+            control_status = self.get_external_control_status()
+            source = self.state_store["ride_height_system_status"].source
+            supported = request.command in self.state_store["ride_height"].supported_heights
+
+            if control_status is None:
+                if supported:
+                    self.state_store.set_fields("ride_height", target_height=request.command,
+                                                current_height=request.command)
+                self.update_motion(request)
+
+            elif control_status == "active":
+                if source == S_USER:
+                    self.state_store.set_fields("ride_height", target_height=request.command,
+                                                current_height=request.command)
+                elif source == S_APP and supported:
+                    self.state_store.set_fields("ride_height", target_height=request.command,
+                                                current_height=request.command)
+                    self.update_motion(request)
 
         return True
 
+    def update_motion(self, request):
+        """
+        Sets the motion speed and type of the ride height from a request, unless they are unspecified
+        """
+        if request.motion_speed != MSC_UNSPECIFIED:
+            self.state_store.set_field("ride_height", "motion_speed", request.motion_speed)
+        if request.motion_type != MTC_UNSPECIFIED:
+            self.state_store.set_field("ride_height", "motion_type", request.motion_type)
+
     def publish_suspension(self):
         """
         Publishes a suspension message based on the current state.
@@ -178,9 +192,7 @@ class SuspensionService(BaseService):
         Args:
         request(protobuf): the protobuf containing the rpc request
         """
-        topic = KEY_URI_PREFIX + ":/chassis.suspension/1/ride_height#RideHeight"
-
-        self.publish(topic, self.state["ride_height"], True)
+        self.publish_state("ride_height", True)
 
 
 class SuspensionPreconditions(UListener):
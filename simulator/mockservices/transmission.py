@@ -30,11 +30,11 @@ from simulator.core.abstract_service import BaseService
 
 class TransmissionService(BaseService):
 
-    def __init__(self, portal_callback=None):
+    def __init__(self, portal_callback=None, authority=None):
         """
         TransmissionService constructor
         """
-        super().__init__('propulsion.transmission', portal_callback)
+        super().__init__('propulsion.transmission', portal_callback, authority=authority)
         self.init_state()
 
     def init_state(self):
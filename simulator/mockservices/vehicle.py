@@ -19,9 +19,7 @@ class VehicleService(BaseService):
     The Vehicle object handles mock services for the vehicle service
     """
 
-    state = {}
-
-    def __init__(self, portal_callback=None):
+    def __init__(self, portal_callback=None, authority=None):
         """
         VehicleService constructor:
         """
@@ -29,6 +27,7 @@ class VehicleService(BaseService):
         super().__init__(
             "vehicle",
             portal_callback,
+            authority=authority,
         )
         self.init_state()
 
@@ -47,20 +46,19 @@ class VehicleService(BaseService):
         """
         Initializes internal data structures for keeping track of the current state of the trip meter service
         """
-        self.state = {}
-
         # add trip values
         for trip in TripMeter.Resources.keys():
-            self.state[trip] = self.init_message_state(TripMeter)
-            self.state[trip]["name"] = trip
+            self.state_store.register(trip, TripMeter, KEY_URI_PREFIX + ":/vehicle/1/trip_meter." + trip + "#TripMeter",
+                                      name=trip)
 
         # add transport mode state
         for mode in VehicleUsage.Resources.keys():
-            self.state[mode] = self.init_message_state(VehicleUsage)
+            self.state_store.register(mode, VehicleUsage,
+                                      KEY_URI_PREFIX + ":/vehicle/1/vehicle_usage." + mode + "#VehicleUsage")
 
     def set_topic_state(self, uri, message):
         """
-        Sets state dictionary with values passed by the uBus, overwritting default values assigned during initialization
+        Sets the state with values passed by the uBus, overwritting default values assigned during initialization
 
         Args:
             uri (str): String to identify specific car component eg.
@@ -76,10 +74,10 @@ class VehicleService(BaseService):
         print(f"Topic name: {topic}")
 
         if isinstance(message, TripMeter):
-            self.state[topic]["value"] = message.value
+            self.state_store.set_field(topic, "value", message.value)
         if isinstance(message, VehicleUsage):
-            self.state["transport_mode"]["is_setting_change_allowed"] = message.is_setting_change_allowed
-            self.state["transport_mode"]["is_active"] = message.is_active
+            self.state_store.set_fields("transport_mode", is_setting_change_allowed=message.is_setting_change_allowed,
+                                        is_active=message.is_active)
 
     @BaseService.RequestListener
     def ResetTripMeter(self, request, response):
@@ -89,6 +87,14 @@ class VehicleService(BaseService):
     def SetTransportMode(self, request, response):
         return self.handle_request(request, response)
 
+    def get_request_resource(self, request):
+        """
+        Requests for the same trip meter, or the transport mode, are handled in order
+        """
+        if isinstance(request, ResetTripMeterRequest):
+            return request.trip_meter
+        return "transport_mode"
+
     def handle_request(self, request, response):
         """
         Handles vehicle RPC calls
@@ -125,21 +131,21 @@ class VehicleService(BaseService):
             if request.trip_meter not in TripMeter.Resources.values():
                 raise ValidationError(12, f"Unsupported trip meter name {request.trip_meter}.")
             elif request.trip_meter == TripMeter.Resources.Value("trip_1"):
-                self.state["trip_1"]["value"] = float(0)
+                self.state_store.set_field("trip_1", "value", float(0))
             elif request.trip_meter == TripMeter.Resources.Value("trip_2"):
-                self.state["trip_2"]["value"] = float(0)
+                self.state_store.set_field("trip_2", "value", float(0))
 
         # Set Transport Mode Request
         elif isinstance(request, SetTransportModeRequest):
-            if not self.state["transport_mode"]["is_setting_change_allowed"]:
+            if not self.state_store["transport_mode"].is_setting_change_allowed:
                 raise ValidationError(
                     9,
                     f"Failed precondition value: is_setting_change_allowed is "
-                    f"{self.state['transport_mode']['is_setting_change_allowed']} when should be "
+                    f"{self.state_store['transport_mode'].is_setting_change_allowed} when should be "
                     f"True.",
                 )
             else:
-                self.state["transport_mode"]["is_active"] = request.is_active
+                self.state_store.set_field("transport_mode", "is_active", request.is_active)
 
         return True
 
@@ -153,12 +159,10 @@ class VehicleService(BaseService):
         if isinstance(request, ResetTripMeterRequest):
             # get trip_meter key from value, expecting 0 - trip_1 or 1 - trip_2
             trip_val = list(TripMeter.Resources.keys())[list(TripMeter.Resources.values()).index(request.trip_meter)]
-            topic = KEY_URI_PREFIX + ":/vehicle/1/trip_meter." + trip_val + "#TripMeter"
-            self.publish(topic, self.state[trip_val], True)
+            self.publish_state(trip_val, True)
 
         if isinstance(request, SetTransportModeRequest):
-            topic = KEY_URI_PREFIX + ":/vehicle/1/vehicle_usage.transport_mode#VehicleUsage"
-            self.publish(topic, self.state, True)
+            self.publish_state("transport_mode", True)
 
         return True
 
@@ -27,7 +27,6 @@
 import json
 import logging
 import threading
-import time
 import traceback
 
 from flask_socketio import SocketIO
@@ -44,62 +43,21 @@ from uprotocol.uri.serializer.longuriserializer import LongUriSerializer
 import simulator.ui.utils.common_handlers as Handlers
 import simulator.utils.constant as CONSTANTS
 from simulator.core import protobuf_autoloader
+from simulator.core.service_host import load_service_class
 from simulator.utils.common_util import verify_all_checks
 
 logger = logging.getLogger("Simulator")
 
+PUBLISH_TIMEOUT = 5  # seconds to wait for a publish to reach the transport before reporting it as still queued
+
 mock_entity = []
 
 
 def start_service(entity, callback):
-    global service
-
-    if entity == "chassis.braking":
-        from simulator.mockservices.braking import BrakingService
-
-        service = BrakingService(callback)
-    elif entity == "body.cabin_climate":
-        from simulator.mockservices.cabin_climate import CabinClimateService
-
-        service = CabinClimateService(callback)
-    elif entity == "chassis":
-        from simulator.mockservices.chassis import ChassisService
-
-        service = ChassisService(callback)
-    elif entity == "propulsion.engine":
-        from simulator.mockservices.engine import EngineService
-
-        service = EngineService(callback)
-    elif entity == "vehicle.exterior":
-        from simulator.mockservices.exterior import VehicleExteriorService
-
-        service = VehicleExteriorService(callback)
-    elif entity == "example.hello_world":
-        from simulator.mockservices.hello_world import HelloWorldService
-
-        service = HelloWorldService(callback)
-    elif entity == "body.horn":
-        from simulator.mockservices.horn import HornService
-
-        service = HornService(callback)
-    elif entity == "body.mirrors":
-        from simulator.mockservices.mirrors import BodyMirrorsService
-
-        service = BodyMirrorsService(callback)
-    elif entity == "chassis.suspension":
-        from simulator.mockservices.suspension import SuspensionService
-
-        service = SuspensionService(callback)
-    elif entity == "propulsion.transmission":
-        from simulator.mockservices.transmission import TransmissionService
-
-        service = TransmissionService(callback)
-    elif entity == "vehicle":
-        from simulator.mockservices.vehicle import VehicleService
-
-        service = VehicleService(callback)
-
-    if service is not None:
+    # the entity comes from the client, only bundled services may be started
+    service_class = load_service_class(entity)
+    if service_class is not None:
+        service = service_class(callback)
         service.start()
         mock_entity.append({"name": entity, "entity": service})
 
@@ -223,8 +181,9 @@ class SocketUtility:
                     service_class
                 )
                 if service_instance is not None:
+                    # wait for the publish to go out, so the status shown is the transport's
                     message, status = service_instance.publish(
-                        topic, json_data
+                        topic, json_data, timeout=PUBLISH_TIMEOUT
                     )
                     self.last_published_data = MessageToDict(message)
                     Handlers.publish_status_handler(
@@ -284,7 +243,6 @@ class SocketUtility:
 
             try:
                 start_service(json_service["entity"], handler)
-                time.sleep(1)
                 self.socketio.emit(
                     CONSTANTS.CALLBACK_START_SERVICE,
                     json_service["entity"],
@@ -85,3 +85,18 @@ KEY_ISFAILED = "isfailed"
 KEY_TIME = "time"
 KEY_PROTO_ENTITY_NAME = "uprotocol"
 KEY_URI_PREFIX = "up"
+
+# entity name -> class of the bundled mock service implementing it
+MOCK_SERVICES = {
+    "chassis.braking": "simulator.mockservices.braking.BrakingService",
+    "body.cabin_climate": "simulator.mockservices.cabin_climate.CabinClimateService",
+    "chassis": "simulator.mockservices.chassis.ChassisService",
+    "propulsion.engine": "simulator.mockservices.engine.EngineService",
+    "vehicle.exterior": "simulator.mockservices.exterior.VehicleExteriorService",
+    "example.hello_world": "simulator.mockservices.hello_world.HelloWorldService",
+    "body.horn": "simulator.mockservices.horn.HornService",
+    "body.mirrors": "simulator.mockservices.mirrors.BodyMirrorsService",
+    "chassis.suspension": "simulator.mockservices.suspension.SuspensionService",
+    "propulsion.transmission": "simulator.mockservices.transmission.TransmissionService",
+    "vehicle": "simulator.mockservices.vehicle.VehicleService",
+}
@@ -0,0 +1,76 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import threading
+import time
+
+from simulator.core.clock import SteppedClock
+
+
+class Waiter:
+    """
+    Waits on a condition through the clock until a virtual deadline, like the core's background threads
+    """
+
+    def __init__(self, clock, timeout):
+        self.clock = clock
+        self.deadline = clock.monotonic() + timeout
+        self.condition = threading.Condition()
+        self.done = threading.Event()
+        self.wakeups = 0
+        threading.Thread(target=self.__run, daemon=True).start()
+
+    def __run(self):
+        with self.condition:
+            while self.clock.monotonic() < self.deadline:
+                self.clock.wait(self.condition, self.deadline - self.clock.monotonic())
+                self.wakeups += 1
+        self.done.set()
+
+
+def test_waiters_wake_only_when_time_is_advanced_past_their_deadline():
+    clock = SteppedClock()
+    waiter = Waiter(clock, 10)
+
+    assert not waiter.done.wait(0.2)
+    clock.advance(5)
+    assert not waiter.done.wait(0.2)
+    clock.advance(5)
+    assert waiter.done.wait(5)
+
+
+def test_waiters_do_not_poll_between_steps():
+    clock = SteppedClock()
+    waiter = Waiter(clock, 1)
+    time.sleep(0.3)
+
+    # the first wait on a condition returns at once, later ones only when time moves
+    assert waiter.wakeups <= 1
+    start = time.monotonic()
+    clock.advance(1)
+    assert waiter.done.wait(5)
+    assert time.monotonic() - start < 1
@@ -0,0 +1,131 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import pytest
+from google.protobuf import any_pb2
+from google.protobuf.struct_pb2 import Struct
+from uprotocol.proto.uri_pb2 import UEntity, UResource, UUri
+from uprotocol.proto.ustatus_pb2 import UStatus
+
+from simulator.core.exceptions import ValidationError
+from simulator.core.field_mask import get_field_mask
+
+
+def make_uri():
+    return UUri(entity=UEntity(name="body.access", version_major=1),
+                resource=UResource(name="door", instance="front_left", message="Door"))
+
+
+def test_paths_are_compiled_in_mask_order():
+    mask = get_field_mask(UUri.DESCRIPTOR, ["resource", "entity.name"])
+
+    assert list(mask) == ["resource", "entity"]
+    assert "entity" in mask and "authority" not in mask
+    assert len(mask) == 2
+
+
+def test_empty_and_wildcard_masks_select_every_field():
+    for paths in ([], ["*"], ["uuri.*"]):
+        assert list(get_field_mask(UUri.DESCRIPTOR, paths)) == ["authority", "entity", "resource"]
+
+
+def test_the_prefix_and_message_name_are_dropped_from_paths():
+    assert list(get_field_mask(UUri.DESCRIPTOR, ["uri.entity"], "uri")) == ["entity"]
+    assert list(get_field_mask(UUri.DESCRIPTOR, ["UUri.resource"])) == ["resource"]
+
+
+def test_compiled_masks_are_cached():
+    assert get_field_mask(UUri.DESCRIPTOR, ["entity"]) is get_field_mask(UUri.DESCRIPTOR, ("entity",))
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValidationError) as error:
+        get_field_mask(UUri.DESCRIPTOR, ["entity.colour"])
+
+    assert error.value.code == 3
+    assert "uprotocol.v1.UEntity has no field colour" in error.value.message
+
+
+def test_scalar_fields_have_no_nested_fields():
+    with pytest.raises(ValidationError) as error:
+        get_field_mask(UStatus.DESCRIPTOR, ["message.text"])
+
+    assert error.value.code == 3
+    assert "message has no nested fields" in error.value.message
+
+
+def test_only_masked_fields_are_copied():
+    target = UUri(entity=UEntity(name="chassis", version_major=2, version_minor=3))
+    get_field_mask(UUri.DESCRIPTOR, ["entity.name", "resource"]).apply(make_uri(), target)
+
+    assert target.entity == UEntity(name="body.access", version_major=2, version_minor=3)
+    assert target.resource == make_uri().resource
+    assert not target.HasField("authority")
+
+
+def test_a_whole_field_wins_over_its_nested_paths():
+    target = UUri(entity=UEntity(name="chassis", version_major=2))
+    get_field_mask(UUri.DESCRIPTOR, ["entity", "entity.name"]).apply(make_uri(), target)
+
+    assert target.entity == make_uri().entity
+
+
+def test_repeated_fields_and_maps_are_replaced():
+    detail = any_pb2.Any()
+    detail.Pack(UStatus(message="new"))
+    source = UStatus(details=[detail])
+    target = UStatus(details=[any_pb2.Any(), any_pb2.Any()])
+    get_field_mask(UStatus.DESCRIPTOR, ["details"]).apply(source, target)
+
+    assert list(target.details) == [detail]
+
+    source = Struct()
+    source.update({"speed": 10})
+    target = Struct()
+    target.update({"speed": 3, "gear": "D"})
+    get_field_mask(Struct.DESCRIPTOR, ["fields"]).apply(source, target)
+
+    assert dict(target) == {"speed": 10}
+
+
+def test_masks_apply_to_state_dictionaries():
+    state = {"authority": None, "entity": {"name": "chassis", "id": 0, "version_major": 2, "version_minor": 0},
+             "resource": None}
+    get_field_mask(UUri.DESCRIPTOR, ["entity.name", "resource"]).apply(make_uri(), state)
+
+    assert state["entity"] == {"name": "body.access", "id": 0, "version_major": 2, "version_minor": 0}
+    assert state["resource"] == make_uri().resource
+    assert state["authority"] is None
+
+
+def test_a_single_field_may_be_applied_alone():
+    target = UUri()
+    mask = get_field_mask(UUri.DESCRIPTOR, ["entity", "resource"])
+    mask.apply(make_uri(), target, field="resource")
+
+    assert target.resource == make_uri().resource
+    assert not target.HasField("entity")
@@ -0,0 +1,112 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import pytest
+
+pytest.importorskip("target.protofiles", reason="needs the protos compiled by setup_simulator.py")
+
+from uprotocol.proto.ustatus_pb2 import UStatus, UCode  # noqa: E402
+from uprotocol.uri.serializer.longuriserializer import LongUriSerializer  # noqa: E402
+
+import simulator.core.abstract_service as abstract_service  # noqa: E402
+from simulator.core.abstract_service import BaseService  # noqa: E402
+
+TOPIC = "up:/body.access/1/door.front_left#Door"
+
+
+class Vehicle(BaseService):
+    rpc_workers = 2
+
+
+class FakeTransport:
+    """
+    Records the topic of every publish
+    """
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, umessage):
+        self.sent.append(LongUriSerializer().serialize(umessage.attributes.source))
+        return UStatus(message="OK", code=UCode.OK)
+
+
+@pytest.fixture
+def fleet(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(abstract_service, "fleet_resources", {})
+    return [Vehicle("body.access", use_signal_handler=False, authority=f"vehicle-{n}") for n in (1, 2)]
+
+
+def test_uris_are_qualified_by_the_authority(fleet):
+    vehicle = fleet[0]
+
+    assert vehicle.localize_uri(TOPIC) == "up://vehicle-1/body.access/1/door.front_left#Door"
+    assert vehicle.localize_uri("/body.access/1/door.front_left#Door") == \
+        "//vehicle-1/body.access/1/door.front_left#Door"
+    assert vehicle.localize_uri("up://vehicle-9/body.access/1/door.front_left#Door") == \
+        "up://vehicle-9/body.access/1/door.front_left#Door"
+
+
+def test_uris_are_left_as_is_outside_a_fleet(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    vehicle = Vehicle("body.access", use_signal_handler=False)
+
+    assert vehicle.localize_uri(TOPIC) == TOPIC
+
+
+def test_fleet_instances_share_their_threads(fleet):
+    first, second = fleet
+    single = Vehicle("body.access", use_signal_handler=False)
+
+    assert first.publish_pipeline is second.publish_pipeline
+    assert first.rpc_executor is second.rpc_executor
+    assert single.publish_pipeline is not first.publish_pipeline
+    assert single.rpc_executor is not first.rpc_executor
+
+
+def test_fleet_instances_keep_their_own_state(fleet):
+    first, second = fleet
+    first.state["locked"] = True
+    first.save_state()
+    second.load_state()
+
+    assert first.state_file != second.state_file
+    assert first.state_file.endswith("@vehicle-1")
+    assert "locked" not in second.state
+
+
+def test_publishes_go_out_on_the_topic_of_their_vehicle(fleet):
+    for vehicle in fleet:
+        vehicle.transport_layer = FakeTransport()
+    first, second = fleet
+    first.publish(TOPIC, UStatus(message="open"))
+    second.publish(TOPIC, UStatus(message="closed"))
+
+    assert first.flush_publishes(5)
+    assert first.transport_layer.sent == ["//vehicle-1/body.access/1/door.front_left#Door"]
+    assert second.transport_layer.sent == ["//vehicle-2/body.access/1/door.front_left#Door"]
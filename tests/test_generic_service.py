@@ -0,0 +1,59 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import signal
+
+import pytest
+
+pytest.importorskip("target.protofiles", reason="needs the protos compiled by setup_simulator.py")
+
+from uprotocol.proto.ustatus_pb2 import UStatus  # noqa: E402
+
+from simulator.core import protobuf_autoloader  # noqa: E402
+from simulator.mockservices.generic import GenericService  # noqa: E402
+
+TOPICS = ["up:/body.seating/1/seat.row1_left#UStatus", "up:/body.seating/1/heater.row1_left#UStatus",
+          "up:/body.seating/1/seat.row1_right#UStatus"]
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    # a service whose topics carry UStatus messages, the message field names the resource of a request
+    monkeypatch.setattr(protobuf_autoloader, "get_topics_by_service",
+                        lambda service: [(topic, UStatus) for topic in TOPICS])
+    # keeps the test process's own signal handlers
+    monkeypatch.setattr(signal, "signal", lambda sig, handler: None)
+    return GenericService("body.seating")
+
+
+def test_requests_are_keyed_by_every_entry_they_address(service):
+    assert service.get_request_resource(UStatus(message="seat.row1_left")) == frozenset(["seat.row1_left"])
+    # the instance part of a resource name addresses every resource of that instance
+    resource = service.get_request_resource(UStatus(message="row1_left"))
+    assert resource == frozenset(["seat.row1_left", "heater.row1_left"])
+    assert service.get_request_resource(UStatus(message="row2_left")) == frozenset()
@@ -0,0 +1,147 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import itertools
+import threading
+
+from simulator.core.handler_executor import HandlerExecutor
+
+
+def keys_on_different_lanes(lanes):
+    """
+    Returns one resource key per lane of an executor with that many lanes
+    """
+    keys = {}
+    for n in itertools.count():
+        keys.setdefault(hash(f"resource-{n}") % lanes, f"resource-{n}")
+        if len(keys) == lanes:
+            return [keys[lane] for lane in range(lanes)]
+
+
+class Recorder:
+    def __init__(self):
+        self.order = []
+        self.lock = threading.Lock()
+
+    def task(self, name, gate=None):
+        if gate is not None:
+            gate.wait(5)
+        with self.lock:
+            self.order.append(name)
+
+
+def test_a_request_for_several_resources_keeps_its_order_with_each_of_them():
+    executor = HandlerExecutor(2, serialize_per_resource=True)
+    first, second = keys_on_different_lanes(2)
+    recorder = Recorder()
+    gate = threading.Event()
+
+    executor.submit(first, recorder.task, "first", gate)
+    both = executor.submit(frozenset([first, second]), recorder.task, "both")
+    later = executor.submit(second, recorder.task, "second")
+    # the request for both resources waits for the first one, and the second waits for it
+    assert not later.done()
+    gate.set()
+
+    later.result(5)
+    assert both.done()
+    assert recorder.order == ["first", "both", "second"]
+
+
+def test_requests_spanning_the_same_lanes_do_not_wait_for_each_other():
+    executor = HandlerExecutor(3, serialize_per_resource=True)
+    keys = keys_on_different_lanes(3)
+    recorder = Recorder()
+
+    futures = [executor.submit(frozenset(pair), recorder.task, pair)
+               for pair in itertools.permutations(keys, 2) for _ in range(20)]
+
+    for future in futures:
+        future.result(5)
+    assert len(recorder.order) == len(futures)
+
+
+def test_a_request_for_a_single_resource_of_a_set_runs_on_its_lane():
+    executor = HandlerExecutor(2, serialize_per_resource=True)
+    recorder = Recorder()
+
+    executor.submit(frozenset(["front"]), recorder.task, "set").result(5)
+    executor.submit(frozenset(), recorder.task, "none").result(5)
+    assert recorder.order == ["set", "none"]
+
+
+def test_requests_for_the_same_resource_run_one_at_a_time_in_order():
+    executor = HandlerExecutor(4, serialize_per_resource=True)
+    recorder = Recorder()
+    gate = threading.Event()
+
+    futures = [executor.submit("front", recorder.task, 0, gate)]
+    futures += [executor.submit("front", recorder.task, n) for n in range(1, 20)]
+    assert not futures[-1].done()
+    gate.set()
+
+    for future in futures:
+        future.result(5)
+    assert recorder.order == list(range(20))
+
+
+def test_requests_for_different_resources_run_in_parallel():
+    executor = HandlerExecutor(2, serialize_per_resource=True)
+    first, second = keys_on_different_lanes(2)
+    recorder = Recorder()
+    gate = threading.Event()
+
+    blocked = executor.submit(first, recorder.task, "first", gate)
+    executor.submit(second, recorder.task, "second").result(5)
+
+    assert not blocked.done()
+    gate.set()
+    blocked.result(5)
+    assert recorder.order == ["second", "first"]
+
+
+def test_handlers_run_concurrently_without_resource_serialization():
+    executor = HandlerExecutor(4)
+    started = threading.Barrier(4)
+
+    # each handler waits for the others, which only works if all four run at once
+    futures = [executor.submit("front", started.wait, 5) for _ in range(4)]
+
+    for future in futures:
+        future.result(5)
+
+
+def test_a_failing_handler_does_not_stop_its_lane():
+    executor = HandlerExecutor(1, serialize_per_resource=True)
+    recorder = Recorder()
+
+    def fail():
+        raise ValueError("handler failed")
+
+    executor.submit("front", fail)
+    executor.submit("front", recorder.task, "after").result(5)
+    assert recorder.order == ["after"]
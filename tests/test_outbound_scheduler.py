@@ -0,0 +1,127 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import threading
+
+from uprotocol.proto.uattributes_pb2 import UMessageType, UPriority
+
+from simulator.core.outbound_scheduler import OutboundScheduler
+
+PUBLISH = UMessageType.UMESSAGE_TYPE_PUBLISH
+RESPONSE = UMessageType.UMESSAGE_TYPE_RESPONSE
+
+
+class BlockingSink:
+    """
+    Records every write. The first write blocks until released, so messages pile up in the scheduler meanwhile.
+    """
+
+    def __init__(self, results=()):
+        self.writes = []
+        self.results = list(results)  # return values of the first writes, True afterwards
+        self.entered = threading.Event()  # set once the writer is blocked in the first write
+        self.release = threading.Event()
+        self.written = threading.Condition()
+
+    def __call__(self, data):
+        if not self.writes:
+            self.entered.set()
+            self.release.wait(5)
+        with self.written:
+            self.writes.append(data)
+            self.written.notify_all()
+        return self.results.pop(0) if self.results else True
+
+    def wait_for(self, predicate, timeout=5):
+        with self.written:
+            return self.written.wait_for(lambda: predicate(self.writes), timeout)
+
+
+def test_response_is_sent_in_the_next_batch_during_a_publish_flood():
+    sink = BlockingSink()
+    scheduler = OutboundScheduler(sink, max_batch_size=8)
+    scheduler.submit(UPriority.UPRIORITY_CS0, PUBLISH, "publish-first\n")
+    assert sink.entered.wait(5)
+    for i in range(500):
+        scheduler.submit(UPriority.UPRIORITY_CS0, PUBLISH, f"publish-{i}\n")
+    scheduler.submit(UPriority.UPRIORITY_CS4, RESPONSE, "response\n")
+    sink.release.set()
+
+    assert sink.wait_for(lambda writes: len(writes) >= 2)
+    assert sink.writes[0] == "publish-first\n"
+    assert sink.writes[1].startswith("response\n")
+    assert sink.wait_for(lambda writes: sum(write.count("\n") for write in writes) == 502)
+
+
+def test_response_goes_before_publishes_of_the_same_priority():
+    sink = BlockingSink()
+    scheduler = OutboundScheduler(sink, max_batch_size=8)
+    scheduler.submit(UPriority.UPRIORITY_CS0, PUBLISH, "publish-first\n")
+    assert sink.entered.wait(5)
+    for i in range(20):
+        scheduler.submit(UPriority.UPRIORITY_CS0, PUBLISH, f"publish-{i}\n")
+    scheduler.submit(UPriority.UPRIORITY_CS0, RESPONSE, "response\n")
+    sink.release.set()
+
+    assert sink.wait_for(lambda writes: len(writes) >= 2)
+    assert sink.writes[1].startswith("response\n")
+
+
+def test_failed_write_is_requeued_and_retried():
+    sink = BlockingSink(results=[False])
+    sink.release.set()
+    scheduler = OutboundScheduler(sink, retry_delay=0.01)
+    scheduler.submit(UPriority.UPRIORITY_CS0, PUBLISH, "publish\n")
+
+    assert sink.wait_for(lambda writes: len(writes) >= 2)
+    assert sink.writes[:2] == ["publish\n", "publish\n"]
+    metrics = scheduler.get_metrics()["UPRIORITY_CS0"]
+    assert metrics["failed"] == 1
+    assert metrics["sent"] == 1
+    assert metrics["depth"] == 0
+
+
+def test_publishers_wait_for_room_once_the_queue_is_full():
+    sink = BlockingSink()
+    scheduler = OutboundScheduler(sink, max_batch_size=8, max_queued_publishes=10)
+    scheduler.submit(UPriority.UPRIORITY_CS0, PUBLISH, "publish-first\n")
+    assert sink.entered.wait(5)
+    publisher = threading.Thread(target=lambda: [scheduler.submit(UPriority.UPRIORITY_CS0, PUBLISH, f"publish-{i}\n")
+                                                 for i in range(100)], daemon=True)
+    publisher.start()
+
+    publisher.join(0.2)
+    assert publisher.is_alive()
+    assert scheduler.get_queue_depths()["UPRIORITY_CS0"] == 10
+    # responses are never held up by publishes
+    scheduler.submit(UPriority.UPRIORITY_CS0, RESPONSE, "response\n")
+    sink.release.set()
+
+    publisher.join(5)
+    assert not publisher.is_alive()
+    assert sink.wait_for(lambda writes: sum(write.count("\n") for write in writes) == 102)
+    assert scheduler.get_metrics()["UPRIORITY_CS0"]["max_depth"] <= 11
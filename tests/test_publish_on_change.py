@@ -0,0 +1,107 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import threading
+
+import pytest
+
+pytest.importorskip("target.protofiles", reason="needs the protos compiled by setup_simulator.py")
+
+from google.protobuf import any_pb2  # noqa: E402
+from uprotocol.proto.ustatus_pb2 import UStatus, UCode  # noqa: E402
+
+from simulator.core.abstract_service import BaseService  # noqa: E402
+
+TOPIC = "up:/body.access/1/door.front_left#Door"
+
+
+class FakeTransport:
+    """
+    Records the payload of every publish. Sends block while the gate is closed and fail while failing is set.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.failing = False
+
+    def send(self, umessage):
+        self.gate.wait(5)
+        if self.failing:
+            return UStatus(message="host unreachable", code=UCode.UNAVAILABLE)
+        message = UStatus()
+        any_pb2.Any.FromString(umessage.payload.value).Unpack(message)
+        self.sent.append(message.message)
+        return UStatus(message="OK", code=UCode.OK)
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    service = BaseService("body.access", use_signal_handler=False)
+    service.transport_layer = FakeTransport()
+    service.set_publish_on_change(True)
+    return service
+
+
+def test_a_payload_published_again_after_a_queued_change_is_sent(service):
+    transport = service.transport_layer
+    service.publish(TOPIC, UStatus(message="A"))
+    assert service.flush_publishes(5)
+
+    transport.gate.clear()
+    service.publish(TOPIC, UStatus(message="B"))
+    # B is still queued, A differs from it
+    service.publish(TOPIC, UStatus(message="A"))
+    transport.gate.set()
+
+    assert service.flush_publishes(5)
+    assert transport.sent == ["A", "B", "A"]
+    assert service.suppressed_publishes == 0
+
+
+def test_unchanged_publishes_are_suppressed(service):
+    service.publish(TOPIC, UStatus(message="A"))
+    service.publish(TOPIC, UStatus(message="A"))
+
+    assert service.flush_publishes(5)
+    assert service.transport_layer.sent == ["A"]
+    assert service.suppressed_publishes == 1
+
+
+def test_a_payload_which_failed_to_send_may_be_published_again(service):
+    transport = service.transport_layer
+    transport.failing = True
+    service.publish(TOPIC, UStatus(message="A"))
+    assert service.flush_publishes(5)
+
+    transport.failing = False
+    service.publish(TOPIC, UStatus(message="A"))
+
+    assert service.flush_publishes(5)
+    assert transport.sent == ["A"]
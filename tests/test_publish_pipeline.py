@@ -0,0 +1,99 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import pytest
+
+from simulator.core.publish_pipeline import PublishPipeline
+
+
+class Recorder:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, topic, message):
+        self.sent.append((topic, message))
+
+    def send_batch(self, items):
+        self.sent.extend(items)
+
+
+def test_batch_replaces_publishes_held_in_the_coalesce_window():
+    recorder = Recorder()
+    pipeline = PublishPipeline(recorder.send, coalesce_window=0.05, send_batch=recorder.send_batch)
+    for value in range(5):
+        pipeline.submit("a", value)
+    pipeline.submit("b", 1)
+    pipeline.submit_batch([("a", 99), ("c", 1)])
+
+    assert pipeline.flush(5)
+    assert recorder.sent == [("a", 99), ("c", 1), ("b", 1)]
+    assert pipeline.coalesced == 5
+
+
+def test_publishes_after_a_batch_follow_it():
+    recorder = Recorder()
+    pipeline = PublishPipeline(recorder.send, coalesce_window=0.05, send_batch=recorder.send_batch)
+    pipeline.submit_batch([("a", 1), ("b", 1)])
+    pipeline.submit("a", 2)
+
+    assert pipeline.flush(5)
+    assert recorder.sent == [("a", 1), ("b", 1), ("a", 2)]
+
+
+def test_publishes_are_sent_with_their_own_send_callable():
+    first, second = Recorder(), Recorder()
+    pipeline = PublishPipeline()
+    pipeline.submit("a", 1, first.send)
+    pipeline.submit_batch([("b", 1), ("c", 1)], second.send_batch)
+    pipeline.submit("d", 1, second.send)
+
+    assert pipeline.flush(5)
+    assert first.sent == [("a", 1)]
+    assert second.sent == [("b", 1), ("c", 1), ("d", 1)]
+
+
+def test_futures_report_the_outcome_of_the_publish():
+    pipeline = PublishPipeline(lambda topic, message: f"sent {message}", coalesce_window=0.05,
+                               send_batch=lambda items: "batch sent")
+    replaced = pipeline.submit("a", 1)
+    latest = pipeline.submit("a", 2)
+    held = pipeline.submit("b", 1)
+    batch = pipeline.submit_batch([("b", 2), ("c", 1)])
+
+    assert replaced.result(5) == latest.result(5) == "sent 2"
+    assert held.result(5) == "batch sent"
+    assert [future.result(5) for future in batch] == ["batch sent", "batch sent"]
+
+
+def test_futures_raise_send_failures():
+    def fail(topic, message):
+        raise ConnectionError("host unreachable")
+
+    future = PublishPipeline(fail).submit("a", 1)
+
+    with pytest.raises(ConnectionError):
+        future.result(5)
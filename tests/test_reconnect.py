@@ -0,0 +1,164 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import json
+import socket
+import threading
+import time
+
+import pytest
+from uprotocol.cloudevent.serialize.base64protobufserializer import Base64ProtobufSerializer
+from uprotocol.proto.ustatus_pb2 import UStatus, UCode
+from uprotocol.uri.serializer.longuriserializer import LongUriSerializer
+
+from simulator.core.binder_utransport import AndroidBinder, SocketClient
+
+
+class FakeHost:
+    """
+    Accepts one connection at a time and answers every register_rpc with a status whose message is the
+    registered uri, so replies can be told apart. Connections can be dropped instead of answering.
+    """
+
+    def __init__(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen()
+        self.address = self.server.getsockname()
+        self.lines = []  # (connection number, json map) of every line received
+        self.connections = 0
+        self.drop_on = None  # uri whose registration closes the connection instead of being answered
+        self.condition = threading.Condition()
+        threading.Thread(target=self.__accept_loop, daemon=True).start()
+
+    def __accept_loop(self):
+        while True:
+            connection, _ = self.server.accept()
+            with self.condition:
+                self.connections += 1
+                number = self.connections
+                self.condition.notify_all()
+            threading.Thread(target=self.__serve, args=(connection, number), daemon=True).start()
+
+    def __serve(self, connection, number):
+        buffer = b""
+        while True:
+            data = connection.recv(65536)
+            if not data:
+                return
+            buffer += data
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                json_map = json.loads(line)
+                with self.condition:
+                    self.lines.append((number, json_map))
+                    self.condition.notify_all()
+                if json_map["action"] != "register_rpc":
+                    continue
+                if json_map["data"] == self.drop_on:
+                    self.drop_on = None
+                    connection.close()
+                    return
+                status = UStatus(code=UCode.OK, message=json_map["data"])
+                reply = {"action": "register_rpc_status",
+                         "data": Base64ProtobufSerializer().deserialize(status.SerializeToString())}
+                connection.sendall((json.dumps(reply) + "\n").encode("utf-8"))
+
+    def wait_for(self, predicate, timeout=5):
+        with self.condition:
+            return self.condition.wait_for(predicate, timeout)
+
+
+def registration(method_uri):
+    return Base64ProtobufSerializer().deserialize(LongUriSerializer().deserialize(method_uri).SerializeToString())
+
+
+@pytest.fixture
+def host():
+    return FakeHost()
+
+
+@pytest.fixture
+def binder(host):
+    # the socket client is a singleton, every test gets a fresh one with no registrations
+    SocketClient._instance = None
+    binder = AndroidBinder()
+    binder.client.server_address = host.address
+    return binder
+
+
+def test_registrations_are_replayed_after_reconnect_without_mixing_up_replies(host, binder):
+    say_hello = "/example.hello_world/1/rpc.SayHello"
+    say_goodbye = "/example.hello_world/1/rpc.SayGoodbye"
+    say_again = "/example.hello_world/1/rpc.SayAgain"
+
+    status = binder.register_rpc_listener(LongUriSerializer().deserialize(say_hello), object())
+    assert status.message == registration(say_hello)
+
+    # the host goes away while a registration waits for its reply
+    host.drop_on = registration(say_goodbye)
+    start = time.monotonic()
+    status = binder.register_rpc_listener(LongUriSerializer().deserialize(say_goodbye), object())
+    assert status.code == UCode.UNAVAILABLE
+    assert time.monotonic() - start < 5
+
+    # a registration racing the reconnect reaches the host after the replay, and still gets its own reply
+    assert host.wait_for(lambda: host.connections == 2)
+    status = binder.register_rpc_listener(LongUriSerializer().deserialize(say_again), object())
+    assert status.code == UCode.OK
+    assert status.message == registration(say_again)
+
+    replayed = [json_map["data"] for number, json_map in host.lines if number == 2]
+    assert replayed == [registration(say_hello), registration(say_goodbye), registration(say_again)]
+
+
+def test_registrations_are_replayed_again_when_the_connection_drops_during_the_replay(host, binder, monkeypatch):
+    client = binder.client
+    say_hello = "/example.hello_world/1/rpc.SayHello"
+    say_goodbye = "/example.hello_world/1/rpc.SayGoodbye"
+    assert binder.register_rpc_listener(LongUriSerializer().deserialize(say_hello), object()).code == UCode.OK
+
+    replay_registrations = client.replay_registrations
+    drops = []
+
+    def drop_then_replay():
+        if not drops:
+            # the connection is lost again right before the replay is written
+            drops.append(True)
+            client.disconnect()
+        return replay_registrations()
+
+    monkeypatch.setattr(client, "replay_registrations", drop_then_replay)
+    host.drop_on = registration(say_goodbye)
+    assert binder.register_rpc_listener(LongUriSerializer().deserialize(say_goodbye), object()).code == UCode.UNAVAILABLE
+
+    # nothing is sent meanwhile, the reconnect manager retries on its own
+    assert host.wait_for(lambda: len([line for line in host.lines if line[0] == 3]) == 2)
+    assert [json_map["data"] for number, json_map in host.lines if number == 2] == []
+    replayed = [json_map["data"] for number, json_map in host.lines if number == 3]
+    assert replayed == [registration(say_hello), registration(say_goodbye)]
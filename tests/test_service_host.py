@@ -0,0 +1,45 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import pytest
+
+from simulator.core.service_host import load_service_class
+
+
+def test_class_paths_are_not_loaded_by_default():
+    assert load_service_class("os.system") is None
+    assert load_service_class("simulator.core.abstract_service.BaseService") is None
+
+
+def test_class_paths_must_name_a_mock_service():
+    pytest.importorskip("target.protofiles", reason="needs the protos compiled by setup_simulator.py")
+    from simulator.core.abstract_service import BaseService
+
+    assert load_service_class("os.system", allow_class_path=True) is None
+    assert load_service_class("collections.OrderedDict", allow_class_path=True) is None
+    assert load_service_class("simulator.core.no_such_module.Service", allow_class_path=True) is None
+    assert load_service_class("simulator.core.abstract_service.BaseService", allow_class_path=True) is BaseService
@@ -0,0 +1,70 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import pytest
+
+pytest.importorskip("target.protofiles", reason="needs the protos compiled by setup_simulator.py")
+
+from uprotocol.proto.uri_pb2 import UEntity  # noqa: E402
+
+from simulator.core import protobuf_autoloader, signal_generator  # noqa: E402
+from simulator.core.signal_generator import SignalFeed, SignalGenerator  # noqa: E402
+
+TOPIC = "up:/example.hello_world/1/entity#UEntity"
+
+
+class Service:
+    service = "example.hello_world"
+
+
+@pytest.fixture
+def entity_topic(monkeypatch):
+    # version_major is an uint32 field without a minimum in maxmin_field
+    monkeypatch.setattr(protobuf_autoloader, "get_request_class_from_topic_uri", lambda topic: UEntity)
+    monkeypatch.setattr(signal_generator, "get_min_value", lambda field: None)
+    return TOPIC
+
+
+def test_unsigned_fields_without_a_known_minimum_start_at_zero(entity_topic):
+    feed = SignalFeed(Service(), seed=1).add(entity_topic, "version_major", signal_generator.NOISE, maximum=10)
+
+    values = [feed.generator.tick(t)[entity_topic]["version_major"] for t in range(50)]
+    assert all(isinstance(value, int) and 0 <= value <= 10 for value in values)
+
+
+def test_unsigned_fields_never_go_below_zero(entity_topic):
+    feed = SignalFeed(Service(), seed=1).add(entity_topic, "version_major", signal_generator.NOISE, minimum=-5,
+                                             maximum=5)
+
+    assert all(feed.generator.tick(t)[entity_topic]["version_major"] >= 0 for t in range(50))
+
+
+def test_signals_without_a_known_range_need_one(monkeypatch):
+    monkeypatch.setattr(signal_generator, "get_min_value", lambda field: None)
+
+    with pytest.raises(ValueError, match="No minimum is known for speed"):
+        SignalGenerator().add(TOPIC, "speed")
@@ -0,0 +1,140 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import os
+import pickle
+import threading
+
+from uprotocol.proto.ustatus_pb2 import UStatus, UCode
+
+from simulator.core.state_persistence import StateFlusher, StatePersistence
+from simulator.core.state_store import StateStore
+
+
+def start_store(path):
+    """
+    Creates a state store saved to path, restoring what a previous run saved, like BaseService does
+    """
+    store = StateStore()
+    persistence = StatePersistence(path, flush_interval=0)
+    persistence.watch(store)
+    store.restore(persistence.load())
+    return store, persistence
+
+
+def test_state_store_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "Service.store")
+    store, persistence = start_store(path)
+    store.register("front", UStatus, code=UCode.OK)
+    store.register("rear", UStatus)
+    store.set_fields("front", code=UCode.ABORTED, message="front door open")
+    assert persistence.flush(5)
+
+    store, persistence = start_store(path)
+    front = store.register("front", UStatus, code=UCode.OK)
+    rear = store.register("rear", UStatus)
+
+    assert front == UStatus(code=UCode.ABORTED, message="front door open")
+    assert rear == UStatus()
+    # restored entries are published again, but not saved again
+    assert store.dirty_keys() == ["front", "rear"]
+    assert not store.has_unsaved()
+
+
+def test_state_store_changes_are_saved_without_a_flush(tmp_path):
+    path = str(tmp_path / "Service.store")
+    store, persistence = start_store(path)
+    store.register("front", UStatus)
+    store.set_field("front", "message", "saved in the background")
+
+    assert persistence.flush(5)
+    assert StatePersistence(path).load()["front"] == UStatus(message="saved in the background").SerializeToString()
+
+
+def test_changes_are_replayed_from_the_log_on_top_of_the_snapshot(tmp_path):
+    path = str(tmp_path / "Service")
+    persistence = StatePersistence(path, flush_interval=0)
+    persistence.snapshot({"front": 1, "rear": 2, "spare": 3})
+    assert persistence.flush(5)
+    persistence.record("front", 10)
+    persistence.record("spare")
+    assert persistence.flush(5)
+
+    assert os.path.getsize(path + ".log") > 0
+    assert StatePersistence(path).load() == {"front": 10, "rear": 2}
+
+
+def test_the_log_is_compacted_into_the_snapshot(tmp_path):
+    path = str(tmp_path / "Service")
+    persistence = StatePersistence(path, flush_interval=0, min_compact_size=0)
+    persistence.record("front", 1)
+    assert persistence.flush(5)
+    persistence.record("front", 2)
+    persistence.record("rear", 3)
+    assert persistence.flush(5)
+
+    assert os.path.getsize(path + ".log") == 0
+    assert StatePersistence(path).load() == {"front": 2, "rear": 3}
+
+
+def test_a_record_cut_short_ends_the_replay(tmp_path):
+    path = str(tmp_path / "Service")
+    persistence = StatePersistence(path, flush_interval=0)
+    persistence.record("front", 1)
+    persistence.record("rear", 2)
+    assert persistence.flush(5)
+    with open(path + ".log", "r+b") as f:
+        f.truncate(os.path.getsize(path + ".log") - 3)
+
+    assert StatePersistence(path).load() == {"front": 1}
+
+
+def test_many_state_files_are_written_by_one_flusher_thread(tmp_path):
+    flusher = StateFlusher()
+    persistences = [StatePersistence(str(tmp_path / f"Service@vehicle-{n}"), flush_interval=0, flusher=flusher)
+                    for n in range(20)]
+    threads = threading.active_count()
+
+    for n, persistence in enumerate(persistences):
+        persistence.record("vehicle", n)
+    assert all(persistence.flush(5) for persistence in persistences)
+
+    assert threading.active_count() <= threads + 1
+    assert [StatePersistence(persistence.path).load() for persistence in persistences] == \
+        [{"vehicle": n} for n in range(20)]
+
+
+def test_changes_to_a_key_waiting_for_the_flusher_are_written_once(tmp_path):
+    path = str(tmp_path / "Service")
+    persistence = StatePersistence(path, flush_interval=60)
+    for value in range(10):
+        persistence.record("front", value)
+    assert persistence.flush(5)
+
+    with open(path + ".log", "rb") as f:
+        assert pickle.load(f) == ("front", pickle.dumps(9))
+        assert f.read() == b""
@@ -0,0 +1,102 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+from google.protobuf.field_mask_pb2 import FieldMask
+from uprotocol.proto.uri_pb2 import UEntity, UUri
+from uprotocol.proto.ustatus_pb2 import UStatus, UCode
+
+from simulator.core.state_store import StateStore
+
+
+def test_entries_are_registered_with_their_topic_and_initial_fields():
+    store = StateStore()
+    status = store.register("front", UStatus, "up:/body.access/1/door.front#UStatus", code=UCode.ABORTED)
+
+    assert store["front"] is status
+    assert status == UStatus(code=UCode.ABORTED)
+    assert store.get_topic("front") == "up:/body.access/1/door.front#UStatus"
+    assert store.get_topic("rear") is None
+    assert "front" in store and "rear" not in store
+
+
+def test_set_field_reports_whether_the_entry_changed():
+    store = StateStore()
+    store.register("front", UStatus, code=UCode.OK)
+    store.snapshot("front")
+
+    assert not store.set_field("front", "code", UCode.OK)
+    assert not store.is_dirty("front")
+    assert store.set_fields("front", code=UCode.ABORTED, message="open")
+    assert store.is_dirty("front")
+
+
+def test_nested_repeated_and_message_fields_are_set_in_place():
+    store = StateStore()
+    uri = store.register("uri", UUri)
+    paths = store.register("mask", FieldMask)
+
+    store.set_field("uri", "entity.name", "chassis")
+    assert uri.entity == UEntity(name="chassis")
+    store.set_field("uri", "entity", {"name": "body.access", "version_major": 1})
+    assert uri.entity == UEntity(name="body.access", version_major=1)
+    store.set_field("uri", "entity", UEntity(name="vehicle"))
+    assert uri.entity == UEntity(name="vehicle")
+    store.set_field("mask", "paths", ["zone.fan_speed"])
+    store.set_field("mask", "paths", ["zone.power"])
+    assert list(paths.paths) == ["zone.power"]
+
+
+def test_snapshots_are_copies_and_clear_the_dirty_flag():
+    store = StateStore()
+    store.register("front", UStatus)
+    store.register("rear", UStatus)
+    assert store.dirty_keys() == ["front", "rear"]
+
+    copy = store.snapshot("front")
+    store.set_field("front", "message", "open")
+
+    assert copy == UStatus()
+    assert store.dirty_keys() == ["front", "rear"]
+    store.snapshot("front")
+    store.snapshot("rear", clear_dirty=False)
+    assert store.dirty_keys() == ["rear"]
+
+
+def test_direct_changes_are_tracked_through_mark_dirty_and_update():
+    store = StateStore()
+    store.register("front", UStatus)
+    store.snapshot("front")
+
+    store.get("front").message = "changed directly"
+    assert not store.is_dirty("front")
+    store.mark_dirty("front")
+    assert store.is_dirty("front")
+
+    store.snapshot("front")
+    store.update("front", UStatus(code=UCode.ABORTED))
+    assert store["front"] == UStatus(code=UCode.ABORTED)
+    assert store.is_dirty("front")
@@ -0,0 +1,108 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import simulator.core.supervisor as supervisor_module
+from simulator.core.supervisor import ServiceSupervisor, Worker
+from simulator.core.transport_layer import TransportLayer
+
+
+def crash(target, conn, rpc_workers):
+    sys.exit(3)
+
+
+def exit_cleanly(target, conn, rpc_workers):
+    sys.exit(0)
+
+
+@pytest.fixture
+def supervisor(monkeypatch):
+    monkeypatch.setattr(TransportLayer, "_instance", None)
+    monkeypatch.setattr(TransportLayer, "_initialized", False)
+    monkeypatch.setattr(TransportLayer, "default_transport", "PROCESS")
+    monkeypatch.setattr(supervisor_module, "load_service_class", lambda target, allow_class_path=False: object)
+    monkeypatch.setattr(supervisor_module, "RESTART_INITIAL_DELAY", 0.05)
+    supervisor = ServiceSupervisor(["crashing"], start_method="fork")
+    yield supervisor
+    supervisor.stop()
+
+
+def wait_until(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_restart_delay_doubles_with_every_crash_in_a_row_up_to_the_maximum(supervisor, monkeypatch):
+    monkeypatch.setattr(supervisor_module, "RESTART_MAX_DELAY", 0.3)
+    worker = Worker("crashing", supervisor.transport_layer, 1, None)
+    worker.process = SimpleNamespace(exitcode=3)
+    worker.started_at = time.monotonic()
+    delays = []
+    for _ in range(5):
+        supervisor._ServiceSupervisor__schedule_restart(worker)
+        delays.append(worker.restart_delay)
+
+    assert delays == [0.1, 0.2, 0.3, 0.3, 0.3]
+
+
+def test_restart_delay_is_reset_after_a_stable_run(supervisor, monkeypatch):
+    worker = Worker("crashing", supervisor.transport_layer, 1, None)
+    worker.process = SimpleNamespace(exitcode=3)
+    worker.restart_delay = 8
+    worker.started_at = time.monotonic() - supervisor_module.STABLE_RUN_TIME - 1
+    supervisor._ServiceSupervisor__schedule_restart(worker)
+
+    assert worker.restart_delay == 0.1
+
+
+def test_crashed_workers_are_restarted(supervisor, monkeypatch):
+    monkeypatch.setattr(supervisor_module, "run_worker", crash)
+    supervisor.start()
+    worker = supervisor.workers[0]
+
+    assert wait_until(lambda: worker.restarts >= 2)
+    assert worker.restart_delay >= 0.05 * 2 ** worker.restarts
+
+
+def test_workers_exiting_cleanly_are_not_restarted(supervisor, monkeypatch):
+    monkeypatch.setattr(supervisor_module, "run_worker", exit_cleanly)
+    supervisor.start()
+    worker = supervisor.workers[0]
+
+    assert wait_until(lambda: worker.process.exitcode is not None)
+    time.sleep(0.3)
+    assert worker.restarts == 0
+    assert worker.process.exitcode == 0
@@ -0,0 +1,91 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+import json
+import time
+
+from simulator.core.publish_pipeline import PublishPipeline
+from simulator.core.trace_replay import TraceReplay
+
+
+class SlowService:
+    """
+    Stands in for a BaseService publishing to a host which takes a while to accept every publish
+    """
+
+    def __init__(self):
+        self.sent = 0
+        self.max_pending = 0
+        self.publish_pipeline = PublishPipeline(self.__send, send_batch=self.__send_batch)
+
+    def publish(self, topic, fields):
+        self.publish_pipeline.submit(topic, fields)
+        self.max_pending = max(self.max_pending, self.publish_pipeline.pending())
+
+    def publish_many(self, batch):
+        self.publish_pipeline.submit_batch(batch)
+        self.max_pending = max(self.max_pending, self.publish_pipeline.pending())
+
+    def __send(self, topic, fields):
+        time.sleep(0.0001)
+        self.sent += 1
+
+    def __send_batch(self, batch):
+        time.sleep(0.0001)
+        self.sent += len(batch)
+
+
+def write_trace(path, records):
+    with open(path, "w") as f:
+        for n in range(records):
+            f.write(json.dumps({"timestamp": n / 1000, "topic": "up:/chassis/1/tire.front_left#Tire",
+                                "pressure": n}) + "\n")
+
+
+def test_a_replay_outrunning_the_host_keeps_the_queue_bounded(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    write_trace(path, 2000)
+    service = SlowService()
+
+    replay = TraceReplay(service, path, speed=1e6, max_pending=32).start()
+
+    assert replay.wait(30)
+    assert service.publish_pipeline.flush(5)
+    assert replay.published == service.sent == 2000
+    assert service.max_pending <= 32
+
+
+def test_a_replay_waiting_for_the_host_can_be_stopped(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    write_trace(path, 5000)
+    service = SlowService()
+    replay = TraceReplay(service, path, speed=1e6, max_pending=1).start()
+
+    replay.stop()
+
+    assert replay.wait(5)
+    assert replay.published < 5000
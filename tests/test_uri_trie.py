@@ -0,0 +1,77 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+from simulator.core.uri_trie import UriTrie, is_wildcard, split_long_uri
+
+FRONT_LEFT = "up:/chassis/1/tire.front_left#Tire"
+FRONT_RIGHT = "up:/chassis/1/tire.front_right#Tire"
+BRAKES = "up:/chassis.braking/1/brake_pads.front#BrakePads"
+
+
+def test_long_uris_are_split_into_their_components():
+    assert split_long_uri(FRONT_LEFT) == ["", "chassis", "1", "tire", "front_left", "Tire"]
+    assert split_long_uri("up://vehicle-7/chassis/1/tire.front_left#Tire")[:2] == ["vehicle-7", "chassis"]
+    # a pattern stopping early matches everything below it
+    assert split_long_uri("up:/chassis/*", "*") == ["", "chassis", "*", "*", "*", "*"]
+    assert is_wildcard("up:/chassis/1/tire.*")
+    assert not is_wildcard(FRONT_LEFT)
+
+
+def test_wildcards_match_any_value_in_their_position():
+    trie = UriTrie()
+    trie.insert("up:/chassis/1/tire.*", "tires")
+    trie.insert("up:/chassis/*", "chassis")
+    trie.insert(FRONT_LEFT, "front left")
+
+    assert sorted(trie.match(FRONT_LEFT)) == ["chassis", "front left", "tires"]
+    assert sorted(trie.match(FRONT_RIGHT)) == ["chassis", "tires"]
+    assert trie.match(BRAKES) == []
+    assert not trie.matches("up://vehicle-7/chassis/1/tire.front_left#Tire")
+
+
+def test_a_listener_is_registered_once_per_pattern():
+    trie = UriTrie()
+
+    assert trie.insert("up:/chassis/1/tire.*", "tires")
+    assert not trie.insert("up:/chassis/1/tire.*", "tires")
+    assert trie.insert("up:/chassis/1/tire.*", "other")
+    assert trie.listeners("up:/chassis/1/tire.*") == ["tires", "other"]
+    assert len(trie) == 1
+
+
+def test_removing_the_last_listener_drops_the_pattern():
+    trie = UriTrie()
+    trie.insert("up:/chassis/1/tire.*", "tires")
+    trie.insert("up:/chassis/*", "chassis")
+
+    assert trie.remove("up:/chassis/1/tire.*", "tires")
+    assert not trie.remove("up:/chassis/1/tire.*", "tires")
+    assert trie.match(FRONT_LEFT) == ["chassis"]
+    assert trie.patterns() == ["up:/chassis/*"]
+    assert trie.remove("up:/chassis/*", "chassis")
+    assert len(trie) == 0
+    assert not trie.matches(FRONT_LEFT)
@@ -0,0 +1,120 @@
+# -------------------------------------------------------------------------
+#
+# Copyright (c) 2024 General Motors GTO LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# SPDX-FileType: SOURCE
+# SPDX-FileCopyrightText: 2024 General Motors GTO LLC
+# SPDX-License-Identifier: Apache-2.0
+#
+# -------------------------------------------------------------------------
+
+
+from types import SimpleNamespace
+
+import pytest
+from uprotocol.proto.uri_pb2 import UEntity, UResource, UUri
+from uprotocol.proto.ustatus_pb2 import UCode
+
+from simulator.core.exceptions import ValidationError
+from simulator.core.validation import AllowedValues, Precondition, Range, Validator, enum_values
+
+
+def make_uri(version=1, name="door"):
+    return UUri(entity=UEntity(name="body.access", version_major=version), resource=UResource(name=name))
+
+
+def validation_error(validator, request, service=None):
+    with pytest.raises(ValidationError) as error:
+        validator.validate(service, request)
+    return error.value
+
+
+def test_valid_requests_pass():
+    validator = Validator([
+        Range("entity.version_major", 1, 3),
+        AllowedValues("resource.name", ["door", "window"]),
+        Precondition(lambda service, request: True),
+    ])
+
+    assert validator.validate(None, make_uri())
+
+
+def test_range_errors_carry_the_rule_code_and_value():
+    validator = Validator([Range("entity.version_major", 1, 3, code=3, message="Unsupported version: {value}")])
+    error = validation_error(validator, make_uri(version=4))
+
+    assert error.code == 3
+    assert error.message == "Unsupported version: 4"
+    assert validator.validate(None, make_uri(version=3))
+
+
+def test_range_limits_may_depend_on_the_service():
+    service = SimpleNamespace(max_version=2)
+    validator = Validator([Range("entity.version_major", maximum=lambda service: service.max_version)])
+
+    assert validator.validate(service, make_uri(version=2))
+    assert validation_error(validator, make_uri(version=3), service).code == 2
+    service.max_version = 5
+    assert validator.validate(service, make_uri(version=3))
+
+
+def test_allowed_values_errors():
+    validator = Validator([AllowedValues("resource.name", ["door"], code=3, message="Unsupported resource: {value}")])
+    error = validation_error(validator, make_uri(name="roof"))
+
+    assert error.code == 3
+    assert error.message == "Unsupported resource: roof"
+
+
+def test_enum_values_leave_out_excluded_names():
+    assert enum_values(UCode) == frozenset(UCode.values())
+    assert enum_values(UCode, exclude=["OK"]) == frozenset(UCode.values()) - {UCode.OK}
+
+    validator = Validator([AllowedValues("code", enum_values(UCode, exclude=["OK"]))])
+    assert validation_error(validator, SimpleNamespace(code=UCode.OK)).code == 2
+
+
+def test_precondition_messages_may_be_computed():
+    service = SimpleNamespace(locked=True)
+    validator = Validator([Precondition(lambda service, request: not service.locked, code=9,
+                                        message=lambda service, request: f"{request.resource.name} is locked")])
+    error = validation_error(validator, make_uri(), service)
+
+    assert error.code == 9
+    assert error.message == "door is locked"
+
+
+def test_the_first_failing_rule_is_reported():
+    validator = Validator([
+        AllowedValues("resource.name", ["door"], code=3),
+        Range("entity.version_major", maximum=1, code=5),
+    ])
+
+    assert validation_error(validator, make_uri(version=2, name="roof")).code == 3
+    assert validation_error(validator, make_uri(version=2)).code == 5
+
+
+def test_rules_are_skipped_for_other_requests():
+    validator = Validator([
+        Range("entity.version_major", maximum=1, when=lambda service, request: request.resource.name == "door"),
+        Precondition(lambda service, request: False, request_class=UEntity),
+    ])
+
+    assert validator.validate(None, make_uri(version=2, name="window"))
+    assert validation_error(validator, make_uri(version=2)).code == 2